@@ -6,16 +6,135 @@ import tkinter as tk
 from tkinter import messagebox, simpledialog, scrolledtext
 from datetime import datetime, timedelta
 import json
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from bson import ObjectId
 from security_module import (
     InputValidator, SecureDatabaseQueries, SecurityError, 
     SecurityAuditLogger, secure_input_wrapper
 )
+from stats_module import DashboardStatsEngine, UsageRollups, PLAN_LIMITS, DEFAULT_PLAN_LIMIT
+from lookup_module import UserLookupService, CompanyDirectory, format_user_name, normalize_object_id, resolve_id_prefix
+from pagination_module import KeysetPager, bson_size, format_bytes
+from search_module import TreeSearchIndex, MessageSearchEngine
+from export_module import JsonLinesExporter, ParallelExporter, CsvExporter, DEFAULT_EXPORT_WORKERS, MAX_EXPORT_WORKERS
+from ratings_module import (
+    RATED_CONVERSATIONS_QUERY, RATINGS_INDEX, RATING_BANDS, RATING_STAGES, rating_band_counters, rating_band_label,
+    rating_score_stages, rating_report
+)
+from analytics_module import RatingAnalytics, PERCENTILES
+from backup_module import (
+    BackupEngine, BackupCancelled, BACKUP_DIRECTORY, MANIFEST_FILE, list_backups, format_backup_report
+)
+from summaries_module import (
+    latest_summaries_pipeline, SummarySearchPlanner, DEFAULT_SUMMARY_PAGE_SIZE, MAX_SUMMARY_PAGE_SIZE
+)
+
+# Fields displayed in the users treeview
+USER_LIST_PROJECTION = {
+    'firstName': 1, 'lastName': 1, 'email': 1, 'role': 1, 'companyId': 1, 'company': 1,
+    'subscription.plan': 1, 'subscription.status': 1, 'lastLogin': 1, 'createdAt': 1
+}
+
+# Conversations tab page size (editable in the tab)
+DEFAULT_CONVERSATION_PAGE_SIZE = 30
+MAX_CONVERSATION_PAGE_SIZE = 500
+
+# Fields displayed in conversation lists; messages are counted on the server
+CONVERSATION_LIST_PROJECTION = {
+    'userId': 1, 'title': 1, 'scenario': 1, 'rating': 1, 'duration': 1, 'createdAt': 1,
+    'messageCount': {'$size': {'$ifNull': ['$messages', []]}}
+}
+
+# Messages fetched and rendered per page in the conversation transcript
+TRANSCRIPT_PAGE_SIZE = 50
+
+# Fields of subscribed users shown in the Subscription Tracking tab
+SUBSCRIPTION_USER_PROJECTION = {'firstName': 1, 'lastName': 1, 'email': 1, 'subscription.plan': 1}
+
+# Documents formatted (and their lookups batched) per CSV export step
+CSV_EXPORT_BATCH_SIZE = 1000
+
+# Rated conversations per page in the AI Ratings tab
+RATINGS_PAGE_SIZE = 100
+
+# Rating details kept for instant re-opening (least recently opened are dropped)
+RATING_DETAILS_CACHE_SIZE = 200
+RATING_DETAILS_PROJECTION = {
+    'title': 1, 'scenario': 1, 'duration': 1, 'aiRatings': 1, 'aiRatingFeedback': 1,
+    'messageCount': {'$size': {'$ifNull': ['$messages', []]}}
+}
+
+# Maximum users fetched from the server for a search while the list is still paging
+USER_SEARCH_FALLBACK_LIMIT = 200
+
+# Row filters behind the Users tab filter buttons (values: ID, Name, Email, Role, Company, ...)
+USER_ROW_FILTERS = {
+    'all': None,
+    'admin': lambda values: 'admin' in values[3].lower(),
+    'company': lambda values: values[4] != 'Individual',
+    'individual': lambda values: values[4] == 'Individual'
+}
 
 class AdminMethods:
     def __init__(self, admin_instance):
         self.admin = admin_instance
+        self.user_lookup = None
+        self.company_directory = None
+        self.message_search = None
+        self.users_pager = None
+        self.conversations_pager = None
+        self.conversation_rows = []
+        self.ratings_pager = None
+        self.rating_details_cache = OrderedDict()
+        self.summary_page = 0
+        self.summary_has_more = False
+        self.backup_engine = None
+        self.users_loading = False
+        self.users_search_index = None
+        self.companies_search_index = None
+        self.user_filter_type = 'all'
+        self.debounce_ids = {}
+        
+    def debounce(self, key, callback, delay_ms=250):
+        """Run callback once no new call for the same key arrived within delay_ms"""
+        after_id = self.debounce_ids.pop(key, None)
+        if after_id:
+            self.admin.root.after_cancel(after_id)
+        
+        def run():
+            self.debounce_ids.pop(key, None)
+            callback()
+        
+        self.debounce_ids[key] = self.admin.root.after(delay_ms, run)
+        
+    def get_user_lookup(self):
+        """Return the shared user lookup cache for the current connection"""
+        if self.user_lookup is None or self.user_lookup.users_collection is not self.admin.users_collection:
+            self.user_lookup = UserLookupService(self.admin.users_collection)
+        return self.user_lookup
+        
+    def get_company_directory(self):
+        """Return the shared company name map for the current connection"""
+        if self.company_directory is None or self.company_directory.companies_collection is not self.admin.companies_collection:
+            self.company_directory = CompanyDirectory(self.admin.companies_collection)
+        return self.company_directory
+        
+    def get_message_search(self):
+        """Return the shared message search engine for the current connection"""
+        if self.message_search is None or self.message_search.conversations_collection is not self.admin.conversations_collection:
+            self.message_search = MessageSearchEngine(self.admin.conversations_collection)
+        return self.message_search
+        
+    def get_usage_rollups(self):
+        """Return the usage rollups for the current connection"""
+        return UsageRollups(
+            self.admin.conversations_collection,
+            self.admin.conversation_rollups_collection
+        )
         
     def refresh_dashboard(self):
         """Refresh dashboard statistics"""
@@ -23,118 +142,98 @@ class AdminMethods:
             return
         
         try:
-            # Get statistics
-            total_users = self.admin.users_collection.count_documents({})
-            active_companies = self.admin.companies_collection.count_documents({'isActive': True})
-            total_conversations = self.admin.conversations_collection.count_documents({})
-            
-            # Today's conversations
-            today_start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            today_conversations = self.admin.conversations_collection.count_documents({
-                'createdAt': {'$gte': today_start}
-            })
-            
-            # Active subscriptions
-            active_subscriptions = self.admin.users_collection.count_documents({
-                'subscription.status': 'active'
-            })
-            
-            # Monthly revenue (placeholder - would need Stripe integration)
-            revenue_mtd = 0  # This would need to be calculated from actual payment data
-            
-            # Get monthly usage statistics
-            current_month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            next_month_start = (current_month_start.replace(day=1) + timedelta(days=32)).replace(day=1)
-            
-            # Count conversations this month
-            monthly_conversations = self.admin.conversations_collection.count_documents({
-                'createdAt': {
-                    '$gte': current_month_start,
-                    '$lt': next_month_start
-                }
-            })
-            
-            # Get total monthly limits
-            users_with_subscriptions = list(self.admin.users_collection.find({
-                'subscription': {'$exists': True},
-                'subscription.plan': {'$ne': None}
-            }))
-            
-            total_monthly_limit = 0
-            for user in users_with_subscriptions:
-                plan = user.get('subscription', {}).get('plan', 'basic')
-                plan_limits = {'free': 3, 'basic': 10, 'pro': 50, 'enterprise': 200}
-                total_monthly_limit += plan_limits.get(plan, 10)
-            
-            # Get this week's conversations
-            week_start = datetime.now() - timedelta(days=7)
-            week_conversations = self.admin.conversations_collection.count_documents({
-                'createdAt': {'$gte': week_start}
-            })
-            
-            # Get average call duration
-            conversations_with_duration = list(self.admin.conversations_collection.find({
-                'duration': {'$exists': True, '$gt': 0}
-            }, {'duration': 1}))
-            
-            avg_duration_minutes = 0
-            if conversations_with_duration:
-                total_duration = sum(conv.get('duration', 0) for conv in conversations_with_duration)
-                avg_duration_seconds = total_duration / len(conversations_with_duration)
-                avg_duration_minutes = round(avg_duration_seconds / 60, 1)
-            
-            # Update stat cards
-            self.admin.stat_total_users.config(text=str(total_users))
-            self.admin.stat_active_companies.config(text=str(active_companies))
-            self.admin.stat_total_conversations.config(text=str(total_conversations))
-            self.admin.stat_todays_conversations.config(text=str(today_conversations))
-            self.admin.stat_active_subscriptions.config(text=str(active_subscriptions))
-            self.admin.stat_revenue_mtd.config(text=f"${revenue_mtd}")
-            
-            # Update new monthly usage cards
-            self.admin.stat_monthly_calls_used.config(text=f"{monthly_conversations}/{total_monthly_limit}")
-            self.admin.stat_calls_this_week.config(text=str(week_conversations))
-            self.admin.stat_avg_call_duration.config(text=f"{avg_duration_minutes}m")
-            
-            # Update recent activity
-            self.update_recent_activity()
-            
+            self.apply_dashboard_data(self.collect_dashboard_data())
         except Exception as e:
             messagebox.showerror("Error", f"Failed to refresh dashboard: {str(e)}")
     
+    def collect_dashboard_data(self):
+        """Query dashboard statistics and recent activity (no widget access)"""
+        # Bring the usage rollups up to date, then read conversation counters from them
+        rollups = self.get_usage_rollups()
+        rollups.update_incremental()
+        
+        # Compute every stat card with a handful of server-side pipelines
+        stats = DashboardStatsEngine(
+            self.admin.users_collection,
+            self.admin.companies_collection,
+            self.admin.conversations_collection,
+            rollups=rollups
+        ).compute()
+        
+        try:
+            activity = self.collect_recent_activity()
+        except Exception as e:
+            activity = f"Error loading recent activity: {str(e)}\n"
+        
+        return {'stats': stats, 'activity': activity}
+    
+    def apply_dashboard_data(self, data):
+        """Update the dashboard widgets with collect_dashboard_data results"""
+        stats = data['stats']
+        
+        # Monthly revenue (placeholder - would need Stripe integration)
+        revenue_mtd = 0  # This would need to be calculated from actual payment data
+        
+        # Update stat cards
+        self.admin.stat_total_users.config(text=str(stats['total_users']))
+        self.admin.stat_active_companies.config(text=str(stats['active_companies']))
+        self.admin.stat_total_conversations.config(text=str(stats['total_conversations']))
+        self.admin.stat_todays_conversations.config(text=str(stats['today_conversations']))
+        self.admin.stat_active_subscriptions.config(text=str(stats['active_subscriptions']))
+        self.admin.stat_revenue_mtd.config(text=f"${revenue_mtd}")
+        
+        # Update new monthly usage cards
+        self.admin.stat_monthly_calls_used.config(
+            text=f"{stats['monthly_conversations']}/{stats['total_monthly_limit']}")
+        self.admin.stat_calls_this_week.config(text=str(stats['week_conversations']))
+        self.admin.stat_avg_call_duration.config(text=f"{stats['avg_duration_minutes']}m")
+        
+        # Show the timing breakdown in the status bar
+        timings = ', '.join(f"{source} {ms:.0f}ms" for source, ms in stats['timings'].items())
+        self.admin.status_label.config(
+            text=f"Dashboard refreshed in {stats['total_ms']:.0f}ms ({timings})", fg='green')
+        
+        # Update recent activity
+        self.admin.activity_text.delete(1.0, tk.END)
+        self.admin.activity_text.insert(tk.END, data['activity'])
+    
     def update_recent_activity(self):
         """Update recent activity log"""
+        self.admin.activity_text.delete(1.0, tk.END)
         try:
-            self.admin.activity_text.delete(1.0, tk.END)
-            
-            # Get recent users
-            recent_users = list(self.admin.users_collection.find().sort('createdAt', -1).limit(5))
-            self.admin.activity_text.insert(tk.END, "Recent Users:\n")
-            for user in recent_users:
-                self.admin.activity_text.insert(tk.END, 
-                    f"  - {user.get('firstName', '')} {user.get('lastName', '')} ({user.get('email', '')}) - {user.get('createdAt', '').strftime('%Y-%m-%d %H:%M')}\n")
-            
-            # Get recent companies
-            recent_companies = list(self.admin.companies_collection.find().sort('createdAt', -1).limit(3))
-            self.admin.activity_text.insert(tk.END, "\nRecent Companies:\n")
-            for company in recent_companies:
-                self.admin.activity_text.insert(tk.END, 
-                    f"  - {company.get('name', '')} ({company.get('industry', 'N/A')}) - {company.get('createdAt', '').strftime('%Y-%m-%d %H:%M')}\n")
-            
-            # Get recent conversations
-            recent_conversations = list(self.admin.conversations_collection.find().sort('createdAt', -1).limit(5))
-            self.admin.activity_text.insert(tk.END, "\nRecent Conversations:\n")
-            for conv in recent_conversations:
-                user = self.admin.users_collection.find_one({'_id': conv['userId']})
-                user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}" if user else "Unknown"
-                self.admin.activity_text.insert(tk.END, 
-                    f"  - {user_name}: {conv.get('title', 'Untitled')} - {conv.get('createdAt', '').strftime('%Y-%m-%d %H:%M')}\n")
-            
+            self.admin.activity_text.insert(tk.END, self.collect_recent_activity())
         except Exception as e:
             self.admin.activity_text.insert(tk.END, f"Error loading recent activity: {str(e)}\n")
     
+    def collect_recent_activity(self):
+        """Build the recent activity log text"""
+        activity = ""
+        
+        # Get recent users
+        recent_users = list(self.admin.users_collection.find().sort('createdAt', -1).limit(5))
+        activity += "Recent Users:\n"
+        for user in recent_users:
+            activity += f"  - {user.get('firstName', '')} {user.get('lastName', '')} ({user.get('email', '')}) - {user.get('createdAt', '').strftime('%Y-%m-%d %H:%M')}\n"
+        
+        # Get recent companies
+        recent_companies = list(self.admin.companies_collection.find().sort('createdAt', -1).limit(3))
+        activity += "\nRecent Companies:\n"
+        for company in recent_companies:
+            activity += f"  - {company.get('name', '')} ({company.get('industry', 'N/A')}) - {company.get('createdAt', '').strftime('%Y-%m-%d %H:%M')}\n"
+        
+        # Get recent conversations
+        recent_conversations = list(self.admin.conversations_collection.find().sort('createdAt', -1).limit(5))
+        lookup = self.get_user_lookup()
+        user_names = lookup.get_names(conv.get('userId') for conv in recent_conversations)
+        activity += "\nRecent Conversations:\n"
+        for conv in recent_conversations:
+            user_name = lookup.name_for(user_names, conv.get('userId'))
+            activity += f"  - {user_name}: {conv.get('title', 'Untitled')} - {conv.get('createdAt', '').strftime('%Y-%m-%d %H:%M')}\n"
+        
+        return activity
+    
     def load_users(self):
-        """Load users into the treeview"""
+        """Load the first page of users into the treeview"""
         if not self.admin.connected:
             return
         
@@ -143,71 +242,112 @@ class AdminMethods:
             for item in self.admin.users_tree.get_children():
                 self.admin.users_tree.delete(item)
             
-            # Get users with company information
-            users = list(self.admin.users_collection.find())
+            # Search index over name, email, role and company
+            if self.users_search_index is None:
+                self.users_search_index = TreeSearchIndex(self.admin.users_tree, (1, 2, 3, 4))
+            self.users_search_index.clear()
+            self.users_search_index.filter(self.admin.user_search_var.get().strip(), USER_ROW_FILTERS[self.user_filter_type])
             
-            for user in users:
-                # Get company name if user belongs to a company
-                company_name = "Individual"
-                if user.get('companyId'):
-                    company = self.admin.companies_collection.find_one({'_id': user['companyId']})
-                    if company:
-                        company_name = company.get('name', 'Unknown Company')
-                elif user.get('company'):
-                    company_name = user.get('company', 'Individual')
-                
-                # Format last login
-                last_login = user.get('lastLogin', 'Never')
-                if last_login and last_login != 'Never':
-                    last_login = last_login.strftime('%Y-%m-%d %H:%M')
-                
-                # Format created date
-                created = user.get('createdAt', '').strftime('%Y-%m-%d')
+            # Fetch company names once for the whole list
+            self.get_company_directory().refresh()
+            
+            # Page through users in _id order, fetching only the displayed fields
+            self.users_pager = KeysetPager(self.admin.users_collection, projection=USER_LIST_PROJECTION)
+            self.load_more_users()
                 
-                # Insert into treeview with full ObjectId stored in tags
-                self.admin.users_tree.insert('', 'end', 
-                    values=(
-                        str(user['_id'])[:8] + '...',
-                        f"{user.get('firstName', '')} {user.get('lastName', '')}",
-                        user.get('email', ''),
-                        user.get('role', 'individual'),
-                        company_name,
-                        user.get('subscription', {}).get('plan', 'free'),
-                        user.get('subscription', {}).get('status', 'inactive'),
-                        last_login,
-                        created
-                    ),
-                    tags=(str(user['_id']),)  # Store full ObjectId as tag
-                )
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load users: {str(e)}")
+    
+    def load_more_users_on_scroll(self):
+        """Load the next page when the list is scrolled near its end, unless rows are being hidden"""
+        # With a search or filter active, rows that do not match are detached as
+        # they load, so the list never fills the view and every page would
+        # trigger another; searches use the server-side fallback instead
+        index = self.users_search_index
+        if index is not None and (index.query or index.row_filter is not None):
+            return
+        self.load_more_users()
+    
+    def load_more_users(self):
+        """Append the next page of users to the treeview (called as the list is scrolled)"""
+        pager = self.users_pager
+        if pager is None or not pager.has_more or self.users_loading:
+            return
+        
+        self.users_loading = True
+        try:
+            for user in pager.next_page():
+                self.insert_user_row(user)
+            
+            # Show the live total from the server
+            self.admin.status_label.config(
+                text=f"Users: {pager.loaded:,} of {pager.total():,} loaded", fg='green')
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load users: {str(e)}")
+        finally:
+            self.users_loading = False
+    
+    def insert_user_row(self, user):
+        """Append a user to the treeview and the search index (skipped if already listed)"""
+        user_id = str(user['_id'])
+        if self.admin.users_tree.exists(user_id):
+            return
+        
+        # Get company name if user belongs to a company
+        company_name = "Individual"
+        if user.get('companyId'):
+            company_name = self.get_company_directory().name_for(user['companyId']) or company_name
+        elif user.get('company'):
+            company_name = user.get('company', 'Individual')
+        
+        # Format last login
+        last_login = user.get('lastLogin', 'Never')
+        if last_login and last_login != 'Never':
+            last_login = last_login.strftime('%Y-%m-%d %H:%M')
+        
+        # Format created date
+        created = user.get('createdAt', '').strftime('%Y-%m-%d')
+        
+        values = (
+            user_id[:8] + '...',
+            f"{user.get('firstName', '')} {user.get('lastName', '')}",
+            user.get('email', ''),
+            user.get('role', 'individual'),
+            company_name,
+            user.get('subscription', {}).get('plan', 'free'),
+            user.get('subscription', {}).get('status', 'inactive'),
+            last_login,
+            created
+        )
+        
+        # Insert into treeview with full ObjectId stored in tags
+        self.admin.users_tree.insert('', 'end', iid=user_id, values=values,
+            tags=(user_id,)  # Store full ObjectId as tag
+        )
+        self.users_search_index.add(user_id, values)
     
     @secure_input_wrapper
     def search_users(self, event=None):
         """Search users based on search term"""
+        if self.users_search_index is None:
+            return
+        
         try:
-            # Validate and sanitize search input
-            raw_search_term = self.admin.user_search_var.get()
-            search_term = InputValidator.validate_and_sanitize_input(
-                raw_search_term, 'search', is_required=False
-            ).lower()
-            
-            for item in self.admin.users_tree.get_children():
-                values = self.admin.users_tree.item(item)['values']
-                # Search in name and email
-                if (search_term in values[1].lower() or 
-                    search_term in values[2].lower() or 
-                    search_term in values[3].lower() or
-                    search_term in values[4].lower()):
-                    self.admin.users_tree.reattach(item, '', 'end')
-                else:
-                    self.admin.users_tree.detach(item)
-        except SecurityError as e:
-            SecurityAuditLogger.log_security_violation(
-                None, "search_users", "search_term", "input_validation", str(e)
-            )
-            messagebox.showerror("Security Error", "Invalid search input detected")
+            # The term only reaches the in-memory index and an escaped, anchored
+            # regex, so it is not run through the input validator (which
+            # rejects any non-empty input)
+            search_term = self.admin.user_search_var.get().lower().strip()
+            
+            # Users beyond the loaded pages are looked up by email prefix (unique index)
+            if search_term and self.users_pager is not None and self.users_pager.has_more:
+                matching_users = self.admin.users_collection.find(
+                    {'email': {'$regex': '^' + re.escape(search_term)}}, USER_LIST_PROJECTION
+                ).limit(USER_SEARCH_FALLBACK_LIMIT)
+                for user in matching_users:
+                    self.insert_user_row(user)
+            
+            self.users_search_index.filter(search_term, USER_ROW_FILTERS[self.user_filter_type])
         except Exception as e:
             SecurityAuditLogger.log_security_violation(
                 None, "search_users", "error", "unexpected_error", str(e)
@@ -216,26 +356,9 @@ class AdminMethods:
     
     def filter_users(self, filter_type):
         """Filter users by type"""
-        for item in self.admin.users_tree.get_children():
-            values = self.admin.users_tree.item(item)['values']
-            
-            if filter_type == 'all':
-                self.admin.users_tree.reattach(item, '', 'end')
-            elif filter_type == 'admin':
-                if 'admin' in values[3].lower():
-                    self.admin.users_tree.reattach(item, '', 'end')
-                else:
-                    self.admin.users_tree.detach(item)
-            elif filter_type == 'company':
-                if values[4] != 'Individual':
-                    self.admin.users_tree.reattach(item, '', 'end')
-                else:
-                    self.admin.users_tree.detach(item)
-            elif filter_type == 'individual':
-                if values[4] == 'Individual':
-                    self.admin.users_tree.reattach(item, '', 'end')
-                else:
-                    self.admin.users_tree.detach(item)
+        self.user_filter_type = filter_type
+        if self.users_search_index is not None:
+            self.users_search_index.filter(self.users_search_index.query, USER_ROW_FILTERS[filter_type])
     
     def view_user_details(self, event=None):
         """View detailed user information"""
@@ -294,7 +417,7 @@ class AdminMethods:
         # Get company information if user belongs to a company
         company_info = "None"
         if user.get('companyId'):
-            company = self.admin.companies_collection.find_one({'_id': user['companyId']})
+            company = self.get_company_directory().get(user['companyId'])
             if company:
                 company_info = f"{company.get('name', 'Unknown')} (ID: {company.get('companyId', 'Unknown')})"
         
@@ -577,6 +700,7 @@ Updated: {user.get('updatedAt', 'Unknown')}
                 )
                 
                 if result.modified_count > 0:
+                    self.get_user_lookup().invalidate(user['_id'])
                     messagebox.showinfo("Success", "User updated successfully!")
                     edit_window.destroy()
                     self.load_users()  # Refresh user list
@@ -659,7 +783,11 @@ Updated: {user.get('updatedAt', 'Unknown')}
             if messagebox.askyesno("Confirm Deletion", confirm_message):
                 # Delete related data first
                 if conversation_count > 0:
+                    # Older months are outside the incremental rollup window, so refresh them here
+                    rollups = self.get_usage_rollups()
+                    since = rollups.affected_since({'userId': user_id})
                     self.admin.conversations_collection.delete_many({'userId': user_id})
+                    rollups.refresh_since(since)
                 
                 if summary_count > 0:
                     self.admin.conversation_summaries_collection.delete_many({'userId': user_id})
@@ -682,6 +810,7 @@ Updated: {user.get('updatedAt', 'Unknown')}
                 
                 # Finally delete the user
                 result = self.admin.users_collection.delete_one({'_id': user_id})
+                self.get_user_lookup().invalidate(user_id)
                 
                 if result.deleted_count > 0:
                     messagebox.showinfo("Success", 
@@ -707,16 +836,25 @@ Updated: {user.get('updatedAt', 'Unknown')}
             for item in self.admin.companies_tree.get_children():
                 self.admin.companies_tree.delete(item)
             
+            # Search index over name and industry
+            if self.companies_search_index is None:
+                self.companies_search_index = TreeSearchIndex(self.admin.companies_tree, (1, 2))
+            self.companies_search_index.clear()
+            self.companies_search_index.filter(self.admin.company_search_var.get().strip())
+            
             # Get companies
             companies = list(self.admin.companies_collection.find())
             
+            # Share the fetched companies with the Users tab company names
+            self.get_company_directory().prime(companies)
+            
+            # Resolve all admin names with one query
+            lookup = self.get_user_lookup()
+            admin_names = lookup.get_names(company.get('admin') for company in companies if company.get('admin'))
+            
             for company in companies:
                 # Get admin user name
-                admin_name = "Unknown"
-                if company.get('admin'):
-                    admin = self.admin.users_collection.find_one({'_id': company['admin']})
-                    if admin:
-                        admin_name = f"{admin.get('firstName', '')} {admin.get('lastName', '')}"
+                admin_name = lookup.name_for(admin_names, company.get('admin'))
                 
                 # Count users
                 user_count = len(company.get('users', []))
@@ -724,21 +862,23 @@ Updated: {user.get('updatedAt', 'Unknown')}
                 # Format created date
                 created = company.get('createdAt', '').strftime('%Y-%m-%d')
                 
+                values = (
+                    str(company['_id'])[:8] + '...',
+                    company.get('name', ''),
+                    company.get('industry', 'N/A'),
+                    company.get('size', '1-10'),
+                    admin_name,
+                    user_count,
+                    company.get('subscription', {}).get('plan', 'free'),
+                    company.get('subscription', {}).get('status', 'inactive'),
+                    created
+                )
+                
                 # Insert into treeview with full ObjectId stored in tags
-                self.admin.companies_tree.insert('', 'end', 
-                    values=(
-                        str(company['_id'])[:8] + '...',
-                        company.get('name', ''),
-                        company.get('industry', 'N/A'),
-                        company.get('size', '1-10'),
-                        admin_name,
-                        user_count,
-                        company.get('subscription', {}).get('plan', 'free'),
-                        company.get('subscription', {}).get('status', 'inactive'),
-                        created
-                    ),
+                item = self.admin.companies_tree.insert('', 'end', values=values,
                     tags=(str(company['_id']),)  # Store full ObjectId as tag
                 )
+                self.companies_search_index.add(item, values)
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load companies: {str(e)}")
@@ -746,26 +886,16 @@ Updated: {user.get('updatedAt', 'Unknown')}
     @secure_input_wrapper
     def search_companies(self, event=None):
         """Search companies based on search term"""
+        if self.companies_search_index is None:
+            return
+        
         try:
-            # Validate and sanitize search input
-            raw_search_term = self.admin.company_search_var.get()
-            search_term = InputValidator.validate_and_sanitize_input(
-                raw_search_term, 'search', is_required=False
-            ).lower()
+            # The term only reaches the in-memory index, so it is not run through
+            # the input validator (which rejects any non-empty input)
+            search_term = self.admin.company_search_var.get().lower().strip()
             
-            for item in self.admin.companies_tree.get_children():
-                values = self.admin.companies_tree.item(item)['values']
-                # Search in name and industry
-                if (search_term in values[1].lower() or 
-                    search_term in values[2].lower()):
-                    self.admin.companies_tree.reattach(item, '', 'end')
-                else:
-                    self.admin.companies_tree.detach(item)
-        except SecurityError as e:
-            SecurityAuditLogger.log_security_violation(
-                None, "search_companies", "search_term", "input_validation", str(e)
-            )
-            messagebox.showerror("Security Error", "Invalid search input detected")
+            # Search in name and industry
+            self.companies_search_index.filter(search_term)
         except Exception as e:
             SecurityAuditLogger.log_security_violation(
                 None, "search_companies", "error", "unexpected_error", str(e)
@@ -1206,7 +1336,10 @@ Updated: {company.get('updatedAt', 'Unknown')}
                     
                     # Delete conversations from company users
                     if conversation_count > 0:
+                        rollups = self.get_usage_rollups()
+                        since = rollups.affected_since({'userId': {'$in': company_users}})
                         self.admin.conversations_collection.delete_many({'userId': {'$in': company_users}})
+                        rollups.refresh_since(since)
                     
                     # Delete conversation summaries from company users
                     if summary_count > 0:
@@ -1265,93 +1398,165 @@ Updated: {company.get('updatedAt', 'Unknown')}
         messagebox.showinfo("Info", "Company user management functionality will be implemented in the next version")
     
     def load_conversations(self):
-        """Load conversations into the treeview (limited to 30 for performance)"""
+        """Load the newest page of conversations into the treeview"""
         if not self.admin.connected:
             return
         
         try:
-            # Clear existing items
-            for item in self.admin.conversations_tree.get_children():
-                self.admin.conversations_tree.delete(item)
-            
-            # Get conversations with user information (limit to 30 for performance)
-            conversations = list(self.admin.conversations_collection.find().sort('createdAt', -1).limit(30))
-            
-            for conv in conversations:
-                # Get user name
-                user_name = "Unknown"
-                user = self.admin.users_collection.find_one({'_id': conv['userId']})
-                if user:
-                    user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}"
-                
-                # Format created date
-                created = conv.get('createdAt', '').strftime('%Y-%m-%d %H:%M')
-                
-                # Format duration
-                duration = conv.get('duration', 0)
-                duration_str = f"{duration//60}m {duration%60}s" if duration > 0 else "0s"
-                
-                # Insert into treeview with full ObjectId stored in tags
-                self.admin.conversations_tree.insert('', 'end', 
-                    values=(
-                        str(conv['_id'])[:8] + '...',
-                        user_name,
-                        conv.get('title', 'Untitled'),
-                        conv.get('scenario', 'general'),
-                        len(conv.get('messages', [])),
-                        conv.get('rating', 'Not rated'),
-                        duration_str,
-                        created
-                    ),
-                    tags=(str(conv['_id']),)  # Store full ObjectId as tag
-                )
-                
+            self.start_conversation_pages({})
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load conversations: {str(e)}")
+    
+    def get_conversation_page_size(self):
+        """Read the page size setting, falling back to the default when invalid"""
+        try:
+            page_size = int(self.admin.conversation_page_size_var.get())
+        except (TypeError, ValueError, tk.TclError):
+            return DEFAULT_CONVERSATION_PAGE_SIZE
+        return min(max(page_size, 1), MAX_CONVERSATION_PAGE_SIZE)
+    
+    def new_conversation_pager(self, query):
+        """Keyset pager over conversations matching query, newest first"""
+        # Keyset pages on (createdAt, _id) stay one indexed query however far back we go
+        return KeysetPager(
+            self.admin.conversations_collection,
+            query=query,
+            projection=CONVERSATION_LIST_PROJECTION,
+            sort_field='createdAt',
+            descending=True,
+            page_size=self.get_conversation_page_size()
+        )
+    
+    def start_conversation_pages(self, query):
+        """Show the first page of conversations matching query, newest first"""
+        self.conversations_pager = self.new_conversation_pager(query)
+        self.show_conversation_rows(self.format_conversation_page(self.conversations_pager.next_page()))
+    
+    def next_conversations_page(self):
+        """Show the next (older) page of conversations"""
+        pager = self.conversations_pager
+        if pager is None or not pager.has_more:
+            return
+        
+        try:
+            self.show_conversation_rows(self.format_conversation_page(pager.next_page()))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load conversations: {str(e)}")
+    
+    def previous_conversations_page(self):
+        """Show the previous (newer) page of conversations"""
+        pager = self.conversations_pager
+        if pager is None or not pager.has_previous:
+            return
+        
+        try:
+            self.show_conversation_rows(self.format_conversation_page(pager.previous_page()))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load conversations: {str(e)}")
+    
+    def change_conversation_page_size(self, event=None):
+        """Restart paging of the current conversation query with the new page size"""
+        if not self.admin.connected:
+            return
+        
+        try:
+            query = self.conversations_pager.query if self.conversations_pager else {}
+            self.start_conversation_pages(query)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load conversations: {str(e)}")
     
+    def collect_conversation_rows(self):
+        """Re-query the current page of conversations as treeview rows (no widget access)"""
+        # Query from a snapshot of the pager's position; the Tk thread owns the pager itself
+        pager = self.conversations_pager or self.new_conversation_pager({})
+        page_number, start = pager.page_number, pager.current_start()
+        docs, has_more = pager.fetch_page(start)
+        return pager, page_number, start, docs, has_more, self.format_conversation_page(docs)
+    
+    def apply_conversation_rows(self, data):
+        """Tk thread: show refreshed conversation rows unless the user paged or filtered meanwhile"""
+        pager, page_number, start, docs, has_more, rows = data
+        if self.conversations_pager is None:
+            self.conversations_pager = pager
+        if pager is not self.conversations_pager or not pager.refresh_page(page_number, start, docs, has_more):
+            return
+        
+        # Rebuilding an unchanged page would only flicker
+        if rows == self.conversation_rows and len(self.admin.conversations_tree.get_children()) == len(rows):
+            self.show_conversation_page_status()
+            return
+        self.show_conversation_rows(rows, keep_view=True)
+    
+    def format_conversation_page(self, conversations):
+        """Format a page of conversations as treeview rows"""
+        # Resolve all user names with one query
+        lookup = self.get_user_lookup()
+        user_names = lookup.get_names(conv.get('userId') for conv in conversations)
+        
+        return [
+            self.format_conversation_row(conv, lookup.name_for(user_names, conv.get('userId')))
+            for conv in conversations
+        ]
+    
+    def format_conversation_row(self, conv, user_name):
+        """Format a conversation document as (values, tags) for the conversations treeview"""
+        # Format created date
+        created = conv.get('createdAt', '').strftime('%Y-%m-%d %H:%M')
+        
+        # Format duration
+        duration = conv.get('duration', 0)
+        duration_str = f"{duration//60}m {duration%60}s" if duration > 0 else "0s"
+        
+        values = (
+            str(conv['_id'])[:8] + '...',
+            user_name,
+            conv.get('title', 'Untitled'),
+            conv.get('scenario', 'general'),
+            conv.get('messageCount', len(conv.get('messages', []))),
+            conv.get('rating', 'Not rated'),
+            duration_str,
+            created
+        )
+        return values, (str(conv['_id']),)  # Store full ObjectId as tag
+    
+    def show_conversation_rows(self, rows, keep_view=False):
+        """Replace the conversations treeview contents with formatted rows, keeping the selection"""
+        tree = self.admin.conversations_tree
+        selected_ids = {str(tree.item(item)['tags'][0]) for item in tree.selection() if tree.item(item)['tags']}
+        scroll_position = tree.yview()[0]
+        
+        # Clear existing items
+        for item in tree.get_children():
+            tree.delete(item)
+        
+        for values, tags in rows:
+            item = tree.insert('', 'end', values=values, tags=tags)
+            if tags[0] in selected_ids:
+                tree.selection_add(item)
+        
+        if keep_view:
+            tree.yview_moveto(scroll_position)
+        self.conversation_rows = rows
+        self.show_conversation_page_status()
+    
+    def show_conversation_page_status(self):
+        """Update the page indicator and report the page transfer size"""
+        pager = self.conversations_pager
+        if pager is not None:
+            last_page = "" if pager.has_more else " (last)"
+            self.admin.conversation_page_label.config(text=f"Page {pager.page_number}{last_page}")
+            self.admin.status_label.config(
+                text=f"Conversations: {len(self.conversation_rows)} rows, "
+                     f"{format_bytes(pager.last_page_bytes)} transferred", fg='green')
+    
     def filter_conversations(self):
         """Filter conversations by date range"""
         try:
             date_from = datetime.strptime(self.admin.date_from_var.get(), '%Y-%m-%d')
             date_to = datetime.strptime(self.admin.date_to_var.get(), '%Y-%m-%d') + timedelta(days=1)
             
-            # Clear existing items
-            for item in self.admin.conversations_tree.get_children():
-                self.admin.conversations_tree.delete(item)
-            
-            # Get filtered conversations (limit to 100 for date filtering)
-            conversations = list(self.admin.conversations_collection.find({
-                'createdAt': {'$gte': date_from, '$lt': date_to}
-            }).sort('createdAt', -1).limit(100))
-            
-            for conv in conversations:
-                # Get user name
-                user_name = "Unknown"
-                user = self.admin.users_collection.find_one({'_id': conv['userId']})
-                if user:
-                    user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}"
-                
-                # Format created date
-                created = conv.get('createdAt', '').strftime('%Y-%m-%d %H:%M')
-                
-                # Format duration
-                duration = conv.get('duration', 0)
-                duration_str = f"{duration//60}m {duration%60}s" if duration > 0 else "0s"
-                
-                # Insert into treeview with full ObjectId stored in tags
-                self.admin.conversations_tree.insert('', 'end', 
-                    values=(
-                        str(conv['_id'])[:8] + '...',
-                        user_name,
-                        conv.get('title', 'Untitled'),
-                        conv.get('scenario', 'general'),
-                        len(conv.get('messages', [])),
-                        conv.get('rating', 'Not rated'),
-                        duration_str,
-                        created
-                    ),
-                    tags=(str(conv['_id']),)  # Store full ObjectId as tag
-                )
+            # Page through the conversations in the date range
+            self.start_conversation_pages({'createdAt': {'$gte': date_from, '$lt': date_to}})
                 
         except ValueError:
             messagebox.showerror("Error", "Invalid date format. Please use YYYY-MM-DD")
@@ -1376,73 +1581,27 @@ Updated: {company.get('updatedAt', 'Unknown')}
                 self.load_conversations()  # Load all if empty
                 return
             
-            conversations = []
-            users = []  # Initialize users list
-            
-            # Try to search by user ID first (ObjectId)
+            # Match the search term as a user ID (stored as ObjectId or string)
+            user_ids = [search_term]
             try:
-                # Convert search term to ObjectId if it's a valid ObjectId string
-                user_object_id = ObjectId(search_term)
-                conversations = list(self.admin.conversations_collection.find({
-                    'userId': user_object_id
-                }).sort('createdAt', -1).limit(30))
+                user_ids.append(ObjectId(search_term))
             except:
-                # If ObjectId conversion fails, try as string
-                conversations = list(self.admin.conversations_collection.find({
-                    'userId': search_term
-                }).sort('createdAt', -1).limit(30))
+                pass
             
-            # Also search by user name/email (combine with user ID search)
+            # Also search by user name/email (the term is matched literally)
+            pattern = re.escape(search_term)
             name_users = list(self.admin.users_collection.find({
                 '$or': [
-                    {'firstName': {'$regex': search_term, '$options': 'i'}},
-                    {'lastName': {'$regex': search_term, '$options': 'i'}},
-                    {'email': {'$regex': search_term, '$options': 'i'}}
+                    {'firstName': {'$regex': pattern, '$options': 'i'}},
+                    {'lastName': {'$regex': pattern, '$options': 'i'}},
+                    {'email': {'$regex': pattern, '$options': 'i'}}
                 ]
-            }))
-            
-            # Add conversations from name/email search
-            if name_users:
-                user_ids = [user['_id'] for user in name_users]
-                name_conversations = list(self.admin.conversations_collection.find({
-                    'userId': {'$in': user_ids}
-                }).sort('createdAt', -1).limit(30))
-                
-                # Combine conversations and remove duplicates
-                existing_ids = {conv['_id'] for conv in conversations}
-                for conv in name_conversations:
-                    if conv['_id'] not in existing_ids:
-                        conversations.append(conv)
-            
-            # Combine users for display
-            users = name_users
+            }, {'_id': 1}))
+            for user in name_users:
+                user_ids.extend([user['_id'], str(user['_id'])])
             
-            for conv in conversations:
-                # Get user information
-                user = next((u for u in users if u['_id'] == conv['userId']), None)
-                user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}" if user else "Unknown User"
-                
-                # Format created date
-                created = conv.get('createdAt', '').strftime('%Y-%m-%d %H:%M')
-                
-                # Format duration
-                duration = conv.get('duration', 0)
-                duration_str = f"{duration//60}m {duration%60}s" if duration > 0 else "0s"
-                
-                # Insert into treeview with full ObjectId stored in tags
-                self.admin.conversations_tree.insert('', 'end', 
-                    values=(
-                        str(conv['_id'])[:8] + '...',
-                        user_name,
-                        conv.get('title', 'Untitled'),
-                        conv.get('scenario', 'general'),
-                        len(conv.get('messages', [])),
-                        conv.get('rating', 'Not rated'),
-                        duration_str,
-                        created
-                    ),
-                    tags=(str(conv['_id']),)  # Store full ObjectId as tag
-                )
+            # Page through the conversations of all matching users
+            self.start_conversation_pages({'userId': {'$in': user_ids}})
                 
         except SecurityError as e:
             SecurityAuditLogger.log_security_violation(
@@ -1479,18 +1638,31 @@ Updated: {company.get('updatedAt', 'Unknown')}
                 return
             
             conversation_object_id = tags[0]  # First tag contains the full ObjectId
+            self.show_conversation_window(ObjectId(conversation_object_id))
             
-            # Find the conversation document using the full ObjectId
-            from bson import ObjectId
-            conversation = self.admin.conversations_collection.find_one({'_id': ObjectId(conversation_object_id)})
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to view conversation: {str(e)}")
+    
+    def show_conversation_window(self, conversation_id):
+        """Open the detail window for a conversation by its ObjectId"""
+        try:
+            # Find the conversation document with only the first page of messages
+            conversations = list(self.admin.conversations_collection.aggregate([
+                {'$match': {'_id': conversation_id}},
+                {'$addFields': {
+                    'messageCount': {'$size': {'$ifNull': ['$messages', []]}},
+                    'messages': {'$slice': [{'$ifNull': ['$messages', []]}, 0, TRANSCRIPT_PAGE_SIZE]}
+                }}
+            ]))
             
-            if not conversation:
+            if not conversations:
                 messagebox.showerror("Error", "Conversation not found")
                 return
+            conversation = conversations[0]
             
             # Get user information
-            user = self.admin.users_collection.find_one({'_id': conversation['userId']})
-            user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}" if user else "Unknown User"
+            user = self.get_user_lookup().get_user(conversation.get('userId'))
+            user_name = format_user_name(user, "Unknown User")
             
             # Create conversation detail window
             detail_window = tk.Toplevel(self.admin.root)
@@ -1508,33 +1680,57 @@ Updated: {company.get('updatedAt', 'Unknown')}
             # Create text widget with scrollbar for messages
             messages_text = tk.Text(messages_frame, wrap='word', font=('Consolas', 10))
             messages_scrollbar = tk.Scrollbar(messages_frame, orient='vertical', command=messages_text.yview)
-            messages_text.configure(yscrollcommand=messages_scrollbar.set)
             
             # Pack messages widget
             messages_text.pack(side='left', fill='both', expand=True)
             messages_scrollbar.pack(side='right', fill='y')
             
-            # Add messages to the text widget
-            messages = conversation.get('messages', [])
-            if messages:
-                for i, message in enumerate(messages):
-                    role = message.get('role', 'unknown')
-                    content = message.get('content', '')
-                    timestamp = message.get('timestamp', '').strftime('%Y-%m-%d %H:%M:%S') if message.get('timestamp') else 'No timestamp'
-                    tokens = message.get('tokens', 0)
-                    
-                    # Format message with better styling
-                    messages_text.insert(tk.END, f"--- Message {i+1} ---\n")
-                    messages_text.insert(tk.END, f"Role: {role.upper()}\n")
-                    messages_text.insert(tk.END, f"Time: {timestamp}\n")
-                    messages_text.insert(tk.END, f"Tokens: {tokens}\n")
-                    messages_text.insert(tk.END, f"Content:\n{content}\n\n")
-                    messages_text.insert(tk.END, "=" * 80 + "\n\n")
+            # Render the transcript one page at a time, fetching the next page
+            # with a $slice projection when the view nears the end
+            message_count = conversation.get('messageCount', 0)
+            transcript = {'loaded': 0, 'loading': False}
+            
+            def append_page(messages):
+                messages_text.config(state='normal')
+                messages_text.insert(tk.END, self.format_transcript_page(messages, transcript['loaded']))
+                messages_text.config(state='disabled')
+                transcript['loaded'] += len(messages)
+            
+            def load_more_messages():
+                if transcript['loading'] or transcript['loaded'] >= message_count:
+                    return
+                transcript['loading'] = True
+                try:
+                    page = list(self.admin.conversations_collection.aggregate([
+                        {'$match': {'_id': conversation_id}},
+                        {'$project': {'messages': {'$slice': [
+                            {'$ifNull': ['$messages', []]}, transcript['loaded'], TRANSCRIPT_PAGE_SIZE
+                        ]}}}
+                    ]))
+                    messages = page[0].get('messages', []) if page else []
+                    if messages:
+                        append_page(messages)
+                    else:
+                        transcript['loaded'] = message_count  # Transcript shrank meanwhile
+                except Exception as e:
+                    messagebox.showerror("Error", f"Failed to load messages: {str(e)}")
+                finally:
+                    transcript['loading'] = False
+            
+            def on_messages_scroll(first, last):
+                messages_scrollbar.set(first, last)
+                if float(last) > 0.9:
+                    messages_text.after_idle(load_more_messages)
+            
+            messages_text.configure(yscrollcommand=on_messages_scroll)
+            
+            if message_count:
+                append_page(conversation.get('messages', []))
             else:
                 messages_text.insert(tk.END, "No messages found in this conversation.")
-            
-            # Make text widget read-only
-            messages_text.config(state='disabled')
+                
+                # Make text widget read-only
+                messages_text.config(state='disabled')
             
             # Conversation Details tab
             details_frame = tk.Frame(notebook)
@@ -1567,7 +1763,7 @@ User ID: {conversation.get('userId', 'N/A')}
 User Email: {user.get('email', 'N/A') if user else 'N/A'}
 
 CONVERSATION STATISTICS:
-Total Messages: {len(messages)}
+Total Messages: {message_count}
 Total Tokens: {conversation.get('totalTokens', 0)}
 Duration: {conversation.get('duration', 0)} seconds
 Rating: {conversation.get('rating', 'Not rated')}
@@ -1605,90 +1801,242 @@ Updated: {conversation.get('updatedAt', 'Unknown')}
         except Exception as e:
             messagebox.showerror("Error", f"Failed to view conversation: {str(e)}")
     
+    def format_transcript_page(self, messages, start_index):
+        """Format a page of conversation messages as one block of text"""
+        parts = []
+        for i, message in enumerate(messages, start_index + 1):
+            role = message.get('role', 'unknown')
+            content = message.get('content', '')
+            timestamp = message.get('timestamp', '').strftime('%Y-%m-%d %H:%M:%S') if message.get('timestamp') else 'No timestamp'
+            tokens = message.get('tokens', 0)
+            
+            # Format message with better styling
+            parts.append(
+                f"--- Message {i} ---\n"
+                f"Role: {role.upper()}\n"
+                f"Time: {timestamp}\n"
+                f"Tokens: {tokens}\n"
+                f"Content:\n{content}\n\n"
+                + "=" * 80 + "\n\n"
+            )
+        return ''.join(parts)
+    
     @secure_input_wrapper
-    def export_conversations(self):
-        """Export conversations to JSON"""
+    def search_conversation_messages(self):
+        """Search conversation message content and show ranked results with snippets"""
+        if not self.admin.connected:
+            return
+        
         try:
-            filename = simpledialog.askstring("Export", "Enter filename (without extension):")
-            if not filename:
+            # The query only reaches $text or escaped regexes, so it is not run
+            # through the input validator (which rejects any non-empty input)
+            query = self.admin.message_search_var.get().strip()
+            if not query:
                 return
             
-            # Validate and sanitize filename
-            filename = InputValidator.validate_and_sanitize_input(
-                filename, 'text', is_required=True
-            )
+            engine = self.get_message_search()
             
-            # Remove any dangerous characters from filename
-            filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-            if not filename:
-                filename = "export"
+            # Results window
+            results_window = tk.Toplevel(self.admin.root)
+            results_window.title(f"Message Search - {query}")
+            results_window.geometry("1100x600")
             
-            # Ask user what to export
-            export_choice = messagebox.askyesnocancel(
-                "Export Options", 
-                "What would you like to export?\n\n"
-                "YES = Currently visible conversations (30 max)\n"
-                "NO = All conversations in database\n"
-                "CANCEL = Cancel export"
-            )
+            columns = ('Score', 'User', 'Title', 'Created', 'Matches', 'Snippet')
+            results_tree = tk.ttk.Treeview(results_window, columns=columns, show='headings', height=20)
+            for col in columns:
+                results_tree.heading(col, text=col)
+                results_tree.column(col, width=500 if col == 'Snippet' else 90)
+            results_tree.pack(fill='both', expand=True, padx=10, pady=10)
             
-            if export_choice is None:  # Cancel
-                return
+            nav_frame = tk.Frame(results_window)
+            nav_frame.pack(fill='x', padx=10, pady=5)
+            status = tk.Label(nav_frame, text="Searching...")
+            status.pack(side='left')
             
-            filename += ".json"
+            state = {'page': 0, 'pages': 0}
             
-            if export_choice:  # Export visible conversations
-                # Get conversations currently visible in the treeview
-                conversations = []
-                for item in self.admin.conversations_tree.get_children():
-                    tags = self.admin.conversations_tree.item(item)['tags']
+            def show_results(result):
+                if not results_window.winfo_exists():
+                    return
+                for item in results_tree.get_children():
+                    results_tree.delete(item)
+                
+                user_names = self.get_user_lookup().get_names(row['userId'] for row in result['results'])
+                for row in result['results']:
+                    created = row['createdAt'].strftime('%Y-%m-%d') if row.get('createdAt') else 'N/A'
+                    results_tree.insert('', 'end', values=(
+                        f"{row['score']:.2f}",
+                        self.get_user_lookup().name_for(user_names, row['userId']),
+                        row['title'],
+                        created,
+                        row['matchCount'],
+                        row['snippet']
+                    ), tags=(str(row['id']),))
+                
+                state['page'], state['pages'] = result['page'], result['pages']
+                status.config(text=f"{result['total']:,} conversations - page {result['page'] + 1} of "
+                                   f"{max(result['pages'], 1)} ({result['engine']}, {result['elapsed_ms']:.0f}ms)")
+            
+            def run_search(page):
+                status.config(text="Building local search index..." if engine.text_index is False and engine.local_index is None
+                              else "Searching...")
+                
+                def worker():
+                    try:
+                        result = engine.search(query, page)
+                        self.admin.root.after(0, lambda: show_results(result))
+                    except Exception as e:
+                        error = str(e)
+                        self.admin.root.after(0, lambda: messagebox.showerror("Error", f"Message search failed: {error}"))
+                
+                threading.Thread(target=worker, daemon=True).start()
+            
+            def change_page(delta):
+                page = state['page'] + delta
+                if 0 <= page < state['pages']:
+                    run_search(page)
+            
+            def open_result(event=None):
+                selected = results_tree.selection()
+                if selected:
+                    tags = results_tree.item(selected[0])['tags']
                     if tags:
-                        from bson import ObjectId
-                        conv = self.admin.conversations_collection.find_one({'_id': ObjectId(tags[0])})
-                        if conv:
-                            conversations.append(conv)
-            else:  # Export all conversations
-                conversations = list(self.admin.conversations_collection.find().sort('createdAt', -1))
+                        self.show_conversation_window(ObjectId(tags[0]))
             
-            if not conversations:
-                messagebox.showwarning("Warning", "No conversations to export")
+            tk.Button(nav_frame, text="Next ▶", command=lambda: change_page(1)).pack(side='right', padx=5)
+            tk.Button(nav_frame, text="◀ Previous", command=lambda: change_page(-1)).pack(side='right', padx=5)
+            results_tree.bind('<Double-1>', open_result)
+            
+            run_search(0)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to search messages: {str(e)}")
+    
+    @secure_input_wrapper
+    def export_conversations(self):
+        """Export conversations to newline-delimited JSON"""
+        try:
+            filename = simpledialog.askstring("Export", "Enter filename (without extension):")
+            if not filename:
                 return
             
-            # Convert ObjectId to string for JSON serialization
-            for conv in conversations:
-                conv['_id'] = str(conv['_id'])
-                conv['userId'] = str(conv['userId'])
-                if 'createdAt' in conv and conv['createdAt']:
-                    conv['createdAt'] = conv['createdAt'].isoformat()
-                if 'updatedAt' in conv and conv['updatedAt']:
-                    conv['updatedAt'] = conv['updatedAt'].isoformat()
-                
-                # Convert message timestamps
-                if 'messages' in conv:
-                    for message in conv['messages']:
-                        if 'timestamp' in message and message['timestamp']:
-                            message['timestamp'] = message['timestamp'].isoformat()
+            # Remove any dangerous characters from filename (the 'text' input
+            # validator rejects any non-empty input, so it is not used here)
+            filename = re.sub(r'[<>:"/\\|?*]', '_', filename.strip())
+            if not filename:
+                filename = "export"
             
-            # Save to file
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(conversations, f, indent=2, ensure_ascii=False)
+            # Ask user what to export
+            export_choice = messagebox.askyesnocancel(
+                "Export Options", 
+                "What would you like to export?\n\n"
+                "YES = Currently visible conversations\n"
+                "NO = All conversations in database\n"
+                "CANCEL = Cancel export"
+            )
+            
+            if export_choice is None:  # Cancel
+                return
+            
+            compress = messagebox.askyesno("Export Options", "Compress the export with gzip?")
+            filename += ".jsonl.gz" if compress else ".jsonl"
+            
+            if export_choice:  # Export visible conversations
+                # Fetch the conversations currently visible in the treeview with one query
+                visible_ids = []
+                for item in self.admin.conversations_tree.get_children():
+                    tags = self.admin.conversations_tree.item(item)['tags']
+                    if tags:
+                        visible_ids.append(ObjectId(tags[0]))
+                
+                if not visible_ids:
+                    messagebox.showwarning("Warning", "No conversations to export")
+                    return
+                
+                query = {'_id': {'$in': visible_ids}}
+                sort = [('createdAt', -1)]
+            else:  # Export all conversations
+                query = {}
+                sort = None
             
             export_type = "visible" if export_choice else "all"
-            messagebox.showinfo("Success", 
-                              f"Exported {len(conversations)} conversations ({export_type}) to {filename}\n\n"
-                              f"File saved in the admin panel directory.")
+            self.admin.status_label.config(text=f"Exporting conversations to {filename}...", fg='blue')
+            
+            def report_progress(stats):
+                self.admin.root.after(0, lambda: self.admin.status_label.config(
+                    text=f"Exporting conversations: {stats['documents']:,} written "
+                         f"({format_bytes(stats['bytes'])}, {stats['docs_per_sec']:,.0f} docs/s)", fg='blue'))
+            
+            workers = self.get_export_workers()
+            
+            # Parallel exports can keep their part files, listed in an index file
+            merge = True
+            if not export_choice and workers > 1:
+                merge = messagebox.askyesno(
+                    "Export Options",
+                    f"Exporting on {workers} parallel cursors.\n\n"
+                    f"YES = Merge the parts into {filename}\n"
+                    f"NO = Keep the part files and list them in {filename}.index.json"
+                )
+            
+            def run_export():
+                try:
+                    if export_choice or workers == 1:
+                        exporter = JsonLinesExporter(
+                            self.admin.conversations_collection, progress_callback=report_progress
+                        )
+                        stats = exporter.export(filename, query=query, sort=sort, compress=compress)
+                    else:
+                        # Split the full export into _id ranges exported on parallel cursors
+                        exporter = ParallelExporter(
+                            self.admin.conversations_collection, workers=workers, progress_callback=report_progress
+                        )
+                        stats = exporter.export(filename, query=query, compress=compress, merge=merge)
+                    self.admin.root.after(0, lambda: self.finish_conversation_export(stats, export_type))
+                except Exception as e:
+                    error = str(e)
+                    SecurityAuditLogger.log_security_violation(
+                        None, "export_conversations", "error", "unexpected_error", error
+                    )
+                    self.admin.root.after(0, lambda: messagebox.showerror(
+                        "Error", f"An error occurred while exporting conversations: {error}"))
+            
+            # Stream the export in the background so the panel stays responsive
+            threading.Thread(target=run_export, daemon=True).start()
             
-        except SecurityError as e:
-            SecurityAuditLogger.log_security_violation(
-                None, "export_conversations", "filename", "input_validation", str(e)
-            )
-            messagebox.showerror("Security Error", "Invalid filename detected")
         except Exception as e:
             SecurityAuditLogger.log_security_violation(
                 None, "export_conversations", "error", "unexpected_error", str(e)
             )
             messagebox.showerror("Error", "An error occurred while exporting conversations")
     
+    def get_export_workers(self):
+        """Read the export worker setting, falling back to the default when invalid"""
+        try:
+            workers = int(self.admin.export_workers_var.get())
+        except (TypeError, ValueError, tk.TclError):
+            return DEFAULT_EXPORT_WORKERS
+        return min(max(workers, 1), MAX_EXPORT_WORKERS)
+    
+    def finish_conversation_export(self, stats, export_type):
+        """Report a finished conversation export (runs on the Tk thread)"""
+        throughput = (f"{stats['documents']:,} conversations, {format_bytes(stats['bytes'])} "
+                      f"in {stats['elapsed']:.1f}s ({stats['docs_per_sec']:,.0f} docs/s, "
+                      f"{stats['mb_per_sec']:.1f} MB/s")
+        if stats.get('workers'):
+            throughput += f", {stats['workers']} workers"
+        throughput += ")"
+        self.admin.status_label.config(text=f"Export finished: {throughput}", fg='green')
+        
+        if not stats['documents']:
+            messagebox.showwarning("Warning", "No conversations to export")
+            return
+        
+        messagebox.showinfo("Success", 
+                          f"Exported {stats['documents']} conversations ({export_type}) to {stats['path']}\n\n"
+                          f"{throughput}\n\n"
+                          f"File saved in the admin panel directory.")
+    
     def load_translations(self, event=None):
         """Load translations for selected language and category"""
         if not self.admin.connected:
@@ -2084,57 +2432,7 @@ Updated: {conversation.get('updatedAt', 'Unknown')}
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
-            # Clear existing items
-            for item in self.admin.ratings_tree.get_children():
-                self.admin.ratings_tree.delete(item)
-            
-            # Get conversations with AI ratings
-            conversations = list(self.admin.conversations_collection.find({
-                'aiRatings': {'$exists': True, '$ne': None}
-            }).sort('createdAt', -1).limit(100))
-            
-            for conv in conversations:
-                ratings = conv.get('aiRatings', {})
-                user_info = conv.get('userId', {})
-                
-                # Get user name
-                user_name = "Unknown"
-                if isinstance(user_info, dict):
-                    user_name = f"{user_info.get('firstName', '')} {user_info.get('lastName', '')}".strip()
-                elif isinstance(user_info, str):
-                    # If userId is just an ObjectId string, try to get user details
-                    try:
-                        user = self.admin.users_collection.find_one({'_id': ObjectId(user_info)})
-                        if user:
-                            user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
-                    except:
-                        pass
-                
-                # Calculate comprehensive scoring
-                intro_score = ratings.get('introduction', 0)
-                mapping_score = ratings.get('mapping', 0)
-                presentation_score = ratings.get('productPresentation', 0)
-                objection_score = ratings.get('objectionHandling', 0)
-                close_score = ratings.get('close', 0)
-                
-                total_score = intro_score + mapping_score + presentation_score + objection_score + close_score
-                max_possible = ratings.get('maxPossibleScore', 50)
-                percentage = round((total_score / max_possible * 100), 1) if max_possible > 0 else 0
-                
-                # Insert into tree with enhanced scoring display
-                self.admin.ratings_tree.insert('', 'end', values=(
-                    str(conv['_id'])[:8] + '...',
-                    user_name,
-                    f"{total_score}/{max_possible} ({percentage}%)",
-                    f"{intro_score}/10",
-                    f"{mapping_score}/10",
-                    f"{presentation_score}/10",
-                    f"{objection_score}/10",
-                    f"{close_score}/10",
-                    conv.get('createdAt', '').strftime('%Y-%m-%d') if conv.get('createdAt') else ''
-                ))
-            
-            messagebox.showinfo("Success", f"Loaded {len(conversations)} conversations with ratings")
+            self.start_rating_pages()
             
         except Exception as e:
             SecurityAuditLogger.log_security_violation(
@@ -2142,20 +2440,97 @@ Updated: {conversation.get('updatedAt', 'Unknown')}
             )
             messagebox.showerror("Error", f"Failed to load ratings: {str(e)}")
     
+    def start_rating_pages(self, min_score=None, max_score=None):
+        """Show the first page of rated conversations within the score range, newest first"""
+        # Scores are computed and filtered on the server, so every rated conversation can match
+        self.ratings_pager = KeysetPager(
+            self.admin.conversations_collection,
+            query=RATED_CONVERSATIONS_QUERY,
+            sort_field='createdAt',
+            descending=True,
+            page_size=RATINGS_PAGE_SIZE,
+            pipeline=rating_score_stages(min_score, max_score)
+        )
+        self.rating_details_cache.clear()  # Pick up re-rated conversations
+        self.show_rating_rows(self.ratings_pager.next_page())
+    
+    def next_ratings_page(self):
+        """Show the next (older) page of ratings"""
+        pager = self.ratings_pager
+        if pager is None or not pager.has_more:
+            return
+        
+        try:
+            self.show_rating_rows(pager.next_page())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load ratings: {str(e)}")
+    
+    def previous_ratings_page(self):
+        """Show the previous (newer) page of ratings"""
+        pager = self.ratings_pager
+        if pager is None or not pager.has_previous:
+            return
+        
+        try:
+            self.show_rating_rows(pager.previous_page())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load ratings: {str(e)}")
+    
+    def show_rating_rows(self, conversations):
+        """Replace the ratings treeview contents with a page of scored conversations"""
+        # Clear existing items
+        for item in self.admin.ratings_tree.get_children():
+            self.admin.ratings_tree.delete(item)
+        
+        # Resolve user names for ObjectId/string userIds with one query
+        lookup = self.get_user_lookup()
+        user_names = lookup.get_names(
+            conv.get('userId') for conv in conversations if not isinstance(conv.get('userId'), dict)
+        )
+        
+        for conv in conversations:
+            ratings = conv.get('aiRatings', {})
+            user_info = conv.get('userId', {})
+            
+            # Get user name (populated user documents carry the name inline)
+            if isinstance(user_info, dict):
+                user_name = f"{user_info.get('firstName', '')} {user_info.get('lastName', '')}".strip()
+            else:
+                user_name = lookup.name_for(user_names, user_info)
+            
+            # Insert into tree with the server-computed scoring
+            self.admin.ratings_tree.insert('', 'end', values=(
+                str(conv['_id'])[:8] + '...',
+                user_name,
+                f"{conv['totalScore']}/{conv['maxPossible']} ({conv['percentage']}%)",
+                f"{ratings.get('introduction', 0)}/10",
+                f"{ratings.get('mapping', 0)}/10",
+                f"{ratings.get('productPresentation', 0)}/10",
+                f"{ratings.get('objectionHandling', 0)}/10",
+                f"{ratings.get('close', 0)}/10",
+                conv.get('createdAt', '').strftime('%Y-%m-%d') if conv.get('createdAt') else ''
+            ), tags=(str(conv['_id']),))  # Store full ObjectId as tag
+        
+        # Update the page indicator
+        pager = self.ratings_pager
+        last_page = "" if pager.has_more else " (last)"
+        self.admin.ratings_page_label.config(text=f"Page {pager.page_number}{last_page}")
+        self.admin.status_label.config(text=f"Ratings: {len(conversations)} conversations on this page", fg='green')
+    
     def filter_ratings(self):
         """Filter ratings by score range"""
         try:
-            min_rating = int(self.admin.min_rating_var.get())
-            max_rating = int(self.admin.max_rating_var.get())
+            if not self.admin.connected:
+                messagebox.showerror("Error", "Not connected to database")
+                return
             
-            for item in self.admin.ratings_tree.get_children():
-                values = self.admin.ratings_tree.item(item)['values']
-                total_score = int(values[2].split('/')[0])  # Extract score from "XX/50"
-                
-                if min_rating <= total_score <= max_rating:
-                    self.admin.ratings_tree.reattach(item, '', 'end')
-                else:
-                    self.admin.ratings_tree.detach(item)
+            # Empty bounds leave that side of the range open
+            min_text = self.admin.min_rating_var.get().strip()
+            max_text = self.admin.max_rating_var.get().strip()
+            min_rating = int(min_text) if min_text else None
+            max_rating = int(max_text) if max_text else None
+            
+            self.start_rating_pages(min_rating, max_rating)
                     
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numeric values for rating range")
@@ -2170,30 +2545,17 @@ Updated: {conversation.get('updatedAt', 'Unknown')}
                 messagebox.showwarning("Warning", "Please select a conversation to view details")
                 return
             
-            values = self.admin.ratings_tree.item(selected_item[0])['values']
+            item = self.admin.ratings_tree.item(selected_item[0])
+            values = item['values']
             conversation_id = values[0]
             
-            # Find the full conversation ID
-            conv_id = None
-            for item in self.admin.ratings_tree.get_children():
-                item_values = self.admin.ratings_tree.item(item)['values']
-                if item_values[0] == conversation_id:
-                    # Find the actual conversation
-                    conversations = list(self.admin.conversations_collection.find({
-                        'aiRatings': {'$exists': True, '$ne': None}
-                    }))
-                    
-                    for conv in conversations:
-                        if str(conv['_id']).startswith(conversation_id.replace('...', '')):
-                            conv_id = conv['_id']
-                            break
-                    break
-            
-            if not conv_id:
+            # Get the full conversation ID from tags
+            tags = item['tags']
+            if not tags:
                 messagebox.showerror("Error", "Could not find conversation details")
                 return
             
-            conversation = self.admin.conversations_collection.find_one({'_id': conv_id})
+            conversation = self.get_rating_details(tags[0])
             if not conversation:
                 messagebox.showerror("Error", "Conversation not found")
                 return
@@ -2310,7 +2672,7 @@ CONVERSATION SUMMARY:
 Title: {conversation.get('title', 'N/A')}
 Scenario: {conversation.get('scenario', 'N/A')}
 Duration: {conversation.get('duration', 0)} seconds
-Messages: {len(conversation.get('messages', []))}
+Messages: {conversation.get('messageCount', 0)}
 """
             
             details_text.insert('1.0', details_content)
@@ -2319,6 +2681,25 @@ Messages: {len(conversation.get('messages', []))}
         except Exception as e:
             messagebox.showerror("Error", f"Failed to view rating details: {str(e)}")
     
+    def get_rating_details(self, conversation_id):
+        """Fetch the rating fields of a conversation by _id, cached for repeated opens"""
+        cache = self.rating_details_cache
+        if conversation_id in cache:
+            cache.move_to_end(conversation_id)
+            return cache[conversation_id]
+        
+        # Count messages on the server instead of transferring them
+        conversation = next(self.admin.conversations_collection.aggregate([
+            {'$match': {'_id': ObjectId(conversation_id)}},
+            {'$project': RATING_DETAILS_PROJECTION}
+        ]), None)
+        
+        if conversation:
+            cache[conversation_id] = conversation
+            if len(cache) > RATING_DETAILS_CACHE_SIZE:
+                cache.popitem(last=False)
+        return conversation
+    
     def export_ratings(self):
         """Export ratings data to CSV"""
         try:
@@ -2326,47 +2707,56 @@ Messages: {len(conversation.get('messages', []))}
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
-            # Get all conversations with ratings
-            conversations = list(self.admin.conversations_collection.find({
-                'aiRatings': {'$exists': True, '$ne': None}
-            }))
-            
-            if not conversations:
+            if not self.admin.conversations_collection.count_documents(RATED_CONVERSATIONS_QUERY, limit=1):
                 messagebox.showinfo("Info", "No ratings data found to export")
                 return
             
-            # Create comprehensive CSV content with detailed scoring
-            csv_content = "Conversation ID,User,Total Score,Max Possible,Percentage,Opening,Discovery,Presentation,Objections,Closing,Date,Feedback\n"
+            lookup = self.get_user_lookup()
             
-            for conv in conversations:
-                ratings = conv.get('aiRatings', {})
-                feedback = conv.get('aiRatingFeedback', '').replace('"', '""').replace('\n', ' ')
-                
-                # Get user name
-                user_info = conv.get('userId', {})
-                user_name = "Unknown"
-                if isinstance(user_info, dict):
-                    user_name = f"{user_info.get('firstName', '')} {user_info.get('lastName', '')}".strip()
-                
-                # Calculate scores
-                intro_score = ratings.get('introduction', 0)
-                mapping_score = ratings.get('mapping', 0)
-                presentation_score = ratings.get('productPresentation', 0)
-                objection_score = ratings.get('objectionHandling', 0)
-                close_score = ratings.get('close', 0)
-                
-                total_score = intro_score + mapping_score + presentation_score + objection_score + close_score
-                max_possible = ratings.get('maxPossibleScore', 50)
-                percentage = round((total_score / max_possible * 100), 1) if max_possible > 0 else 0
-                
-                csv_content += f'"{str(conv["_id"])}","{user_name}",{total_score},{max_possible},{percentage}%,{intro_score},{mapping_score},{presentation_score},{objection_score},{close_score},"{conv.get("createdAt", "").strftime("%Y-%m-%d") if conv.get("createdAt") else ""}","{feedback}"\n'
+            def format_batch(conversations):
+                # Resolve the batch's user names with one query
+                user_names = lookup.get_names(
+                    conv.get('userId') for conv in conversations if not isinstance(conv.get('userId'), dict)
+                )
+                rows = []
+                for conv in conversations:
+                    ratings = conv.get('aiRatings', {})
+                    
+                    # Get user name (populated user documents carry the name inline)
+                    user_info = conv.get('userId', {})
+                    if isinstance(user_info, dict):
+                        user_name = f"{user_info.get('firstName', '')} {user_info.get('lastName', '')}".strip()
+                    else:
+                        user_name = lookup.name_for(user_names, user_info)
+                    
+                    # Calculate scores
+                    stage_scores = [ratings.get(stage, 0) for stage in RATING_STAGES]
+                    total_score = sum(stage_scores)
+                    max_possible = ratings.get('maxPossibleScore', 50)
+                    percentage = round((total_score / max_possible * 100), 1) if max_possible > 0 else 0
+                    
+                    rows.append([
+                        str(conv['_id']),
+                        user_name,
+                        total_score,
+                        max_possible,
+                        f"{percentage}%",
+                        *stage_scores,
+                        conv['createdAt'].strftime('%Y-%m-%d') if conv.get('createdAt') else '',
+                        conv.get('aiRatingFeedback', '')
+                    ])
+                return rows
             
-            # Save to file
             filename = f"ai_ratings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(csv_content)
-            
-            messagebox.showinfo("Success", f"Ratings exported to {filename}")
+            self.run_csv_export(
+                "ratings", filename,
+                ["Conversation ID", "User", "Total Score", "Max Possible", "Percentage", "Opening", "Discovery",
+                 "Presentation", "Objections", "Closing", "Date", "Feedback"],
+                self.admin.conversations_collection.find(
+                    RATED_CONVERSATIONS_QUERY, {'userId': 1, 'createdAt': 1, 'aiRatings': 1, 'aiRatingFeedback': 1}
+                ).sort([('createdAt', -1), ('_id', -1)]).batch_size(CSV_EXPORT_BATCH_SIZE),
+                format_batch
+            )
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export ratings: {str(e)}")
@@ -2378,45 +2768,46 @@ Messages: {len(conversation.get('messages', []))}
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
-            # Get all ratings data
-            conversations = list(self.admin.conversations_collection.find({
-                'aiRatings': {'$exists': True, '$ne': None}
-            }))
+            # Optional report scope
+            date_from = self.admin.report_date_from_var.get().strip()
+            date_to = self.admin.report_date_to_var.get().strip()
+            date_from = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None
+            
+            company = None
+            user_ids = None
+            # Only used for exact and escaped-regex matches (the input validator
+            # rejects any non-empty input)
+            company_text = self.admin.report_company_var.get().strip()
+            if company_text:
+                company = self.find_company(company_text)
+                if not company:
+                    messagebox.showerror("Error", f"Company '{company_text}' not found")
+                    return
+                user_ids = [user['_id'] for user in self.admin.users_collection.find(
+                    {'companyId': {'$in': [company['_id'], str(company['_id'])]}}, {'_id': 1}
+                )]
             
-            if not conversations:
+            # Averages, range and distribution are computed on the server
+            report = rating_report(self.admin.conversations_collection, date_from, date_to, user_ids)
+            
+            if not report['count']:
                 messagebox.showinfo("Info", "No ratings data found to generate report")
                 return
             
-            # Calculate statistics
-            total_conversations = len(conversations)
-            scores = []
-            stage_scores = {
-                'introduction': [],
-                'mapping': [],
-                'productPresentation': [],
-                'objectionHandling': [],
-                'close': []
+            avg_stages = report['stage_averages']
+            distribution = report['distribution']
+            stage_labels = {
+                'introduction': 'Opening', 'mapping': 'Discovery', 'productPresentation': 'Presentation',
+                'objectionHandling': 'Objection Handling', 'close': 'Closing'
             }
             
-            for conv in conversations:
-                ratings = conv.get('aiRatings', {})
-                total_score = sum([
-                    ratings.get('introduction', 0),
-                    ratings.get('mapping', 0),
-                    ratings.get('productPresentation', 0),
-                    ratings.get('objectionHandling', 0),
-                    ratings.get('close', 0)
-                ])
-                scores.append(total_score)
-                
-                for stage in stage_scores:
-                    stage_scores[stage].append(ratings.get(stage, 0))
-            
-            # Calculate averages
-            avg_total = sum(scores) / len(scores) if scores else 0
-            avg_stages = {}
-            for stage, stage_list in stage_scores.items():
-                avg_stages[stage] = sum(stage_list) / len(stage_list) if stage_list else 0
+            scope = []
+            if date_from or date_to:
+                scope.append(f"{date_from.strftime('%Y-%m-%d') if date_from else 'start'} to "
+                             f"{(date_to - timedelta(days=1)).strftime('%Y-%m-%d') if date_to else 'today'}")
+            if company:
+                scope.append(company.get('name', 'Unknown'))
             
             # Create report
             report_window = tk.Toplevel(self.admin.root)
@@ -2429,11 +2820,12 @@ Messages: {len(conversation.get('messages', []))}
             report_content = f"""
 AI CONVERSATION RATING REPORT
 Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Scope: {', '.join(scope) if scope else 'All rated conversations'}
 
 SUMMARY STATISTICS:
-- Total Conversations Analyzed: {total_conversations}
-- Average Total Score: {avg_total:.2f}/50
-- Score Range: {min(scores)} - {max(scores)}
+- Total Conversations Analyzed: {report['count']}
+- Average Total Score: {report['avg_total']:.2f}/50
+- Score Range: {report['min_total']} - {report['max_total']}
 
 STAGE-BY-STAGE AVERAGES:
 - Opening: {avg_stages['introduction']:.2f}/10
@@ -2443,67 +2835,196 @@ STAGE-BY-STAGE AVERAGES:
 - Closing: {avg_stages['close']:.2f}/10
 
 PERFORMANCE DISTRIBUTION:
-- Excellent (40-50): {len([s for s in scores if s >= 40])} conversations
-- Good (30-39): {len([s for s in scores if 30 <= s < 40])} conversations
-- Average (20-29): {len([s for s in scores if 20 <= s < 30])} conversations
-- Needs Improvement (10-19): {len([s for s in scores if 10 <= s < 20])} conversations
-- Poor (0-9): {len([s for s in scores if s < 10])} conversations
+- Excellent (40-50): {distribution[40]} conversations
+- Good (30-39): {distribution[30]} conversations
+- Average (20-29): {distribution[20]} conversations
+- Needs Improvement (10-19): {distribution[10]} conversations
+- Poor (0-9): {distribution[0]} conversations
 
 RECOMMENDATIONS:
-- Focus on improving: {min(avg_stages, key=avg_stages.get).replace('introduction', 'Opening').replace('mapping', 'Discovery').replace('productPresentation', 'Presentation').replace('objectionHandling', 'Objection Handling').replace('close', 'Closing')}
-- Strongest area: {max(avg_stages, key=avg_stages.get).replace('introduction', 'Opening').replace('mapping', 'Discovery').replace('productPresentation', 'Presentation').replace('objectionHandling', 'Objection Handling').replace('close', 'Closing')}
+- Focus on improving: {stage_labels[min(avg_stages, key=avg_stages.get)]}
+- Strongest area: {stage_labels[max(avg_stages, key=avg_stages.get)]}
 """
             
             report_text.insert('1.0', report_content)
             report_text.config(state='disabled')
+            self.admin.status_label.config(text=f"Rating report computed in {report['elapsed_ms']:.0f}ms", fg='green')
             
+        except ValueError:
+            messagebox.showerror("Error", "Invalid date format. Please use YYYY-MM-DD")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to generate rating report: {str(e)}")
     
+    def find_company(self, text):
+        """Find a company by ObjectId, companyId code or exact name (case-insensitive)"""
+        if ObjectId.is_valid(text):
+            company = self.get_company_directory().get(ObjectId(text))
+            if company:
+                return company
+        return self.admin.companies_collection.find_one({'$or': [
+            {'companyId': text},
+            {'name': {'$regex': f"^{re.escape(text)}$", '$options': 'i'}}
+        ]})
+    
+    # Analytics Methods
+    def run_rating_analytics(self):
+        """Load rating analytics in the background and show them in the Analytics tab"""
+        try:
+            if not self.admin.connected:
+                messagebox.showerror("Error", "Not connected to database")
+                return
+            
+            date_from = self.admin.analytics_date_from_var.get().strip()
+            date_to = self.admin.analytics_date_to_var.get().strip()
+            date_from = datetime.strptime(date_from, '%Y-%m-%d') if date_from else None
+            date_to = datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1) if date_to else None
+            
+        except ValueError:
+            messagebox.showerror("Error", "Invalid date format. Please use YYYY-MM-DD")
+            return
+        
+        self.admin.status_label.config(text="Loading rating analytics...", fg='orange')
+        analytics = RatingAnalytics(self.admin.conversations_collection)
+        
+        def worker():
+            try:
+                result = analytics.run(date_from, date_to)
+                self.admin.root.after(0, lambda: self.show_rating_analytics(result))
+            except Exception as e:
+                error = str(e)
+                self.admin.root.after(0, lambda: messagebox.showerror("Error", f"Failed to compute analytics: {error}"))
+        
+        threading.Thread(target=worker, daemon=True).start()
+    
+    def show_rating_analytics(self, result):
+        """Render a RatingAnalytics result as text"""
+        text = self.admin.analytics_text
+        text.delete('1.0', tk.END)
+        
+        if not result['count']:
+            text.insert('1.0', "No rated conversations in the selected range.")
+            self.admin.status_label.config(text="Rating analytics: no data", fg='green')
+            return
+        
+        labels = {
+            'introduction': 'Opening', 'mapping': 'Discovery', 'productPresentation': 'Presentation',
+            'objectionHandling': 'Objections', 'close': 'Closing', 'total': 'Total'
+        }
+        stages = list(RATING_STAGES)
+        lines = [
+            f"RATING ANALYTICS - {result['count']:,} conversations, {result['users']:,} users",
+            "",
+            "PERCENTILES:",
+            f"{'':<14}" + ''.join(f"{'p' + str(p):>8}" for p in PERCENTILES)
+        ]
+        for field, values in result['percentiles'].items():
+            lines.append(f"{labels[field]:<14}" + ''.join(f"{value:>8.1f}" for value in values.values()))
+        
+        lines += ["", "STAGE CORRELATIONS (Pearson):", f"{'':<14}" + ''.join(f"{labels[s]:>14}" for s in stages)]
+        for stage in stages:
+            row = result['correlations'][stage]
+            lines.append(f"{labels[stage]:<14}" + ''.join(f"{row[other]:>14.3f}" for other in stages))
+        lines.append(f"{'vs Total':<14}" + ''.join(f"{result['stage_vs_total'][s]:>14.3f}" for s in stages))
+        
+        lines += ["", "SCORE VS DURATION (per minute):", f"{'':<14}{'Slope':>10}{'Intercept':>12}{'R²':>8}"]
+        for field, fit in result['duration_fits'].items():
+            lines.append(f"{labels[field]:<14}{fit['slope']:>10.3f}{fit['intercept']:>12.2f}{fit['r2']:>8.3f}")
+        
+        lines += ["", "WEEKLY TRENDS:", f"{'Week':<12}{'Count':>8}" + ''.join(f"{labels[s]:>14}" for s in stages) + f"{'Total':>8}"]
+        for week, row in result['weekly'].iterrows():
+            lines.append(f"{week.strftime('%Y-%m-%d'):<12}{int(row['count']):>8}"
+                         + ''.join(f"{row[s]:>14.2f}" for s in stages) + f"{row['total']:>8.2f}")
+        
+        top_users = result['top_users']
+        if len(top_users):
+            user_names = self.get_user_lookup().get_names(top_users.index)
+            lines += ["", "TOP USERS (average total, 5+ rated conversations):"]
+            for user_id, row in top_users.iterrows():
+                name = self.get_user_lookup().name_for(user_names, user_id, default=user_id)
+                lines.append(f"{name:<30}{row['mean']:>8.2f}{int(row['count']):>8} conversations")
+        
+        text.insert('1.0', '\n'.join(lines))
+        self.admin.status_label.config(
+            text=f"Rating analytics: loaded in {result['load_ms']:.0f}ms, computed in {result['compute_ms']:.0f}ms", fg='green')
+    
     # Database Tools Methods
     def create_database_backup(self):
-        """Create a database backup"""
+        """Back up every collection into a new, timestamped backup directory in the background"""
         try:
             if not self.admin.connected:
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
-            # Create backup directory if it doesn't exist
-            backup_dir = "database_backups"
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
+            if self.backup_engine is not None:
+                messagebox.showwarning("Warning", "A backup is already running")
+                return
             
-            # Generate backup filename
+            # Each backup gets its own directory with one or more files per collection
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_filename = f"{backup_dir}/salesbuddy_backup_{timestamp}.json"
+            backup_path = os.path.join(BACKUP_DIRECTORY, f"salesbuddy_backup_{timestamp}")
             
-            # Get all collections
-            collections = ['users', 'companies', 'conversations', 'conversationsummaries', 'translations', 'translationkeys']
-            backup_data = {
-                'backup_info': {
-                    'created_at': datetime.now().isoformat(),
-                    'database_name': self.admin.db.name,
-                    'collections': collections
-                },
-                'data': {}
-            }
+            def report_progress(stats):
+                self.admin.root.after(0, lambda: self.admin.status_label.config(
+                    text=f"Backing up: {stats['documents']:,} documents, {format_bytes(stats['bytes'])} "
+                         f"({stats['docs_per_sec']:,.0f} docs/s, {stats['mb_per_sec']:.1f} MB/s, "
+                         f"{stats['parts_done']} parts done)", fg='blue'))
             
-            # Backup each collection
-            for collection_name in collections:
-                collection = getattr(self.admin, f"{collection_name}_collection", None)
-                if collection:
-                    docs = list(collection.find())
-                    backup_data['data'][collection_name] = docs
+            # Collections are backed up on parallel cursors, large ones in _id ranges
+            engine = BackupEngine(self.admin.db, workers=self.get_export_workers(), progress_callback=report_progress)
+            self.backup_engine = engine
+            self.admin.backup_cancel_button.config(state='normal')
+            self.admin.status_label.config(text="Creating database backup...", fg='blue')
             
-            # Save backup
-            with open(backup_filename, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False, default=str)
+            def run_backup():
+                try:
+                    manifest = engine.backup(backup_path)
+                    self.admin.root.after(0, lambda: self.finish_database_backup(backup_path, manifest))
+                except BackupCancelled:
+                    self.admin.root.after(0, lambda: self.finish_database_backup(backup_path, None))
+                except Exception as e:
+                    error = str(e)
+                    self.admin.root.after(0, lambda: self.finish_database_backup(backup_path, None, error))
             
-            messagebox.showinfo("Success", f"Database backup created: {backup_filename}")
+            # Run in the background so the panel stays responsive
+            threading.Thread(target=run_backup, daemon=True).start()
             
         except Exception as e:
+            self.backup_engine = None
             messagebox.showerror("Error", f"Failed to create backup: {str(e)}")
     
+    def cancel_database_backup(self):
+        """Cancel the running backup; its partial directory is removed"""
+        if self.backup_engine is not None:
+            self.backup_engine.cancel()
+            self.admin.status_label.config(text="Cancelling backup...", fg='orange')
+    
+    def finish_database_backup(self, backup_path, manifest, error=None):
+        """Report a finished, cancelled or failed backup (runs on the Tk thread)"""
+        self.backup_engine = None
+        self.admin.backup_cancel_button.config(state='disabled')
+        
+        if error:
+            self.admin.status_label.config(text="Backup failed", fg='red')
+            messagebox.showerror("Error", f"Failed to create backup: {error}")
+            return
+        if manifest is None:
+            self.admin.status_label.config(text="Backup cancelled", fg='orange')
+            return
+        
+        documents = sum(stats['documents'] for stats in manifest['collections'].values())
+        self.admin.status_label.config(
+            text=f"Backup: {documents:,} documents in {manifest['elapsed']:.1f}s", fg='green')
+        
+        # Timing report, to size the backup window
+        report_window = tk.Toplevel(self.admin.root)
+        report_window.title("Database Backup Report")
+        report_window.geometry("900x400")
+        
+        report_text = scrolledtext.ScrolledText(report_window, font=('Courier', 10))
+        report_text.pack(fill='both', expand=True, padx=10, pady=10)
+        report_text.insert('1.0', f"Backup created: {backup_path}\n\n{format_backup_report(manifest)}\n")
+        report_text.config(state='disabled')
+    
     def restore_database_backup(self):
         """Restore database from backup"""
         try:
@@ -2511,52 +3032,82 @@ RECOMMENDATIONS:
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
+            # Select the backup directory (the one holding manifest.json)
+            from tkinter import filedialog
+            backup_path = filedialog.askdirectory(
+                title="Select backup directory to restore",
+                initialdir=BACKUP_DIRECTORY if os.path.isdir(BACKUP_DIRECTORY) else '.'
+            )
+            
+            if not backup_path:
+                return
+            
+            if not os.path.isfile(os.path.join(backup_path, MANIFEST_FILE)):
+                messagebox.showerror("Error", f"{backup_path} is not a database backup (no {MANIFEST_FILE})")
+                return
+            
             # Ask for confirmation
             if not messagebox.askyesno("Confirm Restore", "This will overwrite existing data. Are you sure?"):
                 return
             
-            # Open file dialog to select backup file
+            engine = BackupEngine(self.admin.db)
+            
+            # Check every file against the manifest before dropping anything
+            damaged = [name for name, result in engine.verify(backup_path, sample_size=0).items() if not result['ok']]
+            if damaged:
+                messagebox.showerror("Error", f"Backup files do not match the manifest: {', '.join(damaged)}")
+                return
+            
+            results = engine.restore(backup_path)
+            documents = sum(result['documents'] for result in results.values())
+            messagebox.showinfo("Success", f"Database restored from {backup_path}\n"
+                                           f"{documents:,} documents in {len(results)} collections")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to restore backup: {str(e)}")
+    
+    def verify_database_backup(self):
+        """Check a backup's files and compare a sample of it with the database"""
+        try:
+            if not self.admin.connected:
+                messagebox.showerror("Error", "Not connected to database")
+                return
+            
             from tkinter import filedialog
-            backup_file = filedialog.askopenfilename(
-                title="Select backup file to restore",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            backup_path = filedialog.askdirectory(
+                title="Select backup directory to verify",
+                initialdir=BACKUP_DIRECTORY if os.path.isdir(BACKUP_DIRECTORY) else '.'
             )
             
-            if not backup_file:
+            if not backup_path:
                 return
             
-            # Load backup data
-            with open(backup_file, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
+            results = BackupEngine(self.admin.db).verify(backup_path)
             
-            # Restore each collection
-            collections_data = backup_data.get('data', {})
-            for collection_name, docs in collections_data.items():
-                collection = getattr(self.admin, f"{collection_name}_collection", None)
-                if collection:
-                    # Clear existing data
-                    collection.delete_many({})
-                    # Insert backup data
-                    if docs:
-                        collection.insert_many(docs)
+            content = f"Backup: {backup_path}\n\n"
+            for name, result in results.items():
+                content += f"{name}: {'OK' if result['ok'] else 'FAILED'}\n"
+                content += f"  Document count: {'ok' if result['documents_ok'] else 'mismatch'}\n"
+                content += f"  Checksum: {'ok' if result['checksum_ok'] else 'mismatch'}\n"
+                content += f"  Sample: {result['sampled'] - result['sample_mismatches']}/{result['sampled']} " \
+                           f"documents identical to the database\n"
             
-            messagebox.showinfo("Success", f"Database restored from {backup_file}")
+            if all(result['ok'] for result in results.values()):
+                messagebox.showinfo("Backup Verified", content)
+            else:
+                # Sample mismatches also appear when documents changed after the backup
+                messagebox.showwarning("Backup Verification", content)
             
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to restore backup: {str(e)}")
+            messagebox.showerror("Error", f"Failed to verify backup: {str(e)}")
     
     def list_database_backups(self):
         """List available database backups"""
         try:
-            backup_dir = "database_backups"
-            if not os.path.exists(backup_dir):
-                messagebox.showinfo("Info", "No backup directory found")
-                return
-            
-            backup_files = [f for f in os.listdir(backup_dir) if f.endswith('.json')]
+            backups = list_backups(BACKUP_DIRECTORY)
             
-            if not backup_files:
-                messagebox.showinfo("Info", "No backup files found")
+            if not backups:
+                messagebox.showinfo("Info", "No backups found")
                 return
             
             # Create window to display backups
@@ -2568,16 +3119,17 @@ RECOMMENDATIONS:
             backup_text.pack(fill='both', expand=True, padx=10, pady=10)
             
             content = "Available Database Backups:\n\n"
-            for backup_file in sorted(backup_files, reverse=True):
-                file_path = os.path.join(backup_dir, backup_file)
-                file_size = os.path.getsize(file_path)
-                file_time = os.path.getmtime(file_path)
-                file_date = datetime.fromtimestamp(file_time).strftime('%Y-%m-%d %H:%M:%S')
-                
-                content += f"File: {backup_file}\n"
-                content += f"Date: {file_date}\n"
-                content += f"Size: {file_size:,} bytes\n"
-                content += f"Path: {file_path}\n"
+            for manifest in backups:
+                collections = manifest['collections']
+                documents = sum(stats['documents'] for stats in collections.values())
+                compressed = sum(stats['compressedBytes'] for stats in collections.values())
+                
+                content += f"Backup: {os.path.basename(manifest['directory'])}\n"
+                content += f"Date: {manifest['createdAt'][:19].replace('T', ' ')}\n"
+                content += f"Database: {manifest['database']}\n"
+                content += f"Documents: {documents:,} in {len(collections)} collections\n"
+                content += f"Size: {format_bytes(compressed)} compressed\n"
+                content += f"Path: {manifest['directory']}\n"
                 content += "-" * 50 + "\n"
             
             backup_text.insert('1.0', content)
@@ -2605,10 +3157,14 @@ RECOMMENDATIONS:
             days_threshold = 90 if result else 180
             cutoff_date = datetime.now() - timedelta(days=days_threshold)
             
-            # Delete old conversations
+            # Delete old conversations, then recount the usage rollups of the affected months
+            rollups = self.get_usage_rollups()
+            since = rollups.affected_since({'createdAt': {'$lt': cutoff_date}})
             result = self.admin.conversations_collection.delete_many({
                 'createdAt': {'$lt': cutoff_date}
             })
+            if result.deleted_count:
+                rollups.refresh_since(since)
             
             messagebox.showinfo("Success", f"Deleted {result.deleted_count} conversations older than {days_threshold} days")
             
@@ -2651,6 +3207,7 @@ RECOMMENDATIONS:
                 ],
                 'role': {'$in': ['individual', 'company_user']}
             })
+            self.get_user_lookup().invalidate()
             
             messagebox.showinfo("Success", f"Deleted {result.deleted_count} inactive users")
             
@@ -2666,10 +3223,12 @@ RECOMMENDATIONS:
             
             # Create indexes for better performance
             collections_to_index = {
-                'users': [('email', 1), ('createdAt', -1), ('lastLogin', -1)],
-                'conversations': [('userId', 1), ('createdAt', -1), ('aiRatings', 1)],
+                'users': [('email', 1), ('createdAt', -1), ('lastLogin', -1), ('firstName', 1), ('lastName', 1)],
+                'conversations': [('userId', 1), ('createdAt', -1), ('aiRatings', 1),
+                                  [('createdAt', -1), ('_id', -1)], RATINGS_INDEX],
                 'companies': [('name', 1), ('createdAt', -1)],
-                'translations': [('language', 1), ('category', 1), ('key', 1)]
+                'translations': [('language', 1), ('category', 1), ('key', 1)],
+                'conversation_summaries': [('userId', 1), ('createdAt', -1)]
             }
             
             optimized_count = 0
@@ -2678,7 +3237,12 @@ RECOMMENDATIONS:
                 if collection:
                     for index_fields in indexes:
                         try:
-                            collection.create_index(list(index_fields) if isinstance(index_fields, tuple) else [index_fields])
+                            if isinstance(index_fields, dict):
+                                # Named index with options, e.g. a partial index
+                                options = {key: value for key, value in index_fields.items() if key != 'keys'}
+                                collection.create_index(index_fields['keys'], **options)
+                            else:
+                                collection.create_index([index_fields] if isinstance(index_fields, tuple) else index_fields)
                             optimized_count += 1
                         except:
                             pass  # Index might already exist
@@ -2762,6 +3326,56 @@ RECOMMENDATIONS:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to refresh database stats: {str(e)}")
     
+    def rebuild_usage_rollups(self):
+        """Rebuild the daily and monthly usage rollups from all conversations"""
+        try:
+            if not self.admin.connected:
+                messagebox.showerror("Error", "Not connected to database")
+                return
+            
+            if not messagebox.askyesno("Rebuild Usage Rollups", 
+                                       "Recompute all daily and monthly usage counters from the conversations collection?"):
+                return
+            
+            result = self.get_usage_rollups().backfill()
+            
+            messagebox.showinfo("Success", 
+                                f"Usage rollups rebuilt in {result['elapsed_ms'] / 1000:.1f}s\n"
+                                f"Stale buckets removed: {result['stale_removed']}")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to rebuild usage rollups: {str(e)}")
+    
+    def create_message_text_index(self):
+        """Create the MongoDB text index used by message search"""
+        try:
+            if not self.admin.connected:
+                messagebox.showerror("Error", "Not connected to database")
+                return
+            
+            engine = self.get_message_search()
+            engine.invalidate()  # Look the index up again rather than trusting the cached answer
+            if engine.has_text_index():
+                messagebox.showinfo("Info", "The conversations collection already has a text index")
+                return
+            
+            if not messagebox.askyesno("Create Text Index", 
+                                       "Build a text index over all conversation messages? "
+                                       "This can take a while on large databases."):
+                return
+            
+            index_name = engine.create_text_index()
+            messagebox.showinfo("Success", f"Text index '{index_name}' created")
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to create text index: {str(e)}")
+    
+    def refresh_message_search(self):
+        """Look up the text index again and rebuild the local search index on the next search"""
+        if self.message_search is not None:
+            self.message_search.invalidate()
+        self.admin.status_label.config(text="Message search index will be refreshed on the next search", fg='green')
+    
     # Subscription Tracking Methods
     def load_subscription_tracking(self):
         """Load subscription and usage tracking data"""
@@ -2778,43 +3392,39 @@ RECOMMENDATIONS:
             current_month = self.admin.subscription_month_var.get()
             try:
                 month_start = datetime.strptime(current_month, '%Y-%m')
-                month_end = (month_start.replace(day=1) + timedelta(days=32)).replace(day=1)
             except ValueError:
                 messagebox.showerror("Error", "Invalid month format. Use YYYY-MM")
                 return
             
-            # Get all users with subscription plans
+            # Bring the rollups up to date (a no-op when refreshed within the last minute)
+            rollups = self.get_usage_rollups()
+            refresh = rollups.update_incremental()
+            
+            # Monthly count and last activity for every user in one aggregation
+            started = time.perf_counter()
+            usage_by_user = rollups.user_usage(month_start)
+            
+            # Get all users with subscription plans, joined to the usage in memory
             users = list(self.admin.users_collection.find({
                 'subscription': {'$exists': True},
                 'subscription.plan': {'$ne': None}
-            }))
+            }, SUBSCRIPTION_USER_PROJECTION))
+            query_ms = (time.perf_counter() - started) * 1000
             
             total_users = len(users)
             total_used = 0
             total_limit = 0
+            plan_breakdown = {}
             
             for user in users:
                 subscription = user.get('subscription', {})
                 plan = subscription.get('plan', 'basic')
                 
-                # Define plan limits
-                plan_limits = {
-                    'basic': 10,
-                    'pro': 50,
-                    'enterprise': 200,
-                    'free': 3
-                }
-                
-                monthly_limit = plan_limits.get(plan, 10)
+                monthly_limit = PLAN_LIMITS.get(plan, DEFAULT_PLAN_LIMIT)
                 
                 # Count conversations this month
-                conversations_this_month = self.admin.conversations_collection.count_documents({
-                    'userId': str(user['_id']),
-                    'createdAt': {
-                        '$gte': month_start,
-                        '$lt': month_end
-                    }
-                })
+                usage = usage_by_user.get(str(user['_id']), {})
+                conversations_this_month = usage.get('count', 0)
                 
                 remaining = max(0, monthly_limit - conversations_this_month)
                 usage_percent = (conversations_this_month / monthly_limit * 100) if monthly_limit > 0 else 0
@@ -2828,13 +3438,9 @@ RECOMMENDATIONS:
                     status = "Active"
                 
                 # Get last activity
-                last_conversation = self.admin.conversations_collection.find_one(
-                    {'userId': str(user['_id'])},
-                    sort=[('createdAt', -1)]
-                )
                 last_activity = "Never"
-                if last_conversation and last_conversation.get('createdAt'):
-                    last_activity = last_conversation['createdAt'].strftime('%Y-%m-%d')
+                if usage.get('lastActivity'):
+                    last_activity = usage['lastActivity'].strftime('%Y-%m-%d')
                 
                 # Get user/company name
                 display_name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
@@ -2855,9 +3461,19 @@ RECOMMENDATIONS:
                 
                 total_used += conversations_this_month
                 total_limit += monthly_limit
+                
+                # Accumulate the plan breakdown from the same usage data
+                plan_totals = plan_breakdown.setdefault(plan, {'users': 0, 'used': 0, 'limit': 0})
+                plan_totals['users'] += 1
+                plan_totals['used'] += conversations_this_month
+                plan_totals['limit'] += monthly_limit
             
             # Update usage summary
-            self.update_usage_summary(total_users, total_used, total_limit, current_month)
+            self.update_usage_summary(total_users, total_used, total_limit, current_month, plan_breakdown)
+            
+            refreshed = f", rollups refreshed in {refresh['elapsed_ms']:.0f}ms" if refresh else ""
+            self.admin.status_label.config(
+                text=f"Subscription tracking: {total_users} users, 2 queries in {query_ms:.0f}ms{refreshed}", fg='green')
             
             messagebox.showinfo("Success", f"Loaded usage data for {total_users} users")
             
@@ -2867,8 +3483,8 @@ RECOMMENDATIONS:
             )
             messagebox.showerror("Error", f"Failed to load subscription tracking: {str(e)}")
     
-    def update_usage_summary(self, total_users, total_used, total_limit, month):
-        """Update the usage summary text"""
+    def update_usage_summary(self, total_users, total_used, total_limit, month, plan_breakdown):
+        """Update the usage summary text from totals computed by load_subscription_tracking"""
         try:
             self.admin.usage_summary_text.delete('1.0', tk.END)
             
@@ -2886,31 +3502,14 @@ OVERALL USAGE: {usage_percent:.1f}%
 PLAN BREAKDOWN:
 """
             
-            # Get breakdown by plan
-            plans = ['free', 'basic', 'pro', 'enterprise']
+            # Known plans first, then any other plan names found on users
+            plans = [plan for plan in PLAN_LIMITS if plan in plan_breakdown]
+            plans += sorted(plan for plan in plan_breakdown if plan not in PLAN_LIMITS)
             for plan in plans:
-                plan_users = list(self.admin.users_collection.find({
-                    'subscription.plan': plan
-                }))
-                
-                plan_limit = {'free': 3, 'basic': 10, 'pro': 50, 'enterprise': 200}.get(plan, 10)
-                plan_users_count = len(plan_users)
-                
-                if plan_users_count > 0:
-                    plan_used = 0
-                    for user in plan_users:
-                        user_conv_count = self.admin.conversations_collection.count_documents({
-                            'userId': str(user['_id']),
-                            'createdAt': {
-                                '$gte': datetime.strptime(month, '%Y-%m'),
-                                '$lt': (datetime.strptime(month, '%Y-%m').replace(day=1) + timedelta(days=32)).replace(day=1)
-                            }
-                        })
-                        plan_used += user_conv_count
-                    
-                    plan_usage_percent = (plan_used / (plan_users_count * plan_limit) * 100) if plan_users_count > 0 else 0
-                    
-                    summary_content += f"- {plan.title()}: {plan_users_count} users, {plan_used}/{plan_users_count * plan_limit} used ({plan_usage_percent:.1f}%)\n"
+                totals = plan_breakdown[plan]
+                plan_usage_percent = (totals['used'] / totals['limit'] * 100) if totals['limit'] > 0 else 0
+                
+                summary_content += f"- {plan.title()}: {totals['users']} users, {totals['used']}/{totals['limit']} used ({plan_usage_percent:.1f}%)\n"
             
             summary_content += f"\nLast Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             
@@ -2970,14 +3569,19 @@ PLAN BREAKDOWN:
                 messagebox.showerror("Error", "Invalid month format")
                 return
             
-            # Get user's conversations this month
-            conversations = list(self.admin.conversations_collection.find({
-                'userId': str(user['_id']),
+            # Get user's conversations this month (userId is stored as ObjectId or string)
+            month_query = {
+                'userId': {'$in': [user['_id'], str(user['_id'])]},
                 'createdAt': {
                     '$gte': month_start,
                     '$lt': month_end
                 }
-            }).sort('createdAt', -1))
+            }
+            conversation_count = self.admin.conversations_collection.count_documents(month_query)
+            conversations = list(self.admin.conversations_collection.find(month_query, {
+                'title': 1, 'createdAt': 1, 'duration': 1, 'aiRatings': 1,
+                'messageCount': {'$size': {'$ifNull': ['$messages', []]}}
+            }).sort('createdAt', -1).limit(20))
             
             # Create details window
             details_window = tk.Toplevel(self.admin.root)
@@ -3003,14 +3607,14 @@ Plan: {plan.title()}
 Monthly Limit: {monthly_limit} conversations
 
 USAGE THIS MONTH:
-Total Conversations: {len(conversations)}
-Remaining: {max(0, monthly_limit - len(conversations))}
-Usage Percentage: {(len(conversations) / monthly_limit * 100):.1f}%
+Total Conversations: {conversation_count}
+Remaining: {max(0, monthly_limit - conversation_count)}
+Usage Percentage: {(conversation_count / monthly_limit * 100):.1f}%
 
 CONVERSATION DETAILS:
 """
             
-            for i, conv in enumerate(conversations[:20], 1):  # Show last 20 conversations
+            for i, conv in enumerate(conversations, 1):  # Show last 20 conversations
                 duration = conv.get('duration', 0)
                 duration_min = duration // 60 if duration else 0
                 duration_sec = duration % 60 if duration else 0
@@ -3018,12 +3622,13 @@ CONVERSATION DETAILS:
                 details_content += f"{i}. {conv.get('title', 'Untitled')}\n"
                 details_content += f"   Date: {conv.get('createdAt', '').strftime('%Y-%m-%d %H:%M') if conv.get('createdAt') else 'N/A'}\n"
                 details_content += f"   Duration: {duration_min}m {duration_sec}s\n"
-                details_content += f"   Messages: {len(conv.get('messages', []))}\n"
+                details_content += f"   Messages: {conv.get('messageCount', 0)}\n"
                 details_content += f"   Rating: {sum(conv.get('aiRatings', {}).values()) if conv.get('aiRatings') else 'N/A'}/50\n\n"
             
-            if len(conversations) > 20:
-                details_content += f"... and {len(conversations) - 20} more conversations\n"
+            if conversation_count > 20:
+                details_content += f"... and {conversation_count - 20} more conversations\n"
             
+            details_content += f"\nData transferred: {format_bytes(bson_size(conversations))}"
             details_content += f"\nLast Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             
             details_text.insert('1.0', details_content)
@@ -3102,74 +3707,97 @@ CONVERSATION DETAILS:
                 return
             
             current_month = self.admin.subscription_month_var.get()
+            try:
+                month_start = datetime.strptime(current_month, '%Y-%m')
+            except ValueError:
+                messagebox.showerror("Error", "Invalid month format. Use YYYY-MM")
+                return
             
-            # Get all subscription data
-            users = list(self.admin.users_collection.find({
+            query = {
                 'subscription': {'$exists': True},
                 'subscription.plan': {'$ne': None}
-            }))
-            
-            if not users:
+            }
+            if not self.admin.users_collection.count_documents(query, limit=1):
                 messagebox.showinfo("Info", "No subscription data found to export")
                 return
             
-            # Create CSV content
-            csv_content = "User,Email,Plan,Monthly Limit,Used This Month,Remaining,Usage %,Status,Last Activity\n"
-            
-            month_start = datetime.strptime(current_month, '%Y-%m')
-            month_end = (month_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+            rollups = self.get_usage_rollups()
+            rollups.update_incremental()
             
-            plan_limits = {'free': 3, 'basic': 10, 'pro': 50, 'enterprise': 200}
-            
-            for user in users:
-                subscription = user.get('subscription', {})
-                plan = subscription.get('plan', 'basic')
-                monthly_limit = plan_limits.get(plan, 10)
-                
-                # Count conversations this month
-                conversations_this_month = self.admin.conversations_collection.count_documents({
-                    'userId': str(user['_id']),
-                    'createdAt': {
-                        '$gte': month_start,
-                        '$lt': month_end
-                    }
-                })
-                
-                remaining = max(0, monthly_limit - conversations_this_month)
-                usage_percent = (conversations_this_month / monthly_limit * 100) if monthly_limit > 0 else 0
-                
-                # Determine status
-                if conversations_this_month >= monthly_limit:
-                    status = "Limit Reached"
-                elif usage_percent >= 80:
-                    status = "Near Limit"
-                else:
-                    status = "Active"
-                
-                # Get last activity
-                last_conversation = self.admin.conversations_collection.find_one(
-                    {'userId': str(user['_id'])},
-                    sort=[('createdAt', -1)]
-                )
-                last_activity = "Never"
-                if last_conversation and last_conversation.get('createdAt'):
-                    last_activity = last_conversation['createdAt'].strftime('%Y-%m-%d')
-                
-                user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
-                email = user.get('email', '')
-                
-                csv_content += f'"{user_name}","{email}","{plan.title()}",{monthly_limit},{conversations_this_month},{remaining},{usage_percent:.1f}%,"{status}","{last_activity}"\n'
+            def format_batch(users):
+                # Usage for the whole batch of users in one aggregation
+                usage_by_user = rollups.user_usage(month_start, [user['_id'] for user in users])
+                rows = []
+                for user in users:
+                    plan = user.get('subscription', {}).get('plan', 'basic')
+                    monthly_limit = PLAN_LIMITS.get(plan, DEFAULT_PLAN_LIMIT)
+                    
+                    usage = usage_by_user.get(str(user['_id']), {})
+                    conversations_this_month = usage.get('count', 0)
+                    remaining = max(0, monthly_limit - conversations_this_month)
+                    usage_percent = (conversations_this_month / monthly_limit * 100) if monthly_limit > 0 else 0
+                    
+                    # Determine status
+                    if conversations_this_month >= monthly_limit:
+                        status = "Limit Reached"
+                    elif usage_percent >= 80:
+                        status = "Near Limit"
+                    else:
+                        status = "Active"
+                    
+                    last_activity = usage['lastActivity'].strftime('%Y-%m-%d') if usage.get('lastActivity') else "Never"
+                    
+                    rows.append([
+                        f"{user.get('firstName', '')} {user.get('lastName', '')}".strip(),
+                        user.get('email', ''),
+                        plan.title(),
+                        monthly_limit,
+                        conversations_this_month,
+                        remaining,
+                        f"{usage_percent:.1f}%",
+                        status,
+                        last_activity
+                    ])
+                return rows
             
-            # Save to file
             filename = f"usage_report_{current_month}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(csv_content)
-            
-            messagebox.showinfo("Success", f"Usage report exported to {filename}")
+            self.run_csv_export(
+                "usage report", filename,
+                ["User", "Email", "Plan", "Monthly Limit", "Used This Month", "Remaining", "Usage %", "Status", "Last Activity"],
+                self.admin.users_collection.find(query, SUBSCRIPTION_USER_PROJECTION).batch_size(CSV_EXPORT_BATCH_SIZE),
+                format_batch
+            )
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export usage report: {str(e)}")
     
+    def run_csv_export(self, title, filename, header, cursor, format_batch):
+        """Stream a CSV export in the background, reporting progress in the status bar"""
+        self.admin.status_label.config(text=f"Exporting {title} to {filename}...", fg='blue')
+        
+        def report_progress(stats):
+            self.admin.root.after(0, lambda: self.admin.status_label.config(
+                text=f"Exporting {title}: {stats['documents']:,} rows written "
+                     f"({format_bytes(stats['bytes'])}, {stats['docs_per_sec']:,.0f} rows/s)", fg='blue'))
+        
+        def finish(stats):
+            self.admin.status_label.config(
+                text=f"Exported {stats['documents']:,} rows of {title} in {stats['elapsed']:.1f}s", fg='green')
+            messagebox.showinfo("Success", f"{title[0].upper() + title[1:]} exported to {filename}\n\n"
+                                           f"{stats['documents']:,} rows, {format_bytes(stats['bytes'])}")
+        
+        def run_export():
+            try:
+                exporter = CsvExporter(batch_size=CSV_EXPORT_BATCH_SIZE, progress_callback=report_progress)
+                stats = exporter.export(filename, header, cursor, format_batch)
+                self.admin.root.after(0, lambda: finish(stats))
+            except Exception as e:
+                error = str(e)
+                self.admin.root.after(0, lambda: messagebox.showerror("Error", f"Failed to export {title}: {error}"))
+        
+        # Stream the export in the background so the panel stays responsive
+        threading.Thread(target=run_export, daemon=True).start()
+    
     def update_subscription_limits(self):
         """Update subscription limits for users"""
         try:
@@ -3236,86 +3864,14 @@ CONVERSATION DETAILS:
     
     # Conversation Summaries Methods
     def load_all_summaries(self):
-        """Load all user summaries from conversationsummaries collection"""
+        """Load the first page of each user's latest summary"""
         try:
             if not self.admin.connected:
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
-            # Clear existing items
-            for item in self.admin.summaries_tree.get_children():
-                self.admin.summaries_tree.delete(item)
-            
-            # Get latest 20 conversation summaries from conversationsummaries collection
-            conversation_summaries = list(self.admin.conversation_summaries_collection.find().sort('createdAt', -1).limit(20))
-            
-            # Group summaries by user to get the latest summary for each user
-            user_summaries = {}
-            for summary in conversation_summaries:
-                user_id = summary.get('userId')
-                if user_id:
-                    # Keep the latest summary for each user
-                    if user_id not in user_summaries or summary.get('createdAt') > user_summaries[user_id].get('createdAt'):
-                        user_summaries[user_id] = summary
-            
-            for user_id, summary in user_summaries.items():
-                # Get user information
-                user = self.admin.users_collection.find_one({'_id': ObjectId(user_id)})
-                user_name = "Unknown"
-                if user:
-                    user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
-                    if not user_name:
-                        user_name = user.get('email', 'Unknown')
-                
-                # Get conversation count from summary
-                conversation_count = summary.get('conversationCount', 0)
-                summary_number = summary.get('summaryNumber', 'N/A')
-                
-                # Get overall rating from summary
-                overall_rating = summary.get('overallRating', 'N/A')
-                rating_str = f"{overall_rating}/10" if overall_rating != 'N/A' else 'N/A'
-                
-                # Get AI analysis from summary
-                ai_analysis = summary.get('aiAnalysis', {})
-                summary_text = ""
-                if isinstance(ai_analysis, dict):
-                    # Try to get a summary from the AI analysis
-                    summary_text = ai_analysis.get('summary', '') or ai_analysis.get('overview', '') or str(ai_analysis)
-                elif isinstance(ai_analysis, str):
-                    summary_text = ai_analysis
-                
-                # Create summary preview (first 100 characters)
-                summary_preview = summary_text[:100] + '...' if len(summary_text) > 100 else summary_text
-                if not summary_preview:
-                    summary_preview = f"Summary #{summary_number} - {conversation_count} conversations"
-                
-                # Get strengths and improvements count
-                strengths = summary.get('strengths', [])
-                improvements = summary.get('improvements', [])
-                
-                # Get total conversation time for this user
-                conversations = list(self.admin.conversations_collection.find({
-                    'userId': user_id
-                }, {'duration': 1}))
-                total_duration = sum(conv.get('duration', 0) for conv in conversations)
-                duration_str = f"{total_duration//60}m {total_duration%60}s" if total_duration else "0m 0s"
-                
-                # Get last activity date
-                last_date = summary.get('createdAt', '').strftime('%Y-%m-%d') if summary.get('createdAt') else 'N/A'
-                
-                # Insert into tree
-                self.admin.summaries_tree.insert('', 'end', values=(
-                    str(user_id)[:8] + '...',
-                    user_name,
-                    f"Summary #{summary_number}",
-                    summary_preview,
-                    duration_str,
-                    conversation_count,
-                    last_date,
-                    rating_str
-                ))
-            
-            messagebox.showinfo("Success", f"Loaded {len(user_summaries)} user summaries")
+            self.summary_page = 0
+            self.show_summaries_page()
             
         except Exception as e:
             SecurityAuditLogger.log_security_violation(
@@ -3323,150 +3879,177 @@ CONVERSATION DETAILS:
             )
             messagebox.showerror("Error", f"Failed to load user summaries: {str(e)}")
     
+    def get_summary_page_size(self):
+        """Read the summaries page size, falling back to the default when invalid"""
+        try:
+            page_size = int(self.admin.summary_page_size_var.get())
+        except (TypeError, ValueError, tk.TclError):
+            return DEFAULT_SUMMARY_PAGE_SIZE
+        return min(max(page_size, 1), MAX_SUMMARY_PAGE_SIZE)
+    
+    def show_summaries_page(self):
+        """Show the current page of latest summaries per user"""
+        page_size = self.get_summary_page_size()
+        
+        # Latest summary, user name and total duration per user in one aggregation
+        started = time.perf_counter()
+        summaries = list(self.admin.conversation_summaries_collection.aggregate(
+            latest_summaries_pipeline(self.summary_page * page_size, page_size + 1)
+        ))
+        query_ms = (time.perf_counter() - started) * 1000
+        self.summary_has_more = len(summaries) > page_size
+        summaries = summaries[:page_size]
+        
+        # Clear existing items
+        for item in self.admin.summaries_tree.get_children():
+            self.admin.summaries_tree.delete(item)
+        
+        for summary in summaries:
+            self.admin.summaries_tree.insert('', 'end', values=self.format_summary_row(
+                summary, format_user_name(summary.get('user')), summary.get('totalDuration', 0)
+            ), tags=(str(summary['_id']), str(summary.get('userId'))))  # Store full summary and user ids as tags
+        
+        last_page = "" if self.summary_has_more else " (last)"
+        self.admin.summary_page_label.config(text=f"Page {self.summary_page + 1}{last_page}")
+        self.admin.status_label.config(
+            text=f"Summaries: {len(summaries)} users in {query_ms:.0f}ms", fg='green')
+    
+    def next_summaries_page(self):
+        """Show the next page of user summaries"""
+        if not self.admin.connected or not self.summary_has_more:
+            return
+        
+        try:
+            self.summary_page += 1
+            self.show_summaries_page()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load user summaries: {str(e)}")
+    
+    def previous_summaries_page(self):
+        """Show the previous page of user summaries"""
+        if not self.admin.connected or self.summary_page == 0:
+            return
+        
+        try:
+            self.summary_page -= 1
+            self.show_summaries_page()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load user summaries: {str(e)}")
+    
+    def format_summary_row(self, summary, user_name, total_duration):
+        """Format a summary document as summaries treeview values"""
+        user_id = summary.get('userId')
+        
+        # Get conversation count from summary
+        conversation_count = summary.get('conversationCount', 0)
+        summary_number = summary.get('summaryNumber', 'N/A')
+        
+        # Get overall rating from summary
+        overall_rating = summary.get('overallRating', 'N/A')
+        rating_str = f"{overall_rating}/10" if overall_rating != 'N/A' else 'N/A'
+        
+        # Get AI analysis from summary
+        ai_analysis = summary.get('aiAnalysis', {})
+        summary_text = ""
+        if isinstance(ai_analysis, dict):
+            # Try to get a summary from the AI analysis
+            summary_text = ai_analysis.get('summary', '') or ai_analysis.get('overview', '') or str(ai_analysis)
+        elif isinstance(ai_analysis, str):
+            summary_text = ai_analysis
+        
+        # Create summary preview (first 100 characters)
+        summary_preview = summary_text[:100] + '...' if len(summary_text) > 100 else summary_text
+        if not summary_preview:
+            summary_preview = f"Summary #{summary_number} - {conversation_count} conversations"
+        
+        total_duration = int(total_duration or 0)
+        duration_str = f"{total_duration//60}m {total_duration%60}s" if total_duration else "0m 0s"
+        
+        # Get last activity date
+        last_date = summary.get('createdAt', '').strftime('%Y-%m-%d') if summary.get('createdAt') else 'N/A'
+        
+        return (
+            str(user_id)[:8] + '...',
+            user_name,
+            f"Summary #{summary_number}",
+            summary_preview,
+            duration_str,
+            conversation_count,
+            last_date,
+            rating_str
+        )
+    
 
     def search_summaries(self, event=None):
-        """Search conversation summaries by user ID"""
+        """Search conversation summaries by user ID, ID prefix, email or name"""
         try:
+            if not self.admin.connected:
+                return
+            
+            # The planner only builds range and $in conditions from the term, never regexes
             search_term = self.admin.summary_search_var.get().strip()
             
             if not search_term:
-                # Show all items if search is empty
-                for item in self.admin.summaries_tree.get_children():
-                    self.admin.summaries_tree.reattach(item, '', 'end')
+                # Show the latest summaries again if search is empty
+                self.load_all_summaries()
                 return
             
+            # Classify the input once and run the matching indexed plan
+            planner = SummarySearchPlanner(
+                self.admin.conversation_summaries_collection, self.admin.users_collection
+            )
+            result = planner.search(search_term)
+            summaries = result['results']
+            
             # Clear existing items first
             for item in self.admin.summaries_tree.get_children():
                 self.admin.summaries_tree.delete(item)
             
-            # Search in database by user ID
-            try:
-                # Try to find summaries by exact user ID match first (as ObjectId)
-                summaries = []
-                try:
-                    # Convert search term to ObjectId if it's a valid ObjectId string
-                    user_object_id = ObjectId(search_term)
-                    summaries = list(self.admin.conversation_summaries_collection.find({
-                        'userId': user_object_id
-                    }).sort('createdAt', -1).limit(20))
-                except:
-                    # If conversion fails, try as string
-                    summaries = list(self.admin.conversation_summaries_collection.find({
-                        'userId': search_term
-                    }).sort('createdAt', -1).limit(20))
-                
-                # If no exact match, try partial user ID match (convert to ObjectId)
-                if not summaries:
-                    try:
-                        # Try to find summaries where userId starts with the search term
-                        user_object_id = ObjectId(search_term)
-                        summaries = list(self.admin.conversation_summaries_collection.find({
-                            'userId': {'$gte': user_object_id, '$lt': ObjectId(search_term + 'z')}
-                        }).sort('createdAt', -1).limit(20))
-                    except:
-                        # If ObjectId conversion fails, try regex on string representation
-                        summaries = list(self.admin.conversation_summaries_collection.find({
-                            'userId': {'$regex': search_term, '$options': 'i'}
-                        }).sort('createdAt', -1).limit(20))
-                
-                # If no results, try to find by user name
-                if not summaries:
-                    # Get users that match the search term
-                    users = list(self.admin.users_collection.find({
-                        '$or': [
-                            {'firstName': {'$regex': search_term, '$options': 'i'}},
-                            {'lastName': {'$regex': search_term, '$options': 'i'}},
-                            {'email': {'$regex': search_term, '$options': 'i'}}
-                        ]
-                    }))
-                    
-                    # Get summaries for matching users
-                    if users:
-                        user_ids = [str(user['_id']) for user in users]
-                        summaries = list(self.admin.conversation_summaries_collection.find({
-                            'userId': {'$in': user_ids}
-                        }).sort('createdAt', -1).limit(20))
-                
-                # Display the search results
-                for summary in summaries:
-                    user_id = summary.get('userId')
-                    
-                    # Get user information
-                    user = self.admin.users_collection.find_one({'_id': ObjectId(user_id)})
-                    user_name = "Unknown"
-                    if user:
-                        user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
-                        if not user_name:
-                            user_name = user.get('email', 'Unknown')
-                    
-                    # Get summary data
-                    conversation_count = summary.get('conversationCount', 0)
-                    summary_number = summary.get('summaryNumber', 'N/A')
-                    overall_rating = summary.get('overallRating', 'N/A')
-                    rating_str = f"{overall_rating}/10" if overall_rating != 'N/A' else 'N/A'
-                    
-                    # Get AI analysis
-                    ai_analysis = summary.get('aiAnalysis', {})
-                    summary_text = ""
-                    if isinstance(ai_analysis, dict):
-                        summary_text = ai_analysis.get('summary', '') or ai_analysis.get('overview', '') or str(ai_analysis)
-                    elif isinstance(ai_analysis, str):
-                        summary_text = ai_analysis
-                    
-                    summary_preview = summary_text[:100] + '...' if len(summary_text) > 100 else summary_text
-                    if not summary_preview:
-                        summary_preview = f"Summary #{summary_number} - {conversation_count} conversations"
-                    
-                    # Get total conversation time
-                    conversations = list(self.admin.conversations_collection.find({
-                        'userId': user_id
-                    }, {'duration': 1}))
-                    total_duration = sum(conv.get('duration', 0) for conv in conversations)
-                    duration_str = f"{total_duration//60}m {total_duration%60}s" if total_duration else "0m 0s"
-                    
-                    # Get last activity date
-                    last_date = summary.get('createdAt', '').strftime('%Y-%m-%d') if summary.get('createdAt') else 'N/A'
-                    
-                    # Insert into tree
-                    self.admin.summaries_tree.insert('', 'end', values=(
-                        str(user_id)[:8] + '...',
-                        user_name,
-                        f"Summary #{summary_number}",
-                        summary_preview,
-                        duration_str,
-                        conversation_count,
-                        last_date,
-                        rating_str
-                    ))
-                
-                if summaries:
-                    messagebox.showinfo("Search Results", f"Found {len(summaries)} summaries matching '{search_term}'")
-                else:
-                    # Debug: show what's actually in the database
-                    all_summaries = list(self.admin.conversation_summaries_collection.find().limit(5))
-                    debug_info = f"Search term: '{search_term}'\n"
-                    debug_info += f"Sample userIds in database:\n"
-                    for s in all_summaries:
-                        debug_info += f"  - {s.get('userId')} (type: {type(s.get('userId'))})\n"
-                    
-                    messagebox.showwarning("No Results", f"No summaries found for '{search_term}'\n\n{debug_info}")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Search failed: {str(e)}")
-                    
+            # Display the search results
+            for summary in summaries:
+                self.admin.summaries_tree.insert('', 'end', values=self.format_summary_row(
+                    summary, format_user_name(summary.get('user')), summary.get('totalDuration', 0)
+                ), tags=(str(summary['_id']), str(summary.get('userId'))))  # Store full summary and user ids as tags
+            
+            self.summary_has_more = False
+            self.admin.summary_page_label.config(text="Search results")
+            self.admin.status_label.config(
+                text=f"Summary search ({result['description']}): {len(summaries)} results, "
+                     f"{result['queries']} {'query' if result['queries'] == 1 else 'queries'} "
+                     f"in {result['elapsed_ms']:.0f}ms", fg='green')
+            
+            if not summaries:
+                messagebox.showinfo("No Results", f"No summaries found for '{search_term}' "
+                                                  f"(searched by {result['description']})")
+            
         except Exception as e:
             messagebox.showerror("Error", f"Failed to search summaries: {str(e)}")
     
     def clear_summary_filters(self):
-        """Clear all summary filters and reload latest 20"""
+        """Clear all summary filters and reload the first page"""
         try:
             self.admin.summary_search_var.set("")
-            # Reload the latest 20 summaries
+            # Reload the first page of latest summaries
             self.load_all_summaries()
                 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to clear filters: {str(e)}")
     
+    def get_selected_summary_ids(self, item):
+        """
+        Return (summary id, user id) ObjectIds of a summaries treeview row
+        
+        Rows carry both full ids in their tags; the shown user id prefix is
+        only resolved (with one indexed _id range query) for untagged rows.
+        """
+        tags = self.admin.summaries_tree.item(item)['tags']
+        if len(tags) >= 2:
+            return normalize_object_id(str(tags[0])), normalize_object_id(str(tags[1]))
+        
+        values = self.admin.summaries_tree.item(item)['values']
+        user = resolve_id_prefix(self.admin.users_collection, str(values[0]), {'_id': 1})
+        return None, user['_id'] if user else None
+    
     def view_full_summary(self, event=None):
         """View full user AI summary from conversationsummaries collection"""
         try:
@@ -3476,72 +4059,56 @@ CONVERSATION DETAILS:
                 return
             
             values = self.admin.summaries_tree.item(selected_item[0])['values']
-            user_id_partial = values[0]
             user_name = values[1]
             summary_number = values[2].replace('Summary #', '')
             
-            # Find the user by partial ID
+            # Resolve the row's ids and fetch only the user fields shown
+            summary_id, user_object_id = self.get_selected_summary_ids(selected_item[0])
             user = None
-            try:
-                # Try to find user by partial ID
-                users = list(self.admin.users_collection.find())
-                for u in users:
-                    if str(u['_id']).startswith(user_id_partial.replace('...', '')):
-                        user = u
-                        break
-            except Exception as e:
-                print(f"Error finding user: {e}")
-                pass
+            if user_object_id:
+                user = self.admin.users_collection.find_one(
+                    {'_id': user_object_id}, {'firstName': 1, 'lastName': 1, 'email': 1, 'createdAt': 1}
+                )
             
             if not user:
                 messagebox.showerror("Error", "User not found")
                 return
             
             user_id = str(user['_id'])
+            # userId is stored as an ObjectId or as its string form
+            user_keys = {'$in': [user['_id'], user_id]}
             
-            # Get the specific summary that was selected (by summary number)
+            # Get the specific summary that was selected
             latest_summary = None
             try:
-                # Try to find the specific summary by userId and summaryNumber
-                latest_summary = self.admin.conversation_summaries_collection.find_one({
-                    'userId': user_id,
-                    'summaryNumber': int(summary_number)
-                })
+                if summary_id:
+                    latest_summary = self.admin.conversation_summaries_collection.find_one({'_id': summary_id})
+                
+                # Otherwise find it by userId and summaryNumber
+                if not latest_summary and summary_number.isdigit():
+                    latest_summary = self.admin.conversation_summaries_collection.find_one({
+                        'userId': user_keys,
+                        'summaryNumber': int(summary_number)
+                    })
                 
                 # If not found by summaryNumber, get the latest one
                 if not latest_summary:
                     latest_summary = self.admin.conversation_summaries_collection.find_one(
-                        {'userId': user_id},
+                        {'userId': user_keys},
                         sort=[('createdAt', -1)]
                     )
-                
-                # If still not found, try with ObjectId
-                if not latest_summary:
-                    try:
-                        latest_summary = self.admin.conversation_summaries_collection.find_one({
-                            'userId': ObjectId(user_id)
-                        }, sort=[('createdAt', -1)])
-                    except:
-                        pass
                         
             except Exception as e:
                 print(f"Error finding summary: {e}")
             
             if not latest_summary:
-                # Show all available summaries for debugging
-                all_summaries = list(self.admin.conversation_summaries_collection.find().sort('createdAt', -1))
-                print(f"Debug: Looking for user_id: {user_id}, summary_number: {summary_number}")
-                print(f"Debug: Available summaries:")
-                for s in all_summaries[:5]:  # Show first 5
-                    print(f"  - UserId: {s.get('userId')} (type: {type(s.get('userId'))}), Summary #{s.get('summaryNumber')}")
-                
-                messagebox.showerror("Error", f"No conversation summary found for this user.\nUser ID: {user_id}\nSummary Number: {summary_number}\nFound {len(all_summaries)} total summaries in database.")
+                messagebox.showerror("Error", f"No conversation summary found for this user.\nUser ID: {user_id}\nSummary Number: {summary_number}")
                 return
             
             # Get all summaries for this user to show progression
             all_summaries = list(self.admin.conversation_summaries_collection.find({
-                'userId': user_id
-            }).sort('createdAt', -1))
+                'userId': user_keys
+            }).sort('createdAt', -1).limit(10))
             
             # Create summary window
             summary_window = tk.Toplevel(self.admin.root)
@@ -3616,7 +4183,7 @@ STRENGTHS:
             
             # Show summary progression
             summary_content += f"\nSUMMARY PROGRESSION:\n{'-' * 30}\n"
-            for summary in all_summaries[:10]:  # Show last 10 summaries
+            for summary in all_summaries:  # Show last 10 summaries
                 summary_num = summary.get('summaryNumber', 'N/A')
                 rating = summary.get('overallRating', 'N/A')
                 conv_count = summary.get('conversationCount', 0)
@@ -3638,31 +4205,19 @@ STRENGTHS:
                 return
             
             values = self.admin.summaries_tree.item(selected_item[0])['values']
-            user_id_partial = values[0]
             user_name = values[1]
             
-            # Find the user by partial ID
-            user = None
-            try:
-                # Try to find user by partial ID
-                users = list(self.admin.users_collection.find())
-                for u in users:
-                    if str(u['_id']).startswith(user_id_partial.replace('...', '')):
-                        user = u
-                        break
-            except Exception as e:
-                print(f"Error finding user: {e}")
-                pass
-            
-            if not user:
+            # Resolve the row's user id without scanning users
+            _, user_object_id = self.get_selected_summary_ids(selected_item[0])
+            if not user_object_id:
                 messagebox.showerror("Error", "User not found")
                 return
             
-            user_id = str(user['_id'])
+            user_id = str(user_object_id)
             
-            # Get all user's conversations
+            # Get all user's conversations (userId is stored as an ObjectId or a string)
             conversations = list(self.admin.conversations_collection.find({
-                'userId': user_id
+                'userId': {'$in': [user_object_id, user_id]}
             }).sort('createdAt', -1))
             
             if not conversations:
@@ -3732,70 +4287,52 @@ MESSAGES:
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
-            # Get all conversation summaries
-            conversation_summaries = list(self.admin.conversation_summaries_collection.find().sort('createdAt', -1))
-            
-            if not conversation_summaries:
+            if not self.admin.conversation_summaries_collection.count_documents({}, limit=1):
                 messagebox.showinfo("Info", "No conversation summaries found to export")
                 return
             
-            # Create CSV content
-            csv_content = "User ID,Name,Email,Summary Number,Conversation Count,Overall Rating,Strengths,Improvements,AI Analysis,Date Range,Stage Ratings,Example Conversations,Created Date\n"
+            lookup = self.get_user_lookup()
             
-            for summary in conversation_summaries:
-                user_id = summary.get('userId')
-                
-                # Get user information
-                user = self.admin.users_collection.find_one({'_id': ObjectId(user_id)})
-                user_name = "Unknown"
-                user_email = "N/A"
-                if user:
-                    user_name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
-                    if not user_name:
-                        user_name = user.get('email', 'Unknown')
-                    user_email = user.get('email', 'N/A')
-                
-                # Get summary data
-                summary_number = summary.get('summaryNumber', 'N/A')
-                conversation_count = summary.get('conversationCount', 0)
-                overall_rating = summary.get('overallRating', 'N/A')
-                
-                # Format arrays for CSV
-                strengths = summary.get('strengths', [])
-                strengths_str = '; '.join(strengths) if strengths else 'None'
-                
-                improvements = summary.get('improvements', [])
-                improvements_str = '; '.join(improvements) if improvements else 'None'
-                
-                # Get AI analysis
-                ai_analysis = summary.get('aiAnalysis', {})
-                ai_analysis_str = str(ai_analysis) if ai_analysis else 'None'
-                ai_analysis_str = ai_analysis_str.replace('"', '""').replace('\n', ' ')
-                
-                # Get date range
-                date_range = summary.get('dateRange', {})
-                date_range_str = str(date_range) if date_range else 'None'
-                
-                # Get stage ratings
-                stage_ratings = summary.get('stageRatings', {})
-                stage_ratings_str = str(stage_ratings) if stage_ratings else 'None'
-                
-                # Get example conversations count
-                example_conversations = summary.get('exampleConversations', [])
-                example_conv_count = len(example_conversations) if example_conversations else 0
-                
-                # Get created date
-                created_date = summary.get('createdAt', '').strftime('%Y-%m-%d %H:%M') if summary.get('createdAt') else 'N/A'
-                
-                # Add to CSV (escape quotes and newlines)
-                csv_content += f'"{user_id}","{user_name}","{user_email}","{summary_number}",{conversation_count},"{overall_rating}","{strengths_str}","{improvements_str}","{ai_analysis_str}","{date_range_str}","{stage_ratings_str}",{example_conv_count},"{created_date}"\n'
+            def format_batch(conversation_summaries):
+                # Resolve the batch's users with one query
+                users = lookup.get_users(summary.get('userId') for summary in conversation_summaries)
+                rows = []
+                for summary in conversation_summaries:
+                    user_id = summary.get('userId')
+                    user = users.get(str(user_id))
+                    
+                    strengths = summary.get('strengths', [])
+                    improvements = summary.get('improvements', [])
+                    ai_analysis = summary.get('aiAnalysis', {})
+                    date_range = summary.get('dateRange', {})
+                    stage_ratings = summary.get('stageRatings', {})
+                    example_conversations = summary.get('exampleConversations', [])
+                    
+                    rows.append([
+                        user_id,
+                        format_user_name(user),
+                        user.get('email', 'N/A') if user else "N/A",
+                        summary.get('summaryNumber', 'N/A'),
+                        summary.get('conversationCount', 0),
+                        summary.get('overallRating', 'N/A'),
+                        '; '.join(strengths) if strengths else 'None',
+                        '; '.join(improvements) if improvements else 'None',
+                        str(ai_analysis) if ai_analysis else 'None',
+                        str(date_range) if date_range else 'None',
+                        str(stage_ratings) if stage_ratings else 'None',
+                        len(example_conversations) if example_conversations else 0,
+                        summary['createdAt'].strftime('%Y-%m-%d %H:%M') if summary.get('createdAt') else 'N/A'
+                    ])
+                return rows
             
-            # Save to file
             filename = f"conversation_summaries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(csv_content)
-            
-            messagebox.showinfo("Success", f"Conversation summaries exported to {filename}")
+            self.run_csv_export(
+                "conversation summaries", filename,
+                ["User ID", "Name", "Email", "Summary Number", "Conversation Count", "Overall Rating", "Strengths",
+                 "Improvements", "AI Analysis", "Date Range", "Stage Ratings", "Example Conversations", "Created Date"],
+                self.admin.conversation_summaries_collection.find().sort('createdAt', -1).batch_size(CSV_EXPORT_BATCH_SIZE),
+                format_batch
+            )
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export summaries: {str(e)}")
@@ -3807,19 +4344,35 @@ MESSAGES:
                 messagebox.showerror("Error", "Not connected to database")
                 return
             
-            # Get all conversations with summaries
-            conversations = list(self.admin.conversations_collection.find({
-                'summary': {'$exists': True, '$ne': None}
-            }))
+            # Aggregate the conversations with summaries on the server
+            result = list(self.admin.conversations_collection.aggregate([
+                {'$match': {'summary': {'$exists': True, '$ne': None}}},
+                {'$facet': {
+                    'totals': [{'$group': {
+                        '_id': None,
+                        'count': {'$sum': 1},
+                        'duration': {'$sum': {'$ifNull': ['$duration', 0]}},
+                        'messages': {'$sum': {'$size': {'$ifNull': ['$messages', []]}}},
+                        **rating_band_counters()
+                    }}],
+                    'recent': [
+                        {'$sort': {'createdAt': -1}},
+                        {'$limit': 10},
+                        {'$project': {'title': 1, 'createdAt': 1, 'duration': 1}}
+                    ]
+                }}
+            ]))
+            transferred = bson_size(result)
+            totals = result[0]['totals'][0] if result and result[0]['totals'] else None
             
-            if not conversations:
+            if not totals:
                 messagebox.showinfo("Info", "No summaries found to generate report")
                 return
             
             # Calculate statistics
-            total_conversations = len(conversations)
-            total_duration = sum(conv.get('duration', 0) for conv in conversations)
-            total_messages = sum(len(conv.get('messages', [])) for conv in conversations)
+            total_conversations = totals['count']
+            total_duration = totals['duration']
+            total_messages = totals['messages']
             
             # Average duration
             avg_duration = total_duration / total_conversations if total_conversations > 0 else 0
@@ -3830,26 +4383,9 @@ MESSAGES:
             avg_messages = total_messages / total_conversations if total_conversations > 0 else 0
             
             # Rating distribution
-            ratings_count = {'excellent': 0, 'good': 0, 'average': 0, 'poor': 0}
-            for conv in conversations:
-                ratings = conv.get('aiRatings', {})
-                if ratings:
-                    total_score = sum([
-                        ratings.get('introduction', 0),
-                        ratings.get('mapping', 0),
-                        ratings.get('productPresentation', 0),
-                        ratings.get('objectionHandling', 0),
-                        ratings.get('close', 0)
-                    ])
-                    
-                    if total_score >= 40:
-                        ratings_count['excellent'] += 1
-                    elif total_score >= 30:
-                        ratings_count['good'] += 1
-                    elif total_score >= 20:
-                        ratings_count['average'] += 1
-                    else:
-                        ratings_count['poor'] += 1
+            rating_lines = '\n'.join(
+                f"- {rating_band_label(band)}: {totals[band]} conversations" for band in RATING_BANDS
+            )
             
             # Create report
             report_window = tk.Toplevel(self.admin.root)
@@ -3871,17 +4407,13 @@ SUMMARY STATISTICS:
 - Average Messages per Conversation: {avg_messages:.1f}
 
 RATING DISTRIBUTION:
-- Excellent (40-50): {ratings_count['excellent']} conversations
-- Good (30-39): {ratings_count['good']} conversations
-- Average (20-29): {ratings_count['average']} conversations
-- Poor (0-19): {ratings_count['poor']} conversations
+{rating_lines}
 
 RECENT ACTIVITY:
 """
             
             # Add recent conversations
-            recent_conversations = sorted(conversations, key=lambda x: x.get('createdAt', datetime.min), reverse=True)[:10]
-            for i, conv in enumerate(recent_conversations, 1):
+            for i, conv in enumerate(result[0]['recent'], 1):
                 title = conv.get('title', 'Untitled')[:50]
                 date = conv.get('createdAt', '').strftime('%Y-%m-%d') if conv.get('createdAt') else 'N/A'
                 duration = conv.get('duration', 0)
@@ -3889,6 +4421,7 @@ RECENT ACTIVITY:
                 
                 report_content += f"{i}. {title} - {date} ({duration_str})\n"
             
+            report_content += f"\nData transferred: {format_bytes(transferred)}"
             report_content += f"\nLast Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
             
             report_text.insert('1.0', report_content)
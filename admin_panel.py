@@ -14,7 +14,10 @@ import json
 from bson import ObjectId
 import threading
 from typing import Dict, List, Any, Optional
-from admin_methods import AdminMethods
+from admin_methods import AdminMethods, DEFAULT_CONVERSATION_PAGE_SIZE
+from export_module import DEFAULT_EXPORT_WORKERS
+from summaries_module import DEFAULT_SUMMARY_PAGE_SIZE
+from scheduler_module import RefreshScheduler, MIN_REFRESH_INTERVAL, MAX_REFRESH_INTERVAL, DEFAULT_REFRESH_INTERVAL
 from security_module import (
     InputValidator, SecureDatabaseQueries, SecurityError, 
     SecurityAuditLogger, secure_input_wrapper
@@ -37,6 +40,7 @@ class SalesBuddyAdmin:
         self.companies_collection = None
         self.conversations_collection = None
         self.conversation_summaries_collection = None
+        self.conversation_rollups_collection = None
         
         # Initialize methods
         self.methods = AdminMethods(self)
@@ -63,11 +67,22 @@ class SalesBuddyAdmin:
         self.create_conversations_tab()
         self.create_voice_settings_tab()
         self.create_ai_ratings_tab()
+        self.create_ratings_tab()
         self.create_subscription_tracking_tab()
         self.create_translations_tab()
         self.create_analytics_tab()
         self.create_settings_tab()
         
+        # Auto-refresh the visible tab in the background
+        self.refresh_scheduler = RefreshScheduler(
+            self.root, self.notebook,
+            interval_getter=lambda: self.refresh_interval_var.get(),
+            is_connected=lambda: self.connected,
+            status_callback=lambda text, color: self.status_label.config(text=text, fg=color)
+        )
+        self.refresh_scheduler.register("Dashboard", self.methods.collect_dashboard_data, self.methods.apply_dashboard_data)
+        self.refresh_scheduler.register("Conversations", self.methods.collect_conversation_rows, self.methods.apply_conversation_rows)
+        
     def create_dashboard_tab(self):
         """Create dashboard tab with overview statistics"""
         dashboard_frame = ttk.Frame(self.notebook)
@@ -136,7 +151,7 @@ class SalesBuddyAdmin:
         self.user_search_var = tk.StringVar()
         search_entry = tk.Entry(search_frame, textvariable=self.user_search_var, width=30)
         search_entry.pack(side='left', padx=10)
-        search_entry.bind('<KeyRelease>', self.methods.search_users)
+        search_entry.bind('<KeyRelease>', lambda e: self.methods.debounce('search_users', self.methods.search_users))
         
         # Filter buttons
         filter_frame = tk.Frame(search_frame)
@@ -157,7 +172,14 @@ class SalesBuddyAdmin:
         
         # Scrollbar for users tree
         users_scrollbar = ttk.Scrollbar(users_frame, orient='vertical', command=self.users_tree.yview)
-        self.users_tree.configure(yscrollcommand=users_scrollbar.set)
+        
+        def on_users_scroll(first, last):
+            users_scrollbar.set(first, last)
+            # Fetch the next page of users when the view nears the bottom
+            if float(last) > 0.9:
+                self.root.after_idle(self.methods.load_more_users_on_scroll)
+        
+        self.users_tree.configure(yscrollcommand=on_users_scroll)
         
         # Pack users tree and scrollbar
         self.users_tree.pack(side='left', fill='both', expand=True, padx=(10, 0), pady=10)
@@ -192,7 +214,7 @@ class SalesBuddyAdmin:
         self.company_search_var = tk.StringVar()
         search_entry = tk.Entry(search_frame, textvariable=self.company_search_var, width=30)
         search_entry.pack(side='left', padx=10)
-        search_entry.bind('<KeyRelease>', self.methods.search_companies)
+        search_entry.bind('<KeyRelease>', lambda e: self.methods.debounce('search_companies', self.methods.search_companies))
         
         # Companies treeview
         columns = ('ID', 'Name', 'Industry', 'Size', 'Admin', 'Users', 'Plan', 'Status', 'Created')
@@ -263,6 +285,15 @@ class SalesBuddyAdmin:
         tk.Button(username_frame, text="Clear Filters", command=self.methods.clear_conversation_filters, 
                  bg='#607D8B', fg='white').pack(side='left', padx=5)
         
+        # Message content search
+        tk.Label(username_frame, text="Search Messages:").pack(side='left', padx=(20, 5))
+        self.message_search_var = tk.StringVar()
+        message_search_entry = tk.Entry(username_frame, textvariable=self.message_search_var, width=25)
+        message_search_entry.pack(side='left', padx=5)
+        message_search_entry.bind('<Return>', lambda e: self.methods.search_conversation_messages())
+        tk.Button(username_frame, text="Search Messages", command=self.methods.search_conversation_messages, 
+                 bg='#9C27B0', fg='white').pack(side='left', padx=5)
+        
         # Conversations treeview
         columns = ('ID', 'User', 'Title', 'Scenario', 'Messages', 'Rating', 'Duration', 'Created')
         self.conversations_tree = ttk.Treeview(conversations_frame, columns=columns, show='headings', height=15)
@@ -290,6 +321,18 @@ class SalesBuddyAdmin:
         tk.Button(actions_frame, text="Refresh", command=self.methods.load_conversations, 
                  bg='#4CAF50', fg='white').pack(side='left', padx=5)
         
+        # Page navigation
+        tk.Button(actions_frame, text="Next ▶", command=self.methods.next_conversations_page).pack(side='right', padx=5)
+        self.conversation_page_label = tk.Label(actions_frame, text="Page 0")
+        self.conversation_page_label.pack(side='right', padx=5)
+        tk.Button(actions_frame, text="◀ Previous", command=self.methods.previous_conversations_page).pack(side='right', padx=5)
+        
+        self.conversation_page_size_var = tk.StringVar(value=str(DEFAULT_CONVERSATION_PAGE_SIZE))
+        page_size_entry = tk.Entry(actions_frame, textvariable=self.conversation_page_size_var, width=5)
+        page_size_entry.pack(side='right', padx=5)
+        page_size_entry.bind('<Return>', self.methods.change_conversation_page_size)
+        tk.Label(actions_frame, text="Page size:").pack(side='right')
+        
         # Bind double-click event
         self.conversations_tree.bind('<Double-1>', self.methods.view_conversation)
         
@@ -388,6 +431,7 @@ class SalesBuddyAdmin:
         self.summary_search_var = tk.StringVar()
         search_entry = tk.Entry(filter_frame, textvariable=self.summary_search_var, width=25)
         search_entry.pack(side='left', padx=5)
+        search_entry.bind('<Return>', self.methods.search_summaries)
         
         tk.Button(filter_frame, text="Search", command=self.methods.search_summaries, 
                  bg='#4CAF50', fg='white').pack(side='left', padx=5)
@@ -430,9 +474,100 @@ class SalesBuddyAdmin:
         tk.Button(actions_frame, text="Generate Report", command=self.methods.generate_summary_report, 
                  bg='#9C27B0', fg='white').pack(side='left', padx=5)
         
+        # Page navigation
+        tk.Button(actions_frame, text="Next ▶", command=self.methods.next_summaries_page).pack(side='right', padx=5)
+        self.summary_page_label = tk.Label(actions_frame, text="Page 0")
+        self.summary_page_label.pack(side='right', padx=5)
+        tk.Button(actions_frame, text="◀ Previous", command=self.methods.previous_summaries_page).pack(side='right', padx=5)
+        
+        self.summary_page_size_var = tk.StringVar(value=str(DEFAULT_SUMMARY_PAGE_SIZE))
+        page_size_entry = tk.Entry(actions_frame, textvariable=self.summary_page_size_var, width=5)
+        page_size_entry.pack(side='right', padx=5)
+        page_size_entry.bind('<Return>', lambda e: self.methods.load_all_summaries())
+        tk.Label(actions_frame, text="Page size:").pack(side='right')
+        
         # Bind double-click event
         self.summaries_tree.bind('<Double-1>', self.methods.view_full_summary)
         
+    def create_ratings_tab(self):
+        """Create AI ratings tab"""
+        ratings_frame = ttk.Frame(self.notebook)
+        self.notebook.add(ratings_frame, text="AI Ratings")
+        
+        # Filter frame
+        filter_frame = tk.Frame(ratings_frame)
+        filter_frame.pack(fill='x', padx=10, pady=10)
+        
+        tk.Label(filter_frame, text="Total Score:", font=('Arial', 12, 'bold')).pack(side='left')
+        
+        self.min_rating_var = tk.StringVar(value='0')
+        tk.Label(filter_frame, text="Min:").pack(side='left', padx=(20, 5))
+        tk.Entry(filter_frame, textvariable=self.min_rating_var, width=6).pack(side='left', padx=5)
+        
+        self.max_rating_var = tk.StringVar(value='50')
+        tk.Label(filter_frame, text="Max:").pack(side='left', padx=(20, 5))
+        tk.Entry(filter_frame, textvariable=self.max_rating_var, width=6).pack(side='left', padx=5)
+        
+        tk.Button(filter_frame, text="Apply Filter", command=self.methods.filter_ratings, 
+                 bg='#4CAF50', fg='white').pack(side='left', padx=20)
+        
+        # Report scope (empty fields are not applied)
+        scope_frame = tk.Frame(ratings_frame)
+        scope_frame.pack(fill='x', padx=10, pady=5)
+        
+        tk.Label(scope_frame, text="Report Scope:", font=('Arial', 12, 'bold')).pack(side='left')
+        
+        self.report_date_from_var = tk.StringVar()
+        tk.Label(scope_frame, text="From:").pack(side='left', padx=(20, 5))
+        tk.Entry(scope_frame, textvariable=self.report_date_from_var, width=12).pack(side='left', padx=5)
+        
+        self.report_date_to_var = tk.StringVar()
+        tk.Label(scope_frame, text="To:").pack(side='left', padx=(20, 5))
+        tk.Entry(scope_frame, textvariable=self.report_date_to_var, width=12).pack(side='left', padx=5)
+        
+        self.report_company_var = tk.StringVar()
+        tk.Label(scope_frame, text="Company:").pack(side='left', padx=(20, 5))
+        tk.Entry(scope_frame, textvariable=self.report_company_var, width=20).pack(side='left', padx=5)
+        
+        # Ratings treeview
+        columns = ('ID', 'User', 'Total Score', 'Introduction', 'Mapping', 'Presentation', 
+                   'Objections', 'Close', 'Date')
+        self.ratings_tree = ttk.Treeview(ratings_frame, columns=columns, show='headings', height=15)
+        
+        for col in columns:
+            self.ratings_tree.heading(col, text=col)
+            self.ratings_tree.column(col, width=140 if col == 'Total Score' else 100)
+        
+        # Scrollbar for ratings tree
+        ratings_scrollbar = ttk.Scrollbar(ratings_frame, orient='vertical', command=self.ratings_tree.yview)
+        self.ratings_tree.configure(yscrollcommand=ratings_scrollbar.set)
+        
+        # Pack ratings tree and scrollbar
+        self.ratings_tree.pack(side='left', fill='both', expand=True, padx=(10, 0), pady=10)
+        ratings_scrollbar.pack(side='right', fill='y', pady=10)
+        
+        # Rating actions frame
+        actions_frame = tk.Frame(ratings_frame)
+        actions_frame.pack(fill='x', padx=10, pady=10)
+        
+        tk.Button(actions_frame, text="View Details", command=self.methods.view_rating_details, 
+                 bg='#2196F3', fg='white').pack(side='left', padx=5)
+        tk.Button(actions_frame, text="Export Ratings", command=self.methods.export_ratings, 
+                 bg='#607D8B', fg='white').pack(side='left', padx=5)
+        tk.Button(actions_frame, text="Generate Report", command=self.methods.generate_rating_report, 
+                 bg='#9C27B0', fg='white').pack(side='left', padx=5)
+        tk.Button(actions_frame, text="Refresh", command=self.methods.load_ratings, 
+                 bg='#4CAF50', fg='white').pack(side='left', padx=5)
+        
+        # Page navigation
+        tk.Button(actions_frame, text="Next ▶", command=self.methods.next_ratings_page).pack(side='right', padx=5)
+        self.ratings_page_label = tk.Label(actions_frame, text="Page 0")
+        self.ratings_page_label.pack(side='right', padx=5)
+        tk.Button(actions_frame, text="◀ Previous", command=self.methods.previous_ratings_page).pack(side='right', padx=5)
+        
+        # Bind double-click event
+        self.ratings_tree.bind('<Double-1>', lambda e: self.methods.view_rating_details())
+        
     def create_subscription_tracking_tab(self):
         """Create subscription and usage tracking tab"""
         subscription_frame = ttk.Frame(self.notebook)
@@ -588,9 +723,27 @@ class SalesBuddyAdmin:
         analytics_frame = ttk.Frame(self.notebook)
         self.notebook.add(analytics_frame, text="Analytics")
         
-        # Analytics content will be added here
-        tk.Label(analytics_frame, text="Analytics Dashboard", font=('Arial', 16, 'bold')).pack(pady=50)
-        tk.Label(analytics_frame, text="Coming Soon - Advanced analytics and reporting features").pack()
+        # Title
+        tk.Label(analytics_frame, text="Rating Analytics", font=('Arial', 16, 'bold')).pack(pady=20)
+        
+        # Date range frame (empty fields are not applied)
+        filter_frame = tk.Frame(analytics_frame)
+        filter_frame.pack(fill='x', padx=20, pady=10)
+        
+        self.analytics_date_from_var = tk.StringVar()
+        tk.Label(filter_frame, text="From:").pack(side='left', padx=(0, 5))
+        tk.Entry(filter_frame, textvariable=self.analytics_date_from_var, width=12).pack(side='left', padx=5)
+        
+        self.analytics_date_to_var = tk.StringVar()
+        tk.Label(filter_frame, text="To:").pack(side='left', padx=(20, 5))
+        tk.Entry(filter_frame, textvariable=self.analytics_date_to_var, width=12).pack(side='left', padx=5)
+        
+        tk.Button(filter_frame, text="Run Analytics", command=self.methods.run_rating_analytics, 
+                 bg='#4CAF50', fg='white').pack(side='left', padx=20)
+        
+        # Analytics output
+        self.analytics_text = scrolledtext.ScrolledText(analytics_frame, font=('Courier', 10))
+        self.analytics_text.pack(fill='both', expand=True, padx=20, pady=10)
         
     def create_settings_tab(self):
         """Create settings tab"""
@@ -616,7 +769,7 @@ class SalesBuddyAdmin:
         app_frame.pack(fill='x', padx=20, pady=20)
         
         tk.Label(app_frame, text="Auto-refresh interval (seconds):").pack(anchor='w', padx=10, pady=5)
-        self.refresh_interval_var = tk.StringVar(value="30")
+        self.refresh_interval_var = tk.StringVar(value=str(DEFAULT_REFRESH_INTERVAL))
         refresh_entry = tk.Entry(app_frame, textvariable=self.refresh_interval_var, width=10)
         refresh_entry.pack(anchor='w', padx=10, pady=5)
         
@@ -630,15 +783,59 @@ class SalesBuddyAdmin:
                     )
                     # Convert to int and validate range
                     int_value = int(validated_value)
-                    if int_value < 5 or int_value > 3600:  # 5 seconds to 1 hour
-                        self.refresh_interval_var.set("30")  # Reset to default
+                    if int_value < MIN_REFRESH_INTERVAL or int_value > MAX_REFRESH_INTERVAL:  # 5 seconds to 1 hour
+                        self.refresh_interval_var.set(str(DEFAULT_REFRESH_INTERVAL))  # Reset to default
                         messagebox.showwarning("Invalid Input", "Refresh interval must be between 5 and 3600 seconds")
             except (SecurityError, ValueError):
-                self.refresh_interval_var.set("30")  # Reset to default
+                self.refresh_interval_var.set(str(DEFAULT_REFRESH_INTERVAL))  # Reset to default
                 messagebox.showwarning("Invalid Input", "Please enter a valid number for refresh interval")
         
         self.refresh_interval_var.trace('w', validate_refresh_interval)
         
+        tk.Label(app_frame, text="Export workers (parallel cursors for full exports):").pack(anchor='w', padx=10, pady=5)
+        self.export_workers_var = tk.StringVar(value=str(DEFAULT_EXPORT_WORKERS))
+        tk.Entry(app_frame, textvariable=self.export_workers_var, width=10).pack(anchor='w', padx=10, pady=5)
+        
+        # Usage rollup maintenance
+        rollups_frame = tk.LabelFrame(settings_frame, text="Usage Rollups", font=('Arial', 12, 'bold'))
+        rollups_frame.pack(fill='x', padx=20, pady=20)
+        
+        tk.Label(rollups_frame, text="Daily and monthly usage counters are updated automatically, including after "
+                                     "deleting users, companies or old conversations here. Rebuild them after "
+                                     "imports or deletions made outside this panel.", fg='gray').pack(anchor='w', padx=10, pady=5)
+        tk.Button(rollups_frame, text="Rebuild Usage Rollups", command=self.methods.rebuild_usage_rollups, 
+                 bg='#FF9800', fg='white').pack(anchor='w', padx=10, pady=10)
+        
+        # Message search index
+        search_index_frame = tk.LabelFrame(settings_frame, text="Message Search", font=('Arial', 12, 'bold'))
+        search_index_frame.pack(fill='x', padx=20, pady=20)
+        
+        tk.Label(search_index_frame, text="Without a text index, message search builds an in-memory index "
+                                          "on first use and rebuilds it when conversations are added or deleted "
+                                          "(edits are picked up within 5 minutes).", fg='gray').pack(anchor='w', padx=10, pady=5)
+        tk.Button(search_index_frame, text="Create Text Index", command=self.methods.create_message_text_index, 
+                 bg='#9C27B0', fg='white').pack(anchor='w', padx=10, pady=10)
+        tk.Button(search_index_frame, text="Refresh Search Index", command=self.methods.refresh_message_search, 
+                 bg='#9C27B0', fg='white').pack(anchor='w', padx=10, pady=(0, 10))
+        
+        # Database backup
+        backup_frame = tk.LabelFrame(settings_frame, text="Database Backup", font=('Arial', 12, 'bold'))
+        backup_frame.pack(fill='x', padx=20, pady=20)
+        
+        tk.Label(backup_frame, text="Backups keep every field's type and are written to database_backups/ "
+                                    "on parallel cursors (see Export workers).", fg='gray').pack(anchor='w', padx=10, pady=5)
+        backup_buttons = tk.Frame(backup_frame)
+        backup_buttons.pack(anchor='w', padx=10, pady=10)
+        tk.Button(backup_buttons, text="Create Backup", command=self.methods.create_database_backup,
+                 bg='#4CAF50', fg='white').pack(side='left', padx=5)
+        self.backup_cancel_button = tk.Button(backup_buttons, text="Cancel Backup",
+                                              command=self.methods.cancel_database_backup, state='disabled')
+        self.backup_cancel_button.pack(side='left', padx=5)
+        tk.Button(backup_buttons, text="Verify Backup", command=self.methods.verify_database_backup).pack(side='left', padx=5)
+        tk.Button(backup_buttons, text="List Backups", command=self.methods.list_database_backups).pack(side='left', padx=5)
+        tk.Button(backup_buttons, text="Restore Backup", command=self.methods.restore_database_backup,
+                 bg='#f44336', fg='white').pack(side='left', padx=5)
+        
     def connect_to_database(self):
         """Connect to MongoDB database"""
         try:
@@ -674,6 +871,7 @@ class SalesBuddyAdmin:
                 self.password_resets_collection = self.db.passwordresets
                 self.translations_collection = self.db.translations
                 self.translation_keys_collection = self.db.translationkeys
+                self.conversation_rollups_collection = self.db.conversationrollups
                 
                 self.connected = True
                 self.status_label.config(text="Connected to MongoDB", fg='green')
@@ -694,6 +892,7 @@ class SalesBuddyAdmin:
             threading.Thread(target=self.methods.load_companies, daemon=True).start()
             threading.Thread(target=self.methods.load_conversations, daemon=True).start()
             threading.Thread(target=self.methods.refresh_dashboard, daemon=True).start()
+            self.refresh_scheduler.start()
     
     @secure_input_wrapper
     def test_connection(self):
@@ -745,6 +944,7 @@ class SalesBuddyAdmin:
             self.companies_collection = self.db.companies
             self.conversations_collection = self.db.conversations
             self.conversation_summaries_collection = self.db.conversationsummaries
+            self.conversation_rollups_collection = self.db.conversationrollups
             
             self.connected = True
             self.status_label.config(text="Connected to MongoDB", fg='green')
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Analytics Module
+Columnar, vectorized analytics over AI conversation ratings
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ratings_module import RATED_CONVERSATIONS_QUERY, RATING_STAGES
+
+PERCENTILES = (10, 25, 50, 75, 90)
+LOAD_BATCH_SIZE = 10000
+
+def linear_fit(x: np.ndarray, y: np.ndarray) -> Dict[str, float]:
+    """Least-squares line y = slope * x + intercept with its r squared"""
+    if len(x) < 2 or np.ptp(x) == 0:
+        return {'slope': 0.0, 'intercept': float(y.mean()) if len(y) else 0.0, 'r2': 0.0}
+    x_mean, y_mean = x.mean(), y.mean()
+    x_dev, y_dev = x - x_mean, y - y_mean
+    slope = (x_dev @ y_dev) / (x_dev @ x_dev)
+    residuals = y_dev - slope * x_dev
+    total = y_dev @ y_dev
+    return {
+        'slope': float(slope),
+        'intercept': float(y_mean - slope * x_mean),
+        'r2': float(1 - (residuals @ residuals) / total) if total else 0.0
+    }
+
+def integer_percentiles(values: np.ndarray, percentiles=PERCENTILES) -> np.ndarray:
+    """
+    Percentiles of small non-negative integers from their histogram
+
+    Matches np.percentile's linear interpolation but needs one bincount
+    instead of a sort, which matters at millions of rows.
+    """
+    cumulative = np.cumsum(np.bincount(values))
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (len(values) - 1)
+    lower = np.searchsorted(cumulative, np.floor(positions), side='right')
+    upper = np.searchsorted(cumulative, np.ceil(positions), side='right')
+    return lower + (upper - lower) * (positions - np.floor(positions))
+
+def weekly_means(created: np.ndarray, columns: np.ndarray, fields: List[str]) -> pd.DataFrame:
+    """Count and column means per Monday-based week, via bincount instead of resample"""
+    if not len(created):
+        return pd.DataFrame(columns=['count', *fields], index=pd.DatetimeIndex([], name='week'))
+    # Day 0 (1970-01-01) was a Thursday, so shifting by 3 days aligns weeks to Mondays
+    days = created.astype('datetime64[D]').astype(np.int64)
+    weeks = (days + 3) // 7
+    first = weeks.min()
+    offsets = weeks - first
+    counts = np.bincount(offsets)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = {field: np.bincount(offsets, weights=columns[:, i]) / counts for i, field in enumerate(fields)}
+    starts = ((np.arange(len(counts)) + first) * 7 - 3).astype('datetime64[D]')
+    weekly = pd.DataFrame({'count': counts, **means}, index=pd.DatetimeIndex(starts, name='week'))
+    return weekly[weekly['count'] > 0].round(2)
+
+class RatingAnalytics:
+    """
+    Rating analytics computed on columnar arrays
+
+    load() streams only the scalar fields of rated conversations (five stage
+    scores, duration, user and date) into a DataFrame with one numeric
+    column per field. compute() then derives every statistic with array
+    operations, so its cost grows with the row count but never with
+    Python-level loops over conversations.
+    """
+
+    def __init__(self, conversations_collection):
+        self.conversations_collection = conversations_collection
+
+    def load(self, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        Load the rated conversations in [date_from, date_to) as columns
+
+        Returns:
+            DataFrame with one int column per stage, 'total', 'duration'
+            (seconds), 'userId' (string) and 'createdAt'
+        """
+        match = dict(RATED_CONVERSATIONS_QUERY)
+        # Conversations without a real createdAt cannot be placed in a week
+        created = {'$type': 'date'}
+        if date_from:
+            created['$gte'] = date_from
+        if date_to:
+            created['$lt'] = date_to
+        match['createdAt'] = created
+
+        # Flatten on the server so each row arrives as a few scalars
+        projection = {stage: {'$ifNull': [f'$aiRatings.{stage}', 0]} for stage in RATING_STAGES}
+        projection.update({
+            '_id': 0,
+            'duration': {'$ifNull': ['$duration', 0]},
+            'userId': {'$toString': '$userId'},
+            'createdAt': 1
+        })
+        cursor = self.conversations_collection.aggregate(
+            [{'$match': match}, {'$project': projection}], batchSize=LOAD_BATCH_SIZE
+        )
+
+        columns: Dict[str, List[Any]] = {field: [] for field in (*RATING_STAGES, 'duration', 'userId', 'createdAt')}
+        appends = [(field, columns[field].append) for field in columns]
+        for doc in cursor:
+            for field, append in appends:
+                append(doc.get(field))
+
+        frame = pd.DataFrame({
+            # Stage scores are whole numbers; round stray fractions instead of truncating them
+            **{stage: np.rint(np.asarray(columns[stage], dtype=np.float64)).astype(np.int16) for stage in RATING_STAGES},
+            'duration': np.asarray(columns['duration'], dtype=np.float64),
+            'userId': pd.Series(columns['userId'], dtype='category'),
+            'createdAt': pd.to_datetime(pd.Series(columns['createdAt'], dtype=object))
+        })
+        frame['total'] = frame[list(RATING_STAGES)].sum(axis=1).astype(np.int16)
+        return frame
+
+    @staticmethod
+    def compute(frame: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Compute the analytics for loaded ratings
+
+        Returns:
+            Dict with 'count', 'users', 'percentiles' (per stage and total),
+            'correlations' (stage-by-stage matrix), 'stage_vs_total',
+            'duration_fits' (score against duration in minutes, per stage
+            and total), 'weekly' (per-week count and mean scores),
+            'top_users' and 'compute_ms'
+        """
+        started = time.perf_counter()
+        fields = [*RATING_STAGES, 'total']
+        count = len(frame)
+        if not count:
+            return {'count': 0, 'users': 0, 'compute_ms': 0.0}
+
+        integer_scores = frame[fields].to_numpy(dtype=np.int64)
+        scores = integer_scores.astype(np.float64)
+
+        # Scores are small integers, so percentiles come from histograms
+        percentiles = {
+            field: dict(zip(PERCENTILES, integer_percentiles(integer_scores[:, i]).round(1).tolist()))
+            for i, field in enumerate(fields)
+        }
+
+        # Pearson correlations; constant columns yield NaN, reported as 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation_matrix = np.nan_to_num(np.corrcoef(scores, rowvar=False))
+        stage_count = len(RATING_STAGES)
+        correlations = {
+            stage: dict(zip(RATING_STAGES, correlation_matrix[i, :stage_count].round(3).tolist()))
+            for i, stage in enumerate(RATING_STAGES)
+        }
+        stage_vs_total = dict(zip(RATING_STAGES, correlation_matrix[:stage_count, -1].round(3).tolist()))
+
+        # Score against duration, ignoring conversations without a duration
+        minutes = frame['duration'].to_numpy() / 60
+        timed = minutes > 0
+        timed_minutes, timed_scores = minutes[timed], scores[timed]
+        duration_fits = {field: linear_fit(timed_minutes, timed_scores[:, i]) for i, field in enumerate(fields)}
+
+        # Weekly trend (weeks start on Monday); rows without a date are left out
+        dated = frame['createdAt'].notna().to_numpy()
+        weekly = weekly_means(frame['createdAt'].to_numpy()[dated], scores[dated], fields)
+
+        # Users with the highest average total (at least 5 rated conversations)
+        per_user = frame.groupby('userId', observed=True)['total'].agg(['count', 'mean'])
+        top_users = per_user[per_user['count'] >= 5].nlargest(10, 'mean').round(2)
+
+        return {
+            'count': count,
+            'users': int(frame['userId'].nunique()),
+            'percentiles': percentiles,
+            'correlations': correlations,
+            'stage_vs_total': stage_vs_total,
+            'duration_fits': duration_fits,
+            'weekly': weekly,
+            'top_users': top_users,
+            'compute_ms': (time.perf_counter() - started) * 1000
+        }
+
+    def run(self, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Dict[str, Any]:
+        """Load and compute in one call, adding 'load_ms' to the result"""
+        started = time.perf_counter()
+        frame = self.load(date_from, date_to)
+        load_ms = (time.perf_counter() - started) * 1000
+        result = self.compute(frame)
+        result['load_ms'] = load_ms
+        return result
+
+def synthetic_ratings(rows: int, users: int = 5000, seed: int = 0) -> pd.DataFrame:
+    """Random ratings frame shaped like RatingAnalytics.load() output, for benchmarks"""
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({stage: rng.integers(0, 11, rows, dtype=np.int16) for stage in RATING_STAGES})
+    frame['duration'] = rng.integers(0, 3600, rows).astype(np.float64)
+    frame['userId'] = pd.Categorical.from_codes(rng.integers(0, users, rows), [f"user{i}" for i in range(users)])
+    frame['createdAt'] = pd.Timestamp('2025-01-01') + pd.to_timedelta(rng.integers(0, 365 * 86400, rows), unit='s')
+    frame['total'] = frame[list(RATING_STAGES)].sum(axis=1).astype(np.int16)
+    return frame
@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Backup Module
+Streaming, type-preserving database backups in per-collection BSON files
+"""
+
+import gzip
+import hashlib
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import bson
+from bson import json_util
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+from export_module import DEFAULT_EXPORT_WORKERS, MAX_EXPORT_WORKERS, RANGES_PER_WORKER, split_id_ranges
+
+# Collections included in a full backup
+BACKUP_COLLECTIONS = ('users', 'companies', 'conversations', 'conversationsummaries', 'translations', 'translationkeys')
+BACKUP_DIRECTORY = 'database_backups'
+MANIFEST_FILE = 'manifest.json'
+BACKUP_FORMAT = 'bson.gz'
+BACKUP_FORMAT_VERSION = 2
+DEFAULT_BACKUP_BATCH_SIZE = 1000
+# gzip level 1 compresses BSON well at several times the speed of the default 9
+DEFAULT_COMPRESS_LEVEL = 1
+# Collections with at least this many documents are backed up in _id ranges
+SPLIT_MIN_DOCUMENTS = 100000
+
+# Documents are passed through as the server's BSON bytes, never decoded
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+class BackupCancelled(Exception):
+    """Raised by a backup that was cancelled while running"""
+
+def raw_collection(collection):
+    """The same collection returning RawBSONDocuments"""
+    return collection.with_options(codec_options=RAW_CODEC_OPTIONS)
+
+def document_bytes(doc: Any) -> bytes:
+    """BSON bytes of a document, without re-encoding raw documents"""
+    return doc.raw if isinstance(doc, RawBSONDocument) else bson.encode(doc)
+
+def backup_file_name(collection_name: str, part: Optional[int] = None) -> str:
+    """File holding one collection's documents, or one _id range of them"""
+    if part is None:
+        return f"{collection_name}.{BACKUP_FORMAT}"
+    return f"{collection_name}.part{part:04d}.{BACKUP_FORMAT}"
+
+def backup_files(entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Files of a manifest collection entry, in order (version 1 entries had a single file)"""
+    if 'files' in entry:
+        return entry['files']
+    return [{'file': entry['file'], 'documents': entry['documents'], 'sha256': entry['sha256']}]
+
+def load_manifest(directory: str) -> Dict[str, Any]:
+    """Read a backup's manifest, restoring the BSON types of its index specs"""
+    with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        return json_util.loads(f.read())
+
+def read_backup_file(directory: str, file_name: str) -> Iterator[RawBSONDocument]:
+    """Stream the documents of one backup file, as RawBSONDocuments"""
+    with gzip.open(os.path.join(directory, file_name), 'rb') as f:
+        yield from bson.decode_file_iter(f, RAW_CODEC_OPTIONS)
+
+def read_backup_documents(directory: str, entry: Dict[str, Any]) -> Iterator[RawBSONDocument]:
+    """Stream one collection's documents from a backup, file by file"""
+    for part in backup_files(entry):
+        yield from read_backup_file(directory, part['file'])
+
+def list_backups(root: str = BACKUP_DIRECTORY) -> List[Dict[str, Any]]:
+    """
+    Find the backups under root, newest first
+
+    Returns:
+        Manifests with an added 'directory' key
+    """
+    backups = []
+    if not os.path.isdir(root):
+        return backups
+    for name in os.listdir(root):
+        directory = os.path.join(root, name)
+        if os.path.isfile(os.path.join(directory, MANIFEST_FILE)):
+            manifest = load_manifest(directory)
+            manifest['directory'] = directory
+            backups.append(manifest)
+    backups.sort(key=lambda manifest: manifest.get('createdAt', ''), reverse=True)
+    return backups
+
+def format_backup_report(manifest: Dict[str, Any]) -> str:
+    """Timing report of a finished backup, per collection and overall"""
+    collections = manifest['collections']
+    lines = [
+        f"{'Collection':<24} {'Docs':>11} {'Parts':>5} {'BSON MB':>9} {'gzip MB':>8} {'Seconds':>8} {'Docs/s':>10} {'MB/s':>7}"
+    ]
+    for name, entry in collections.items():
+        elapsed = entry['elapsed']
+        mb = entry['bytes'] / 1048576
+        lines.append(
+            f"{name:<24} {entry['documents']:>11,} {len(backup_files(entry)):>5} {mb:>9.1f} "
+            f"{entry['compressedBytes'] / 1048576:>8.1f} {elapsed:>8.1f} "
+            f"{entry['documents'] / elapsed if elapsed > 0 else 0:>10,.0f} {mb / elapsed if elapsed > 0 else 0:>7.1f}"
+        )
+
+    elapsed = manifest['elapsed']
+    documents = sum(entry['documents'] for entry in collections.values())
+    mb = sum(entry['bytes'] for entry in collections.values()) / 1048576
+    serial = sum(part['elapsed'] for entry in collections.values() for part in entry.get('files', []))
+    lines += [
+        "",
+        f"Total: {documents:,} documents, {mb:.1f} MB BSON, "
+        f"{sum(entry['compressedBytes'] for entry in collections.values()) / 1048576:.1f} MB compressed",
+        f"Wall time: {elapsed:.1f}s with {manifest.get('workers', 1)} workers "
+        f"({documents / elapsed if elapsed > 0 else 0:,.0f} docs/s, {mb / elapsed if elapsed > 0 else 0:.1f} MB/s)",
+        f"Summed part time: {serial:.1f}s ({serial / elapsed if elapsed > 0 else 0:.1f}x parallelism)"
+    ]
+    return '\n'.join(lines)
+
+class BackupEngine:
+    """
+    Back up and restore collections without holding them in memory
+
+    Each collection is streamed from a batched cursor into gzip-compressed
+    files of concatenated BSON documents (the mongodump layout). Documents
+    stay in the server's BSON encoding from the cursor to the file and back,
+    so ObjectIds, datetimes, Int64s, decimals and binary values are restored
+    exactly, and no time is spent converting them. A manifest records
+    per-file counts, a SHA-256 of each BSON stream, timings and the index
+    definitions.
+
+    Backups run on a thread pool: small collections are one task each, and
+    large ones are split into ObjectId ranges (see split_id_ranges) written
+    to part files, plus one part for any _id that is not an ObjectId. Progress
+    is reported across all parts, and cancel() stops a running backup.
+    """
+
+    # Seconds between progress callbacks
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        db,
+        workers: int = DEFAULT_EXPORT_WORKERS,
+        batch_size: int = DEFAULT_BACKUP_BATCH_SIZE,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.db = db
+        self.workers = max(1, min(workers, MAX_EXPORT_WORKERS))
+        self.batch_size = batch_size
+        self.compress_level = compress_level
+        self.progress_callback = progress_callback
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        self.part_stats: Dict[tuple, Dict[str, Any]] = {}
+        self.started = 0.0
+        self.last_progress = 0.0
+
+    def cancel(self) -> None:
+        """Stop the running backup; backup() then raises BackupCancelled"""
+        self.cancel_event.set()
+
+    def backup(self, directory: str, collections: Iterable[str] = BACKUP_COLLECTIONS) -> Dict[str, Any]:
+        """
+        Back up collections into a new backup directory
+
+        Args:
+            directory: Directory to create for this backup; it is removed
+                again if the backup fails or is cancelled
+            collections: Collection names to include
+
+        Returns:
+            The manifest: 'createdAt', 'database', 'format', 'version',
+            'workers', 'collections' (per collection: documents, bytes of
+            BSON, compressedBytes, elapsed, indexes and 'files', each with
+            its own counts, sha256 and timings) and 'elapsed'
+
+        Raises:
+            BackupCancelled: cancel() was called during the backup
+        """
+        self.cancel_event.clear()
+        self.part_stats = {}
+        self.started = self.last_progress = time.perf_counter()
+        os.makedirs(directory, exist_ok=False)
+        manifest = {
+            'createdAt': datetime.now().isoformat(),
+            'database': self.db.name,
+            'format': BACKUP_FORMAT,
+            'version': BACKUP_FORMAT_VERSION,
+            'workers': self.workers,
+            'collections': {}
+        }
+
+        try:
+            tasks = []
+            indexes = {}
+            for name in collections:
+                indexes[name] = [dict(index) for index in self.db[name].list_indexes()]
+                ranges = self.split_collection(name)
+                if ranges is None:
+                    tasks.append((name, None, None))
+                else:
+                    tasks += [(name, part, id_range) for part, id_range in enumerate(ranges)]
+
+            results: Dict[tuple, Dict[str, Any]] = {}
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {
+                    pool.submit(self.backup_part, name, part, id_range, directory): (name, part)
+                    for name, part, id_range in tasks
+                }
+                for future in as_completed(futures):
+                    try:
+                        results[futures[future]] = future.result()
+                    except BaseException:
+                        # Leaving the with block waits for every queued part,
+                        # so drop them here instead of streaming the rest
+                        self.cancel_event.set()
+                        pool.shutdown(wait=True, cancel_futures=True)
+                        raise
+        except BaseException:
+            # Stop the other workers and do not leave a partial backup behind
+            self.cancel_event.set()
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+
+        for name in indexes:
+            parts = [results[(task_name, part)] for task_name, part, _ in tasks if task_name == name]
+            manifest['collections'][name] = {
+                'documents': sum(part['documents'] for part in parts),
+                'bytes': sum(part['bytes'] for part in parts),
+                'compressedBytes': sum(part['compressedBytes'] for part in parts),
+                'elapsed': max(part['finished'] for part in parts) - min(part['started'] for part in parts),
+                'indexes': indexes[name],
+                'files': parts
+            }
+        manifest['elapsed'] = time.perf_counter() - self.started
+
+        self.write_manifest(directory, manifest)
+        return manifest
+
+    def split_collection(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        _id conditions splitting a large collection into parts
+
+        Returns:
+            None for collections backed up in one piece, otherwise the
+            ObjectId ranges followed by a condition for non-ObjectId ids
+        """
+        collection = self.db[name]
+        if self.workers == 1 or collection.estimated_document_count() < SPLIT_MIN_DOCUMENTS:
+            return None
+        ranges = split_id_ranges(collection, {'_id': {'$type': 'objectId'}}, self.workers * RANGES_PER_WORKER)
+        if not ranges:
+            return None
+        # Leave the newest range open so documents inserted meanwhile are included
+        ranges[0] = {'$gte': ranges[0]['$gte']}
+        return ranges + [{'$not': {'$type': 'objectId'}}]
+
+    def backup_part(self, name: str, part: Optional[int], id_range: Optional[Dict[str, Any]],
+                    directory: str) -> Dict[str, Any]:
+        """Worker: stream one collection, or one _id range of it, into its file"""
+        if self.cancel_event.is_set():
+            raise BackupCancelled()
+
+        started = time.perf_counter()
+        file_name = backup_file_name(name, part)
+        path = os.path.join(directory, file_name)
+        checksum = hashlib.sha256()
+        stats = {'file': file_name, 'documents': 0, 'bytes': 0}
+        key = (name, part)
+
+        query = {'_id': id_range} if id_range else {}
+        cursor = raw_collection(self.db[name]).find(query).batch_size(self.batch_size)
+        try:
+            with gzip.open(path, 'wb', compresslevel=self.compress_level) as f:
+                for doc in cursor:
+                    data = document_bytes(doc)
+                    f.write(data)
+                    checksum.update(data)
+                    stats['documents'] += 1
+                    stats['bytes'] += len(data)
+
+                    if stats['documents'] % self.batch_size == 0:
+                        if self.cancel_event.is_set():
+                            raise BackupCancelled()
+                        self._report_part(key, stats)
+        finally:
+            cursor.close()
+
+        stats.update({
+            'compressedBytes': os.path.getsize(path),
+            'sha256': checksum.hexdigest(),
+            'started': started - self.started,
+            'finished': time.perf_counter() - self.started,
+            'elapsed': time.perf_counter() - started
+        })
+        if id_range:
+            stats['idRange'] = id_range
+        self._report_part(key, stats, force=True)
+        return stats
+
+    def _report_part(self, key: tuple, stats: Dict[str, Any], force: bool = False) -> None:
+        """Combine per-part progress into overall progress (throttled)"""
+        if not self.progress_callback:
+            return
+        now = time.perf_counter()
+        with self.lock:
+            self.part_stats[key] = {'documents': stats['documents'], 'bytes': stats['bytes'],
+                                    'done': 'sha256' in stats}
+            if not force and now - self.last_progress < self.PROGRESS_INTERVAL:
+                return
+            self.last_progress = now
+            documents = sum(part['documents'] for part in self.part_stats.values())
+            written = sum(part['bytes'] for part in self.part_stats.values())
+            done = sum(1 for part in self.part_stats.values() if part['done'])
+            running = len(self.part_stats) - done
+        elapsed = now - self.started
+        self.progress_callback({
+            'documents': documents,
+            'bytes': written,
+            'parts_done': done,
+            'parts_running': running,
+            'elapsed': elapsed,
+            'docs_per_sec': documents / elapsed if elapsed > 0 else 0.0,
+            'mb_per_sec': written / 1048576 / elapsed if elapsed > 0 else 0.0
+        })
+
+    @staticmethod
+    def write_manifest(directory: str, manifest: Dict[str, Any]) -> None:
+        """Write the manifest as Extended JSON so index keys and _id ranges keep their types"""
+        with open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            f.write(json_util.dumps(manifest, indent=2, json_options=json_util.RELAXED_JSON_OPTIONS))
+
+    def verify(self, directory: str, sample_size: int = 100) -> Dict[str, Dict[str, Any]]:
+        """
+        Check a backup against its manifest and the live database
+
+        Every file is read back and its document count and checksum compared
+        with the manifest. The first sample_size documents of each collection
+        are then fetched from the database by _id (one query per collection)
+        and compared byte for byte, which proves the types survived.
+
+        Returns:
+            Per collection: 'documents_ok', 'checksum_ok', 'sampled',
+            'sample_mismatches' and 'ok'
+        """
+        manifest = load_manifest(directory)
+        results = {}
+        for name, entry in manifest['collections'].items():
+            documents_ok = checksum_ok = True
+            sample = {}
+            for part in backup_files(entry):
+                checksum = hashlib.sha256()
+                documents = 0
+                for doc in read_backup_file(directory, part['file']):
+                    checksum.update(doc.raw)
+                    documents += 1
+                    if len(sample) < sample_size:
+                        sample[document_bytes({'_id': doc['_id']})] = doc.raw
+                documents_ok = documents_ok and documents == part['documents']
+                checksum_ok = checksum_ok and checksum.hexdigest() == part['sha256']
+
+            mismatches = 0
+            if sample:
+                ids = [bson.decode(key)['_id'] for key in sample]
+                live = {
+                    document_bytes({'_id': doc['_id']}): document_bytes(doc)
+                    for doc in raw_collection(self.db[name]).find({'_id': {'$in': ids}})
+                }
+                mismatches = sum(1 for key, data in sample.items() if live.get(key) != data)
+
+            results[name] = {
+                'documents_ok': documents_ok,
+                'checksum_ok': checksum_ok,
+                'sampled': len(sample),
+                'sample_mismatches': mismatches,
+                'ok': documents_ok and checksum_ok and not mismatches
+            }
+        return results
+
+    def restore(self, directory: str, collections: Optional[Iterable[str]] = None, target_db=None) -> Dict[str, Any]:
+        """
+        Replace collections with their backed-up documents and indexes
+
+        Args:
+            directory: Backup directory
+            collections: Names to restore (defaults to every collection in the backup)
+            target_db: Database to restore into (defaults to the engine's)
+
+        Returns:
+            Per collection: 'documents' inserted and 'elapsed' seconds
+        """
+        manifest = load_manifest(directory)
+        db = target_db if target_db is not None else self.db
+        names = list(collections) if collections is not None else list(manifest['collections'])
+        results = {}
+        for name in names:
+            started = time.perf_counter()
+            entry = manifest['collections'][name]
+            collection = db[name]
+            collection.drop()
+
+            documents = 0
+            batch = []
+            for doc in read_backup_documents(directory, entry):
+                batch.append(doc)
+                if len(batch) >= self.batch_size:
+                    collection.insert_many(batch, ordered=False)
+                    documents += len(batch)
+                    batch = []
+            if batch:
+                collection.insert_many(batch, ordered=False)
+                documents += len(batch)
+
+            # Build secondary indexes once, after the data is loaded
+            for index in entry.get('indexes', []):
+                if index.get('name') == '_id_':
+                    continue
+                options = {key: value for key, value in index.items() if key not in ('key', 'v', 'ns')}
+                collection.create_index(list(index['key'].items()), **options)
+
+            results[name] = {'documents': documents, 'elapsed': time.perf_counter() - started}
+        return results
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Benchmark Module
+Load-time benchmarks for admin panel data paths against a scratch database
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from bson import Decimal128, Int64, ObjectId
+
+from analytics_module import RatingAnalytics, synthetic_ratings
+from backup_module import BackupEngine, format_backup_report, raw_collection
+from export_module import ParallelExporter
+from lookup_module import CompanyDirectory
+from pagination_module import KeysetPager
+
+# Database used by the admin panel; benchmarks refuse to seed it
+PRODUCTION_DATABASE = 'retryWrites=true&w=majority'
+DEFAULT_BENCHMARK_DATABASE = 'salesbuddy_benchmark'
+LOCAL_MONGODB_URI = 'mongodb://localhost:27017'
+
+def _timed(fn: Callable[[], Any]) -> float:
+    """Run fn and return the elapsed time in milliseconds"""
+    started = time.perf_counter()
+    fn()
+    return (time.perf_counter() - started) * 1000
+
+def seed_users(db, user_count: int, users_per_company: int = 50, company_share: float = 0.6) -> None:
+    """
+    Replace the users and companies collections with synthetic data
+
+    Args:
+        db: Scratch database
+        user_count: Number of users to create
+        users_per_company: Average company size
+        company_share: Fraction of users that belong to a company
+    """
+    db.users.drop()
+    db.companies.drop()
+
+    now = datetime.now()
+    company_ids = [ObjectId() for _ in range(max(1, user_count // users_per_company))]
+    db.companies.insert_many([
+        {'_id': company_id, 'name': f"Company {i}", 'companyId': f"C{i:06d}",
+         'industry': 'Software', 'createdAt': now}
+        for i, company_id in enumerate(company_ids)
+    ])
+
+    batch = []
+    for i in range(user_count):
+        user = {
+            'firstName': f"First{i}", 'lastName': f"Last{i}", 'email': f"user{i}@example.com",
+            'role': 'individual', 'subscription': {'plan': 'basic', 'status': 'active'},
+            'settings': {'language': 'en', 'notifications': True}, 'bio': 'x' * 200,
+            'lastLogin': now - timedelta(days=i % 30), 'createdAt': now - timedelta(days=i % 365)
+        }
+        if random.random() < company_share:
+            user['companyId'] = random.choice(company_ids)
+            user['role'] = 'company_user'
+        batch.append(user)
+        if len(batch) == 5000:
+            db.users.insert_many(batch)
+            batch = []
+    if batch:
+        db.users.insert_many(batch)
+
+def users_load_before(db) -> int:
+    """Original load_users: full documents plus one company query per company user"""
+    queries = 1
+    for user in list(db.users.find()):
+        if user.get('companyId'):
+            db.companies.find_one({'_id': user['companyId']})
+            queries += 1
+    return queries
+
+def users_load_after(db, page_size: int = 200) -> int:
+    """Current load_users: one company map query plus projected keyset pages"""
+    from admin_methods import USER_LIST_PROJECTION
+
+    companies = CompanyDirectory(db.companies)
+    companies.refresh(force=True)
+    pager = KeysetPager(db.users, projection=USER_LIST_PROJECTION, page_size=page_size)
+    queries = 1
+    while pager.has_more:
+        for user in pager.next_page():
+            if user.get('companyId'):
+                companies.name_for(user['companyId'])
+        queries += 1
+    return queries
+
+def benchmark_users_load(db, sizes: List[int]) -> List[Dict[str, Any]]:
+    """Time the Users tab load paths for each user count"""
+    results = []
+    for size in sizes:
+        seed_users(db, size)
+        counts = {}
+        before_ms = _timed(lambda: counts.__setitem__('before', users_load_before(db)))
+        after_ms = _timed(lambda: counts.__setitem__('after', users_load_after(db)))
+        results.append({
+            'users': size,
+            'before_ms': before_ms, 'before_queries': counts['before'],
+            'after_ms': after_ms, 'after_queries': counts['after']
+        })
+    return results
+
+def seed_conversations(db, conversation_count: int, messages_per_conversation: int = 20) -> None:
+    """Replace the conversations collection with synthetic conversations spread over a year"""
+    db.conversations.drop()
+
+    now = datetime.now()
+    user_ids = [ObjectId() for _ in range(max(1, conversation_count // 20))]
+    batch = []
+    for i in range(conversation_count):
+        created = now - timedelta(seconds=random.randint(0, 365 * 86400))
+        batch.append({
+            # Backdate the _id so the collection looks like a year of history
+            '_id': ObjectId(ObjectId.from_datetime(created).binary[:4] + os.urandom(8)),
+            'userId': random.choice(user_ids), 'title': f"Conversation {i}", 'scenario': 'cold_call',
+            'duration': random.randint(60, 1800), 'createdAt': created,
+            'messages': [
+                {'role': 'user' if m % 2 else 'assistant', 'content': 'lorem ipsum ' * 20, 'timestamp': created}
+                for m in range(messages_per_conversation)
+            ]
+        })
+        if len(batch) == 1000:
+            db.conversations.insert_many(batch)
+            batch = []
+    if batch:
+        db.conversations.insert_many(batch)
+
+def benchmark_export_scaling(db, conversation_count: int, worker_counts: List[int]) -> List[Dict[str, Any]]:
+    """Time the parallel conversation export for each worker count"""
+    seed_conversations(db, conversation_count)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for workers in worker_counts:
+            path = os.path.join(directory, f"conversations_{workers}.jsonl")
+            stats = ParallelExporter(db.conversations, workers=workers).export(path)
+            os.remove(path)
+            results.append(stats)
+    return results
+
+def benchmark_rating_analytics(sizes: List[int], runs: int = 3) -> List[Dict[str, Any]]:
+    """Time RatingAnalytics.compute on synthetic in-memory ratings (no database needed)"""
+    results = []
+    for size in sizes:
+        frame = synthetic_ratings(size)
+        timings = [RatingAnalytics.compute(frame)['compute_ms'] for _ in range(runs)]
+        results.append({'rows': size, 'best_ms': min(timings), 'worst_ms': max(timings)})
+    return results
+
+def seed_typed_conversations(db, count: int = 100) -> None:
+    """
+    Add conversations carrying Int64, Decimal128 and nested datetime values,
+    which a JSON backup would turn into plain numbers and strings
+    """
+    db.conversations.insert_many([
+        {'userId': str(ObjectId()), 'tokens': Int64(2 ** 40 + i), 'cost': Decimal128(f"{i}.10"),
+         'aiRatings': {'ratedAt': datetime(2025, 1, 1, 12, 0, 0, 123000), 'close': i % 11}}
+        for i in range(count)
+    ])
+
+def backup_roundtrip(db, collections: List[str], workers: int) -> Dict[str, Any]:
+    """
+    Back up collections, restore them into a second scratch database and
+    compare every document byte for byte
+    """
+    restore_db = db.client[db.name + '_restore']
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'backup')
+            engine = BackupEngine(db, workers=workers)
+            manifest = engine.backup(path, collections)
+            verified = engine.verify(path)
+
+            started = time.perf_counter()
+            engine.restore(path, target_db=restore_db)
+            restore_seconds = time.perf_counter() - started
+
+        identical = all(
+            [doc.raw for doc in raw_collection(db[name]).find().sort('_id', 1)] ==
+            [doc.raw for doc in raw_collection(restore_db[name]).find().sort('_id', 1)]
+            for name in collections
+        )
+    finally:
+        db.client.drop_database(restore_db.name)
+
+    stats = manifest['collections'].values()
+    bson_bytes = sum(collection['bytes'] for collection in stats)
+    return {
+        'workers': workers,
+        'documents': sum(collection['documents'] for collection in stats),
+        'mb': bson_bytes / 1048576,
+        'compressed_mb': sum(collection['compressedBytes'] for collection in stats) / 1048576,
+        'backup_seconds': manifest['elapsed'],
+        'backup_mb_per_sec': bson_bytes / 1048576 / manifest['elapsed'] if manifest['elapsed'] else 0.0,
+        'restore_seconds': restore_seconds,
+        'verified': all(result['ok'] for result in verified.values()),
+        'identical': identical,
+        'report': format_backup_report(manifest)
+    }
+
+def benchmark_backup_roundtrip(db, conversation_count: int, worker_counts: List[int]) -> List[Dict[str, Any]]:
+    """Time a backup and restore round trip of seeded data for each worker count"""
+    seed_users(db, max(1000, conversation_count // 10))
+    seed_conversations(db, conversation_count)
+    seed_typed_conversations(db)
+    return [backup_roundtrip(db, ['users', 'companies', 'conversations'], workers) for workers in worker_counts]
+
+def main():
+    """Command line entry point for the benchmarks"""
+    import argparse
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description="Benchmark SalesBuddy admin panel load paths")
+    parser.add_argument('benchmark', choices=['users-load', 'export-scaling', 'rating-analytics', 'backup-roundtrip'], help="Benchmark to run")
+    parser.add_argument('--sizes', type=int, nargs='+', default=None,
+                        help="Collection sizes (users-load: 10000 100000, export-scaling: 200000, "
+                             "rating-analytics: 100000 1000000, backup-roundtrip: 100000)")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Worker counts for export-scaling and backup-roundtrip")
+    parser.add_argument('--uri', default=LOCAL_MONGODB_URI,
+                        help=f"MongoDB URI of the benchmark server (defaults to {LOCAL_MONGODB_URI})")
+    parser.add_argument('--database', default=DEFAULT_BENCHMARK_DATABASE,
+                        help="Scratch database to seed; it is dropped afterwards")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch database")
+    args = parser.parse_args()
+
+    if args.benchmark == 'rating-analytics':
+        print(f"{'Rows':>10} {'Best ms':>9} {'Worst ms':>9}")
+        for row in benchmark_rating_analytics(args.sizes or [100000, 1000000]):
+            print(f"{row['rows']:>10,} {row['best_ms']:>9.0f} {row['worst_ms']:>9.0f}")
+        return
+
+    if args.database == PRODUCTION_DATABASE:
+        parser.error("Refusing to seed the admin panel database, choose a scratch database")
+
+    client = MongoClient(args.uri)
+    db = client[args.database]
+    try:
+        if args.benchmark == 'users-load':
+            results = benchmark_users_load(db, args.sizes or [10000, 100000])
+            print(f"{'Users':>10} {'Before ms':>12} {'Queries':>9} {'After ms':>12} {'Queries':>9} {'Speedup':>8}")
+            for row in results:
+                speedup = row['before_ms'] / row['after_ms'] if row['after_ms'] else 0
+                print(f"{row['users']:>10,} {row['before_ms']:>12.0f} {row['before_queries']:>9,} "
+                      f"{row['after_ms']:>12.0f} {row['after_queries']:>9,} {speedup:>7.1f}x")
+        elif args.benchmark == 'backup-roundtrip':
+            reports = []
+            for size in args.sizes or [100000]:
+                print(f"{'Workers':>8} {'Docs':>10} {'BSON MB':>8} {'gzip MB':>8} {'Backup s':>9} {'MB/s':>7} "
+                      f"{'Restore s':>10} {'Verified':>9} {'Identical':>10}")
+                for row in benchmark_backup_roundtrip(db, size, args.workers):
+                    reports.append(row['report'])
+                    print(f"{row['workers']:>8} {row['documents']:>10,} {row['mb']:>8.1f} {row['compressed_mb']:>8.1f} "
+                          f"{row['backup_seconds']:>9.1f} {row['backup_mb_per_sec']:>7.1f} {row['restore_seconds']:>10.1f} "
+                          f"{str(row['verified']):>9} {str(row['identical']):>10}")
+            print()
+            print('\n\n'.join(reports))
+        else:
+            for size in args.sizes or [200000]:
+                results = benchmark_export_scaling(db, size, args.workers)
+                print(f"{size:,} conversations")
+                print(f"{'Workers':>8} {'Parts':>6} {'Seconds':>9} {'Docs/s':>10} {'MB/s':>7} {'Scaling':>8}")
+                for row in results:
+                    scaling = row['docs_per_sec'] / results[0]['docs_per_sec'] if results[0]['docs_per_sec'] else 0
+                    print(f"{row['workers']:>8} {row['parts']:>6} {row['elapsed']:>9.1f} "
+                          f"{row['docs_per_sec']:>10,.0f} {row['mb_per_sec']:>7.1f} {scaling:>7.1f}x")
+    finally:
+        if not args.keep:
+            client.drop_database(args.database)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Export Module
+Streaming, constant-memory exports of MongoDB collections
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from bson import ObjectId
+
+DEFAULT_EXPORT_BATCH_SIZE = 500
+DEFAULT_EXPORT_WORKERS = 4
+MAX_EXPORT_WORKERS = 16
+# Ranges per worker; extra ranges keep workers busy when ranges are uneven
+RANGES_PER_WORKER = 4
+
+def to_jsonable(value: Any) -> Any:
+    """Convert ObjectIds and datetimes (at any depth) to JSON compatible strings"""
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def open_export_file(path: str, compress: bool = False):
+    """Open an export file for text writing, gzip-compressed if requested"""
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8')
+    return open(path, 'w', encoding='utf-8')
+
+class JsonLinesExporter:
+    """
+    Write query results as newline-delimited JSON, one document per line
+
+    Documents are read from a batched cursor and written as they arrive, so
+    memory use is bounded by the cursor batch size, not by the collection.
+    """
+
+    # Seconds between progress callbacks
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        collection,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+
+    def export(
+        self,
+        path: str,
+        query: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[tuple]] = None,
+        compress: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Stream the documents matching query to path
+
+        Args:
+            path: Output file (.jsonl or .jsonl.gz)
+            query: Filter for the documents to export
+            sort: Sort specification; defaults to newest _id first, which is
+                always indexed and needs no in-memory sort
+            compress: Write gzip-compressed output
+
+        Returns:
+            Export statistics: documents, bytes (uncompressed JSON), elapsed
+            seconds, documents per second and megabytes per second
+        """
+        started = time.perf_counter()
+        stats = {'path': path, 'documents': 0, 'bytes': 0}
+        last_progress = started
+
+        cursor = self.collection.find(query or {}).sort(sort or [('_id', -1)]).batch_size(self.batch_size)
+        with open_export_file(path, compress) as f:
+            for doc in cursor:
+                line = json.dumps(to_jsonable(doc), ensure_ascii=False) + '\n'
+                f.write(line)
+                stats['documents'] += 1
+                stats['bytes'] += len(line.encode('utf-8'))
+
+                now = time.perf_counter()
+                if self.progress_callback and now - last_progress >= self.PROGRESS_INTERVAL:
+                    last_progress = now
+                    self.progress_callback(self._throughput(stats, now - started))
+
+        return self._throughput(stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _throughput(stats: Dict[str, Any], elapsed: float) -> Dict[str, Any]:
+        """Add elapsed time and rates to export statistics"""
+        result = dict(stats)
+        result['elapsed'] = elapsed
+        result['docs_per_sec'] = stats['documents'] / elapsed if elapsed > 0 else 0.0
+        result['mb_per_sec'] = stats['bytes'] / 1048576 / elapsed if elapsed > 0 else 0.0
+        return result
+
+def split_id_ranges(collection, query: Optional[Dict[str, Any]], parts: int) -> List[Dict[str, Any]]:
+    """
+    Split the _id space of a query into contiguous ranges, newest first
+
+    ObjectIds start with their creation time, so the span between the lowest
+    and highest _id is divided into equal time slices. Only two indexed
+    lookups are needed; slices may hold different numbers of documents.
+
+    Args:
+        collection: Collection to split
+        query: Filter the export applies
+        parts: Number of ranges wanted
+
+    Returns:
+        _id conditions, one per range, from the newest range to the oldest
+    """
+    query = query or {}
+    lowest = collection.find_one(query, {'_id': 1}, sort=[('_id', 1)])
+    highest = collection.find_one(query, {'_id': 1}, sort=[('_id', -1)])
+    if not lowest or not highest:
+        return []
+
+    low_id, high_id = lowest['_id'], highest['_id']
+    if not isinstance(low_id, ObjectId) or not isinstance(high_id, ObjectId):
+        # Non-ObjectId keys cannot be sliced by time
+        return [{'$gte': low_id, '$lte': high_id}]
+
+    start = low_id.generation_time.timestamp()
+    span = high_id.generation_time.timestamp() - start
+    parts = max(1, min(parts, int(span) + 1))
+
+    bounds = [low_id]
+    for i in range(1, parts):
+        bounds.append(ObjectId.from_datetime(datetime.fromtimestamp(start + span * i / parts, tz=timezone.utc)))
+    ranges = [{'$gte': bounds[i], '$lt': bounds[i + 1]} for i in range(parts - 1)]
+    ranges.append({'$gte': bounds[-1], '$lte': high_id})
+    ranges.reverse()
+    return ranges
+
+class ParallelExporter:
+    """
+    Export a collection as JSONL with several cursors in parallel
+
+    The _id space is split into ranges (see split_id_ranges). A thread pool
+    exports each range with its own cursor into a part file, newest _id first,
+    so a single connection's round-trip latency no longer bounds throughput.
+    The parts are then either concatenated into the target file (gzip members
+    concatenate into a valid gzip stream) or kept and listed in an index file.
+    """
+
+    def __init__(
+        self,
+        collection,
+        workers: int = DEFAULT_EXPORT_WORKERS,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.collection = collection
+        self.workers = max(1, min(workers, MAX_EXPORT_WORKERS))
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+        self.part_stats: Dict[int, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.started = 0.0
+
+    def export(
+        self,
+        path: str,
+        query: Optional[Dict[str, Any]] = None,
+        compress: bool = False,
+        merge: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Export the documents matching query to path
+
+        Args:
+            path: Output file (.jsonl or .jsonl.gz)
+            query: Filter for the documents to export
+            compress: Write gzip-compressed output
+            merge: Concatenate the parts into path; otherwise keep the part
+                files and write path + '.index.json' describing them
+
+        Returns:
+            Export statistics as returned by JsonLinesExporter.export, plus
+            the worker and part counts
+        """
+        self.started = time.perf_counter()
+        self.part_stats = {}
+        query = query or {}
+
+        ranges = split_id_ranges(self.collection, query, self.workers * RANGES_PER_WORKER)
+        part_paths = [f"{path}.part{i:04d}" for i in range(len(ranges))]
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [
+                    pool.submit(self._export_part, i, part_paths[i], query, id_range, compress)
+                    for i, id_range in enumerate(ranges)
+                ]
+                part_results = [future.result() for future in futures]
+        except Exception:
+            # Do not leave partial exports behind
+            for part_path in part_paths:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            raise
+
+        if merge:
+            with open(path, 'wb') as out:
+                for part_path in part_paths:
+                    with open(part_path, 'rb') as part:
+                        shutil.copyfileobj(part, out, 1024 * 1024)
+                    os.remove(part_path)
+            if not part_paths:
+                open_export_file(path, compress).close()
+        else:
+            index = {
+                'createdAt': datetime.now().isoformat(),
+                'compressed': compress,
+                'parts': [
+                    {
+                        'file': os.path.basename(part_path),
+                        'documents': result['documents'],
+                        'bytes': result['bytes'],
+                        'idRange': to_jsonable(id_range)
+                    }
+                    for part_path, result, id_range in zip(part_paths, part_results, ranges)
+                ]
+            }
+            with open(path + '.index.json', 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2)
+
+        totals = {
+            'path': path if merge else path + '.index.json',
+            'documents': sum(result['documents'] for result in part_results),
+            'bytes': sum(result['bytes'] for result in part_results)
+        }
+        stats = JsonLinesExporter._throughput(totals, time.perf_counter() - self.started)
+        stats['workers'] = self.workers
+        stats['parts'] = len(ranges)
+        return stats
+
+    def _export_part(self, index: int, part_path: str, query: Dict[str, Any],
+                     id_range: Dict[str, Any], compress: bool) -> Dict[str, Any]:
+        """Worker: export one _id range into its part file"""
+        part_query = {'$and': [query, {'_id': id_range}]} if query else {'_id': id_range}
+        exporter = JsonLinesExporter(
+            self.collection,
+            batch_size=self.batch_size,
+            progress_callback=lambda stats: self._report_part(index, stats)
+        )
+        result = exporter.export(part_path, query=part_query, compress=compress)
+        self._report_part(index, result)
+        return result
+
+    def _report_part(self, index: int, stats: Dict[str, Any]) -> None:
+        """Combine per-part progress into overall progress"""
+        if not self.progress_callback:
+            return
+        with self.lock:
+            self.part_stats[index] = stats
+            totals = {
+                'documents': sum(part['documents'] for part in self.part_stats.values()),
+                'bytes': sum(part['bytes'] for part in self.part_stats.values())
+            }
+        self.progress_callback(JsonLinesExporter._throughput(totals, time.perf_counter() - self.started))
+
+class CsvExporter:
+    """
+    Write cursor results as CSV without holding the export in memory
+
+    Documents are taken from the cursor one batch at a time and handed to a
+    formatter, which turns the whole batch into rows. Formatters can resolve
+    related data (user names, usage) with one query per batch instead of one
+    per row. Each batch is encoded with the csv module and appended to the
+    file, so memory use is bounded by the batch size.
+    """
+
+    # Seconds between progress callbacks
+    PROGRESS_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+
+    def export(
+        self,
+        path: str,
+        header: Sequence[str],
+        cursor: Iterable[Dict[str, Any]],
+        format_batch: Callable[[List[Dict[str, Any]]], Iterable[Sequence[Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Stream documents from cursor to a CSV file
+
+        Args:
+            path: Output file
+            header: Column names
+            cursor: Documents to export (a pymongo cursor or any iterable)
+            format_batch: Turns a list of documents into rows
+
+        Returns:
+            Export statistics as returned by JsonLinesExporter.export
+        """
+        started = time.perf_counter()
+        stats = {'path': path, 'documents': 0, 'bytes': 0}
+        last_progress = started
+
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            self._write_rows(f, [header], stats)
+            batch = []
+            for doc in cursor:
+                batch.append(doc)
+                if len(batch) < self.batch_size:
+                    continue
+                self._write_rows(f, format_batch(batch), stats)
+                stats['documents'] += len(batch)
+                batch = []
+
+                now = time.perf_counter()
+                if self.progress_callback and now - last_progress >= self.PROGRESS_INTERVAL:
+                    last_progress = now
+                    self.progress_callback(JsonLinesExporter._throughput(stats, now - started))
+            if batch:
+                self._write_rows(f, format_batch(batch), stats)
+                stats['documents'] += len(batch)
+
+        return JsonLinesExporter._throughput(stats, time.perf_counter() - started)
+
+    @staticmethod
+    def _write_rows(f, rows: Iterable[Sequence[Any]], stats: Dict[str, Any]) -> None:
+        """Encode rows with csv quoting and append them to the file"""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        text = buffer.getvalue()
+        f.write(text)
+        stats['bytes'] += len(text.encode('utf-8'))
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Lookup Module
+Batched, cached resolution of user and company ids
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Fields needed to display a user anywhere in the admin panel
+USER_DISPLAY_PROJECTION = {'firstName': 1, 'lastName': 1, 'email': 1}
+
+def normalize_object_id(value: Any) -> Optional[ObjectId]:
+    """
+    Normalise a stored reference (userId, companyId) to an ObjectId
+
+    Conversations and summaries store userId either as an ObjectId, as its
+    hex string, or (when populated) as an embedded user document.
+
+    Args:
+        value: ObjectId, hex string or dict with an '_id' key
+
+    Returns:
+        The ObjectId, or None if the value cannot be interpreted
+    """
+    if isinstance(value, dict):
+        value = value.get('_id')
+    if isinstance(value, ObjectId):
+        return value
+    if isinstance(value, str):
+        try:
+            return ObjectId(value.strip())
+        except (InvalidId, TypeError):
+            return None
+    return None
+
+# Full or truncated hex ObjectId, as shown in the treeviews ('68a1b2c3...')
+ID_PREFIX_PATTERN = re.compile(r'^[0-9a-f]{1,24}$')
+
+def object_id_prefix_range(prefix: str) -> Dict[str, ObjectId]:
+    """Range condition holding every ObjectId whose hex form starts with prefix"""
+    prefix = prefix.lower()
+    return {'$gte': ObjectId(prefix.ljust(24, '0')), '$lte': ObjectId(prefix.ljust(24, 'f'))}
+
+def resolve_id_prefix(collection, text: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find the document whose _id starts with a full or truncated hex id
+
+    ObjectIds sort like their hex strings, so a prefix is a single range on
+    the _id index instead of a scan comparing every id.
+
+    Args:
+        collection: Collection to search
+        text: Hex id or prefix, optionally followed by '...'
+        projection: Fields to return
+
+    Returns:
+        The document, or None when no document or more than one matches
+    """
+    prefix = text.strip().rstrip('.').lower()
+    if not ID_PREFIX_PATTERN.match(prefix):
+        return None
+    if len(prefix) == 24:
+        return collection.find_one({'_id': ObjectId(prefix)}, projection)
+    matches = list(collection.find({'_id': object_id_prefix_range(prefix)}, projection).limit(2))
+    return matches[0] if len(matches) == 1 else None
+
+def format_user_name(user: Optional[Dict[str, Any]], default: str = "Unknown") -> str:
+    """Return 'First Last' for a user document, falling back to the email or default"""
+    if not user:
+        return default
+    name = f"{user.get('firstName', '')} {user.get('lastName', '')}".strip()
+    return name or user.get('email') or default
+
+class UserLookupService:
+    """
+    Resolve user ids to user documents with one query per batch
+
+    Callers collect the ids a view needs and call get_users() once; ids not in
+    the cache are fetched with a single $in query. Results, including misses,
+    are cached in an LRU map bounded by max_size whose entries expire after
+    ttl_seconds. The service is thread-safe so background loaders can share it.
+    """
+
+    def __init__(self, users_collection, max_size: int = 5000, ttl_seconds: int = 300):
+        self.users_collection = users_collection
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_users(self, user_ids: Iterable[Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Resolve many user ids at once
+
+        Args:
+            user_ids: userId values in any of the stored forms
+
+        Returns:
+            Map of hex id string to user document (None for unknown users)
+        """
+        wanted = {}
+        for value in user_ids:
+            object_id = normalize_object_id(value)
+            if object_id is not None:
+                wanted[str(object_id)] = object_id
+
+        result = {}
+        missing = []
+        now = time.monotonic()
+        with self.lock:
+            for key, object_id in wanted.items():
+                entry = self.cache.get(key)
+                if entry and entry[0] > now:
+                    self.cache.move_to_end(key)
+                    result[key] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(object_id)
+            self.misses += len(missing)
+
+        if missing:
+            found = {
+                str(user['_id']): user
+                for user in self.users_collection.find({'_id': {'$in': missing}}, USER_DISPLAY_PROJECTION)
+            }
+            expires = time.monotonic() + self.ttl_seconds
+            with self.lock:
+                self.queries += 1
+                for object_id in missing:
+                    key = str(object_id)
+                    user = found.get(key)
+                    result[key] = user
+                    self.cache[key] = (expires, user)
+                    self.cache.move_to_end(key)
+                while len(self.cache) > self.max_size:
+                    self.cache.popitem(last=False)
+
+        return result
+
+    def get_user(self, user_id: Any) -> Optional[Dict[str, Any]]:
+        """Resolve a single user id (served from the cache when possible)"""
+        object_id = normalize_object_id(user_id)
+        if object_id is None:
+            return None
+        return self.get_users([object_id]).get(str(object_id))
+
+    def get_names(self, user_ids: Iterable[Any], default: str = "Unknown") -> Dict[str, str]:
+        """Resolve many user ids to display names keyed by hex id string"""
+        return {key: format_user_name(user, default) for key, user in self.get_users(user_ids).items()}
+
+    def name_for(self, names: Dict[str, str], user_id: Any, default: str = "Unknown") -> str:
+        """Look up a display name from a get_names() result for a raw userId value"""
+        object_id = normalize_object_id(user_id)
+        if object_id is None:
+            return default
+        return names.get(str(object_id), default)
+
+    def invalidate(self, user_id: Any = None) -> None:
+        """Drop one cached user (e.g. after an edit), or the whole cache"""
+        with self.lock:
+            if user_id is None:
+                self.cache.clear()
+                return
+            object_id = normalize_object_id(user_id)
+            if object_id is not None:
+                self.cache.pop(str(object_id), None)
+
+class CompanyDirectory:
+    """
+    In-memory map of company id to company name
+
+    Companies are few compared to users, so the whole map is fetched with one
+    projected query per list load and shared by every view that shows a
+    company name. Single lookups that miss the map fall back to find_one.
+    """
+
+    def __init__(self, companies_collection, ttl_seconds: int = 60):
+        self.companies_collection = companies_collection
+        self.ttl_seconds = ttl_seconds
+        self.companies: Dict[str, Dict[str, Any]] = {}
+        self.expires = 0.0
+        self.lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> None:
+        """Reload the map with a single query unless it is still fresh"""
+        if not force and time.monotonic() < self.expires:
+            return
+        self.prime(self.companies_collection.find({}, {'name': 1, 'companyId': 1}))
+
+    def prime(self, companies: Iterable[Dict[str, Any]]) -> None:
+        """Replace the map with already fetched company documents"""
+        companies = {str(company['_id']): company for company in companies}
+        with self.lock:
+            self.companies = companies
+            self.expires = time.monotonic() + self.ttl_seconds
+
+    def get(self, company_id: Any) -> Optional[Dict[str, Any]]:
+        """Return the company for an id, querying the database on a miss"""
+        object_id = normalize_object_id(company_id)
+        if object_id is None:
+            return None
+        key = str(object_id)
+        with self.lock:
+            company = self.companies.get(key)
+        if company is None:
+            company = self.companies_collection.find_one({'_id': object_id}, {'name': 1, 'companyId': 1})
+            if company:
+                with self.lock:
+                    self.companies[key] = company
+        return company
+
+    def name_for(self, company_id: Any) -> Optional[str]:
+        """Return the company name from the map without querying, or None if unknown"""
+        object_id = normalize_object_id(company_id)
+        if object_id is None:
+            return None
+        with self.lock:
+            company = self.companies.get(str(object_id))
+        return company.get('name', 'Unknown Company') if company else None
+
+    def invalidate(self) -> None:
+        """Force the next refresh() to reload the map"""
+        with self.lock:
+            self.expires = 0.0
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Pagination Module
+Keyset (seek) pagination over MongoDB collections
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import BSON
+
+DEFAULT_PAGE_SIZE = 200
+
+def bson_size(docs: Iterable[Dict[str, Any]]) -> int:
+    """Encoded BSON size of documents, i.e. roughly the bytes received from the server"""
+    return sum(len(BSON.encode(doc)) for doc in docs)
+
+def format_bytes(size: int) -> str:
+    """Human readable byte count"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024 or unit == 'MB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+class KeysetPager:
+    """
+    Page through a query in a stable order without skip()
+
+    Each page continues after the sort key of the last document returned, so
+    every page is an index range scan no matter how deep the user scrolls.
+    When sorting on a field other than _id, _id is used as a tie-breaker.
+
+    Optional pipeline stages run on the server after the seek and sort, e.g.
+    to compute fields and filter on them. They may drop documents but must
+    keep the sort field, and projection is then ignored.
+
+    Pages can be appended (next_page as the list scrolls) or navigated one at
+    a time: the start key of every page returned is remembered, so
+    previous_page and reload_page also cost a single range query.
+
+    The pager is not thread-safe. A background refresh should snapshot
+    page_number and current_start(), query with fetch_page, which leaves the
+    pager untouched, and hand the result to refresh_page on the owning thread.
+    """
+
+    def __init__(
+        self,
+        collection,
+        query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort_field: str = '_id',
+        descending: bool = False,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        pipeline: Optional[List[Dict[str, Any]]] = None
+    ):
+        self.collection = collection
+        self.query = query or {}
+        self.projection = projection
+        self.sort_field = sort_field
+        self.descending = descending
+        self.page_size = page_size
+        self.pipeline = pipeline
+        self.reset()
+
+    def reset(self) -> None:
+        """Start again from the first page"""
+        self.last_key = None
+        self.has_more = True
+        self.loaded = 0
+        self.last_page_bytes = 0
+        self.page_starts: List[Optional[tuple]] = []
+
+    @property
+    def page_number(self) -> int:
+        """1-based number of the last page returned (0 before the first page)"""
+        return len(self.page_starts)
+
+    def current_start(self) -> Optional[tuple]:
+        """Start key of the last page returned (None for the first page)"""
+        return self.page_starts[-1] if self.page_starts else None
+
+    @property
+    def has_previous(self) -> bool:
+        """Whether a page precedes the last page returned"""
+        return len(self.page_starts) > 1
+
+    def total(self) -> int:
+        """Count the documents matching the query on the server"""
+        if self.pipeline:
+            counted = list(self.collection.aggregate(
+                [{'$match': self.query}] + self.pipeline + [{'$count': 'total'}]
+            ))
+            return counted[0]['total'] if counted else 0
+        if not self.query:
+            return self.collection.estimated_document_count()
+        return self.collection.count_documents(self.query)
+
+    def next_page(self) -> List[Dict[str, Any]]:
+        """
+        Fetch the page following the last one returned
+
+        Returns:
+            Up to page_size documents; an empty list once the end is reached
+        """
+        if not self.has_more:
+            return []
+        self.page_starts.append(self.last_key)
+        return self._fetch(self.last_key)
+
+    def previous_page(self) -> List[Dict[str, Any]]:
+        """Fetch the page before the last one returned (the first page again if there is none)"""
+        if len(self.page_starts) > 1:
+            self.page_starts.pop()
+        return self.reload_page()
+
+    def reload_page(self) -> List[Dict[str, Any]]:
+        """Fetch the last page returned again, e.g. to pick up new or changed documents"""
+        if not self.page_starts:
+            return self.next_page()
+        return self._fetch(self.page_starts[-1])
+
+    def fetch_page(self, start: Optional[tuple]) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Query one page starting after the given key, without moving the pager
+
+        Returns:
+            (up to page_size documents, whether another page follows)
+        """
+        # Fetch one extra document to learn whether another page exists
+        if self.pipeline:
+            docs = list(self.collection.aggregate(
+                [{'$match': self._page_filter(start)}, {'$sort': dict(self._sort())}]
+                + self.pipeline + [{'$limit': self.page_size + 1}]
+            ))
+        else:
+            docs = list(
+                self.collection.find(self._page_filter(start), self.projection)
+                .sort(self._sort())
+                .limit(self.page_size + 1)
+            )
+        return docs[:self.page_size], len(docs) > self.page_size
+
+    def refresh_page(self, page_number: int, start: Optional[tuple],
+                     docs: List[Dict[str, Any]], has_more: bool) -> bool:
+        """
+        Adopt a page fetched with fetch_page as the current page again
+
+        Args:
+            page_number: page_number when the fetch started
+            start: current_start() when the fetch started
+            docs, has_more: Result of fetch_page(start)
+
+        Returns:
+            False (and nothing changes) if the pager moved to another page meanwhile
+        """
+        if self.page_number != page_number or self.current_start() != start:
+            return False
+        if not self.page_starts:
+            self.page_starts.append(start)
+        self._record(start, docs, has_more)
+        return True
+
+    def _fetch(self, start: Optional[tuple]) -> List[Dict[str, Any]]:
+        """Fetch one page starting after the given key"""
+        docs, has_more = self.fetch_page(start)
+        self._record(start, docs, has_more)
+        return docs
+
+    def _record(self, start: Optional[tuple], docs: List[Dict[str, Any]], has_more: bool) -> None:
+        """Move the pager past a page starting after the given key"""
+        self.has_more = has_more
+        self.last_key = self._key(docs[-1]) if docs else start
+        self.loaded += len(docs)
+        self.last_page_bytes = bson_size(docs)
+
+    def _sort(self) -> List[tuple]:
+        """Sort specification matching the keyset"""
+        direction = -1 if self.descending else 1
+        if self.sort_field == '_id':
+            return [('_id', direction)]
+        return [(self.sort_field, direction), ('_id', direction)]
+
+    def _key(self, doc: Dict[str, Any]) -> tuple:
+        """Sort key of a document"""
+        return (doc.get(self.sort_field), doc['_id'])
+
+    def _page_filter(self, key: Optional[tuple]) -> Dict[str, Any]:
+        """Query restricted to documents sorting after the given key"""
+        if key is None:
+            return self.query
+
+        op = '$lt' if self.descending else '$gt'
+        value, last_id = key
+        if self.sort_field == '_id':
+            seek = {'_id': {op: last_id}}
+        else:
+            seek = {'$or': [
+                {self.sort_field: {op: value}},
+                {self.sort_field: value, '_id': {op: last_id}}
+            ]}
+
+        if not self.query:
+            return seek
+        return {'$and': [self.query, seek]}
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Ratings Module
+Server-side scoring pipelines for AI conversation ratings
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Stage scores stored in aiRatings, each out of 10
+RATING_STAGES = ('introduction', 'mapping', 'productPresentation', 'objectionHandling', 'close')
+DEFAULT_MAX_SCORE = 50
+
+# Conversations that carry a ratings document
+RATED_CONVERSATIONS_QUERY = {'aiRatings': {'$type': 'object'}}
+
+# Partial index covering the ratings list: only rated conversations are
+# indexed, newest first, so paging walks rated documents in order
+RATINGS_INDEX = {
+    'keys': [('createdAt', -1), ('_id', -1)],
+    'name': 'rated_conversations_by_date',
+    'partialFilterExpression': RATED_CONVERSATIONS_QUERY
+}
+
+# Fields of a rated conversation needed to display its scores
+RATING_LIST_FIELDS = {'userId': 1, 'createdAt': 1, 'aiRatings': 1}
+
+def total_score_expression() -> Dict[str, Any]:
+    """Aggregation expression summing the stage scores (missing stages count as 0)"""
+    return {'$add': [{'$ifNull': [f'$aiRatings.{stage}', 0]} for stage in RATING_STAGES]}
+
+# Report bands of the total score: name -> (lowest score, exclusive upper bound)
+RATING_BANDS = {
+    'excellent': (40, None),
+    'good': (30, 40),
+    'average': (20, 30),
+    'poor': (None, 20)
+}
+
+def rating_band_label(band: str) -> str:
+    """Band name with its score range, e.g. 'Good (30-39)'"""
+    low, high = RATING_BANDS[band]
+    return f"{band.title()} ({low or 0}-{high - 1 if high else DEFAULT_MAX_SCORE})"
+
+def rating_band_counters() -> Dict[str, Any]:
+    """$group accumulators counting rated conversations per RATING_BANDS band"""
+    total = total_score_expression()
+    counters = {}
+    for band, (low, high) in RATING_BANDS.items():
+        # Same test as RATED_CONVERSATIONS_QUERY, as an expression
+        conditions = [{'$eq': [{'$type': '$aiRatings'}, 'object']}]
+        if low is not None:
+            conditions.append({'$gte': [total, low]})
+        if high is not None:
+            conditions.append({'$lt': [total, high]})
+        counters[band] = {'$sum': {'$cond': [{'$and': conditions}, 1, 0]}}
+    return counters
+
+def rating_score_stages(min_score: Optional[int] = None, max_score: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Pipeline stages adding totalScore, maxPossible and percentage to rated conversations
+
+    Args:
+        min_score: Keep only conversations with at least this total score
+        max_score: Keep only conversations with at most this total score
+
+    Returns:
+        $project (and $match when a bound is given) stages
+    """
+    stages = [
+        {'$project': dict(RATING_LIST_FIELDS, totalScore=total_score_expression(),
+                          maxPossible={'$ifNull': ['$aiRatings.maxPossibleScore', DEFAULT_MAX_SCORE]})},
+        {'$addFields': {'percentage': {'$cond': [
+            {'$gt': ['$maxPossible', 0]},
+            {'$round': [{'$multiply': [{'$divide': ['$totalScore', '$maxPossible']}, 100]}, 1]},
+            0
+        ]}}}
+    ]
+
+    score_range = {}
+    if min_score is not None:
+        score_range['$gte'] = min_score
+    if max_score is not None:
+        score_range['$lte'] = max_score
+    if score_range:
+        stages.append({'$match': {'totalScore': score_range}})
+    return stages
+
+# Lower bounds of the report's score distribution buckets (the last bound is exclusive)
+SCORE_BUCKETS = [0, 10, 20, 30, 40, DEFAULT_MAX_SCORE + 1]
+
+def rating_report_pipeline(match: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Pipeline reducing the rated conversations matching match to report numbers
+
+    Returns a single document with 'summary' (count, average/min/max total
+    and per-stage averages) and 'distribution' (one count per score bucket).
+    """
+    stage_fields = {stage: {'$ifNull': [f'$aiRatings.{stage}', 0]} for stage in RATING_STAGES}
+    summary = {'_id': None, 'count': {'$sum': 1}, 'avgTotal': {'$avg': '$totalScore'},
+               'minTotal': {'$min': '$totalScore'}, 'maxTotal': {'$max': '$totalScore'}}
+    summary.update({stage: {'$avg': f'${stage}'} for stage in RATING_STAGES})
+
+    return [
+        {'$match': match},
+        {'$project': dict(stage_fields, totalScore=total_score_expression())},
+        {'$facet': {
+            'summary': [{'$group': summary}],
+            'distribution': [{'$bucket': {
+                'groupBy': '$totalScore',
+                'boundaries': SCORE_BUCKETS,
+                'default': 'other',
+                'output': {'count': {'$sum': 1}}
+            }}]
+        }}
+    ]
+
+def rating_report(
+    conversations_collection,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    user_ids: Optional[List[Any]] = None
+) -> Dict[str, Any]:
+    """
+    Compute the rating report on the server
+
+    Args:
+        conversations_collection: Conversations collection
+        date_from: Only conversations created at or after this time
+        date_to: Only conversations created before this time
+        user_ids: Only conversations of these users (e.g. one company's)
+
+    Returns:
+        Dict with 'count', 'avg_total', 'min_total', 'max_total',
+        'stage_averages' (per stage), 'distribution' (count per bucket lower
+        bound) and 'elapsed_ms'
+    """
+    started = time.perf_counter()
+    match = dict(RATED_CONVERSATIONS_QUERY)
+    created = {}
+    if date_from:
+        created['$gte'] = date_from
+    if date_to:
+        created['$lt'] = date_to
+    if created:
+        match['createdAt'] = created
+    if user_ids is not None:
+        # userId is stored as an ObjectId or as its string form
+        match['userId'] = {'$in': list(user_ids) + [str(user_id) for user_id in user_ids]}
+
+    result = next(iter(conversations_collection.aggregate(rating_report_pipeline(match))), {})
+    summary = (result.get('summary') or [{}])[0]
+    distribution = {bucket['_id']: bucket['count'] for bucket in result.get('distribution', [])}
+
+    return {
+        'count': summary.get('count', 0),
+        'avg_total': summary.get('avgTotal') or 0,
+        'min_total': summary.get('minTotal', 0),
+        'max_total': summary.get('maxTotal', 0),
+        'stage_averages': {stage: summary.get(stage) or 0 for stage in RATING_STAGES},
+        'distribution': {lower: distribution.get(lower, 0) for lower in SCORE_BUCKETS[:-1]},
+        'elapsed_ms': (time.perf_counter() - started) * 1000
+    }
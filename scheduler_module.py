@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Scheduler Module
+Background auto-refresh of the visible admin panel tab
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Bounds enforced by the "Auto-refresh interval" setting
+MIN_REFRESH_INTERVAL = 5
+MAX_REFRESH_INTERVAL = 3600
+DEFAULT_REFRESH_INTERVAL = 30
+
+class RefreshScheduler:
+    """
+    Periodically refresh the visible notebook tab
+
+    Each registered tab provides a fetch callable, which runs on a worker
+    thread and performs the database queries, and an apply callable, which
+    runs on the Tk thread and updates the widgets with the fetched data.
+
+    - Only the selected tab is refreshed, and nothing runs while the window
+      is minimised or the database is disconnected.
+    - At most one refresh is in flight. The next tick is scheduled only after
+      the previous refresh finished, so slow queries never pile up.
+    - The interval is multiplied by a backoff factor that doubles after a
+      failed or slow refresh (up to MAX_BACKOFF) and resets after a fast one.
+    """
+
+    MAX_BACKOFF = 8
+    # A refresh taking longer than this fraction of the interval counts as slow
+    SLOW_FRACTION = 0.25
+    POLL_MS = 100
+
+    def __init__(
+        self,
+        root,
+        notebook,
+        interval_getter: Callable[[], int],
+        is_connected: Callable[[], bool],
+        status_callback: Optional[Callable[[str, str], None]] = None
+    ):
+        self.root = root
+        self.notebook = notebook
+        self.interval_getter = interval_getter
+        self.is_connected = is_connected
+        self.status_callback = status_callback
+
+        self.handlers: Dict[str, Tuple[Callable[[], Any], Callable[[Any], None]]] = {}
+        self.backoff = 1
+        self.after_id = None
+        self.running = False
+        self.in_flight = False
+        self.results = queue.Queue()
+
+    def register(self, tab_text: str, fetch: Callable[[], Any], apply: Callable[[Any], None]) -> None:
+        """Register the refresh callables for a notebook tab"""
+        self.handlers[tab_text] = (fetch, apply)
+
+    def start(self) -> None:
+        """Start the periodic refresh (no-op if already running)"""
+        if self.running:
+            return
+        self.running = True
+        self._schedule()
+
+    def stop(self) -> None:
+        """Stop scheduling refreshes; an in-flight refresh still completes"""
+        self.running = False
+        if self.after_id:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def current_delay(self) -> int:
+        """Seconds until the next tick, including backoff"""
+        return min(self._interval() * self.backoff, MAX_REFRESH_INTERVAL)
+
+    def _interval(self) -> int:
+        """Read the configured interval, falling back to the default when invalid"""
+        try:
+            interval = int(self.interval_getter())
+        except (TypeError, ValueError):
+            return DEFAULT_REFRESH_INTERVAL
+        if interval < MIN_REFRESH_INTERVAL or interval > MAX_REFRESH_INTERVAL:
+            return DEFAULT_REFRESH_INTERVAL
+        return interval
+
+    def _schedule(self) -> None:
+        """Schedule the next tick on the Tk event loop"""
+        if self.running:
+            self.after_id = self.root.after(self.current_delay() * 1000, self._tick)
+
+    def _visible_tab(self) -> Optional[str]:
+        """Return the text of the selected tab, or None if the panel is hidden"""
+        if self.root.state() in ('iconic', 'withdrawn'):
+            return None
+        selected = self.notebook.select()
+        if not selected:
+            return None
+        return self.notebook.tab(selected, 'text')
+
+    def _tick(self) -> None:
+        """Start a refresh of the visible tab if it has a handler"""
+        self.after_id = None
+        tab_text = self._visible_tab()
+
+        if self.in_flight or not tab_text or tab_text not in self.handlers or not self.is_connected():
+            self._schedule()
+            return
+
+        fetch, apply = self.handlers[tab_text]
+        self.in_flight = True
+        threading.Thread(target=self._run_fetch, args=(tab_text, fetch, apply), daemon=True).start()
+        self.root.after(self.POLL_MS, self._poll)
+
+    def _run_fetch(self, tab_text: str, fetch: Callable[[], Any], apply: Callable[[Any], None]) -> None:
+        """Worker thread: run the queries and hand the result back to the Tk thread"""
+        started = time.perf_counter()
+        try:
+            data, error = fetch(), None
+        except Exception as e:
+            data, error = None, e
+        self.results.put((tab_text, apply, data, error, time.perf_counter() - started))
+
+    def _poll(self) -> None:
+        """Tk thread: wait for the worker result without blocking the event loop"""
+        try:
+            tab_text, apply, data, error, elapsed = self.results.get_nowait()
+        except queue.Empty:
+            self.root.after(self.POLL_MS, self._poll)
+            return
+
+        self.in_flight = False
+
+        if error is None:
+            try:
+                apply(data)
+            except Exception as e:
+                error = e
+
+        if error is not None:
+            self.backoff = min(self.backoff * 2, self.MAX_BACKOFF)
+            self._report(f"Auto-refresh of {tab_text} failed: {error} "
+                         f"(retrying in {self.current_delay()}s)", 'red')
+        elif elapsed > self._interval() * self.SLOW_FRACTION:
+            self.backoff = min(self.backoff * 2, self.MAX_BACKOFF)
+            self._report(f"Auto-refresh of {tab_text} took {elapsed:.1f}s "
+                         f"(next refresh in {self.current_delay()}s)", 'orange')
+        else:
+            self.backoff = 1
+
+        self._schedule()
+
+    def _report(self, text: str, color: str) -> None:
+        """Forward a status message to the panel"""
+        if self.status_callback:
+            self.status_callback(text, color)
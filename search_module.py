@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Search Module
+In-memory n-gram index for incremental treeview search and full-text
+search over conversation messages
+"""
+
+import math
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+# Name of the text index on conversation message content
+MESSAGE_TEXT_INDEX = 'conversation_message_text'
+MESSAGE_SEARCH_PAGE_SIZE = 25
+# Seconds after which the local index is rebuilt to pick up edited conversations
+LOCAL_INDEX_TTL = 300
+SNIPPET_RADIUS = 60
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+class TreeSearchIndex:
+    """
+    Substring search over treeview rows without walking the widget
+
+    Each row's searchable columns are lowercased once when the row is added
+    and indexed by trigram. A query of three or more characters intersects
+    the trigram postings and verifies the few candidates; shorter queries scan
+    the cached strings. Applying a result only detaches the rows that stopped
+    matching and moves back the rows that started matching, at their original
+    position, so each keystroke costs Tk calls proportional to the change.
+    """
+
+    GRAM = 3
+
+    def __init__(self, tree, columns: Sequence[int]):
+        """
+        Args:
+            tree: The ttk.Treeview holding the rows
+            columns: Indexes of the value columns to search
+        """
+        self.tree = tree
+        self.columns = columns
+        self.clear()
+
+    def clear(self) -> None:
+        """Forget all rows (call after the treeview was emptied)"""
+        self.texts: Dict[str, str] = {}
+        self.values: Dict[str, tuple] = {}
+        self.positions: Dict[str, int] = {}
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.visible: Set[str] = set()
+        self.visible_positions: List[int] = []
+        self.query = ""
+        self.row_filter: Optional[Callable[[tuple], bool]] = None
+
+    def add(self, item: str, values: Sequence) -> None:
+        """Index a row that was just inserted at the end of the treeview"""
+        text = '\n'.join(str(values[column]).lower() for column in self.columns)
+        self.texts[item] = text
+        self.values[item] = tuple(values)
+        self.positions[item] = len(self.positions)
+        for gram in self._grams(text):
+            self.postings[gram].add(item)
+
+        # Keep the active search applied to rows loaded later
+        if self._matches(item, None):
+            self.visible.add(item)
+            self.visible_positions.append(self.positions[item])
+        else:
+            self.tree.detach(item)
+
+    def __contains__(self, item: str) -> bool:
+        return item in self.texts
+
+    def filter(self, query: str, row_filter: Optional[Callable[[tuple], bool]] = None) -> int:
+        """
+        Show only the rows containing query (and accepted by row_filter)
+
+        Returns:
+            Number of visible rows
+        """
+        self.query = query.lower()
+        self.row_filter = row_filter
+        candidates = self._candidates(self.query)
+        matches = {item for item in (candidates if candidates is not None else self.texts)
+                   if self._matches(item, candidates)}
+
+        hidden = self.visible - matches
+        if hidden:
+            self.tree.detach(*hidden)
+
+        shown = sorted(matches - self.visible, key=self.positions.get)
+        if hidden:
+            hidden_positions = {self.positions[item] for item in hidden}
+            self.visible_positions = [p for p in self.visible_positions if p not in hidden_positions]
+        for item in shown:
+            position = self.positions[item]
+            self.tree.move(item, '', bisect_left(self.visible_positions, position))
+            insort(self.visible_positions, position)
+
+        self.visible = matches
+        return len(matches)
+
+    def _grams(self, text: str) -> Iterable[str]:
+        """All n-grams of a string"""
+        return {text[i:i + self.GRAM] for i in range(len(text) - self.GRAM + 1)}
+
+    def _candidates(self, query: str) -> Optional[Set[str]]:
+        """Rows that may contain query, or None when every row is a candidate"""
+        if len(query) < self.GRAM:
+            return None
+        postings = sorted((self.postings.get(gram, set()) for gram in self._grams(query)), key=len)
+        return set.intersection(*postings) if postings else set()
+
+    def _matches(self, item: str, candidates: Optional[Set[str]]) -> bool:
+        """Whether a row matches the active query and row filter"""
+        if candidates is not None and item not in candidates:
+            return False
+        if self.query and self.query not in self.texts[item]:
+            return False
+        return self.row_filter is None or self.row_filter(self.values[item])
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of at least two characters"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if len(token) > 1]
+
+def make_snippet(text: str, terms: Sequence[str], radius: int = SNIPPET_RADIUS) -> str:
+    """Cut a single-line excerpt of text around the first occurrence of any term"""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms if lowered.find(term) >= 0]
+    center = min(positions) if positions else 0
+    start = max(0, center - radius)
+    end = min(len(text), center + radius)
+    snippet = ' '.join(text[start:end].split())
+    return ('...' if start > 0 else '') + snippet + ('...' if end < len(text) else '')
+
+class LocalMessageIndex:
+    """
+    Inverted index over conversation titles and message content
+
+    Used when the server has no text index. Only postings (term to
+    conversation and term frequency) are kept in memory; snippets are cut
+    from the matching messages of the result page fetched afterwards.
+    Ranking is tf-idf summed over the query terms, like $text's OR semantics.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.conversation_ids: List[Any] = []
+        self.messages_indexed = 0
+        self.built_at: Optional[float] = None
+        self.signature: Optional[tuple] = None
+
+    @staticmethod
+    def collection_signature(conversations_collection) -> tuple:
+        """Conversation count and newest _id, which change when conversations are added or deleted"""
+        newest = conversations_collection.find_one({}, {'_id': 1}, sort=[('_id', -1)])
+        return conversations_collection.estimated_document_count(), newest['_id'] if newest else None
+
+    def build(self, conversations_collection, batch_size: int = 1000) -> None:
+        """Index every conversation, streaming only titles and message content"""
+        self.signature = self.collection_signature(conversations_collection)
+        cursor = conversations_collection.find(
+            {}, {'title': 1, 'messages.content': 1}
+        ).batch_size(batch_size)
+        for conv in cursor:
+            doc_number = len(self.conversation_ids)
+            self.conversation_ids.append(conv['_id'])
+            counts: Dict[str, int] = defaultdict(int)
+            for token in tokenize(conv.get('title') or ''):
+                counts[token] += 1
+            for message in conv.get('messages') or []:
+                content = message.get('content') if isinstance(message, dict) else None
+                if isinstance(content, str):
+                    self.messages_indexed += 1
+                    for token in tokenize(content):
+                        counts[token] += 1
+            for token, count in counts.items():
+                self.postings[token][doc_number] = count
+        self.built_at = time.time()
+
+    def search(self, query: str) -> List[tuple]:
+        """
+        Rank conversations for a query
+
+        Returns:
+            (conversation id, score) pairs, best first
+        """
+        total = len(self.conversation_ids)
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + total / len(postings))
+            for doc_number, count in postings.items():
+                scores[doc_number] += (1 + math.log(count)) * idf
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        return [(self.conversation_ids[doc_number], score) for doc_number, score in ranked]
+
+class MessageSearchEngine:
+    """
+    Ranked, paginated search over conversation message content
+
+    Uses the MongoDB text index on messages.content when it exists and a
+    LocalMessageIndex otherwise. Either way a results page is one query that
+    returns the page's conversations with only their matching messages, from
+    which snippets are cut.
+    """
+
+    def __init__(self, conversations_collection, page_size: int = MESSAGE_SEARCH_PAGE_SIZE):
+        self.conversations_collection = conversations_collection
+        self.page_size = page_size
+        self.local_index: Optional[LocalMessageIndex] = None
+        self.text_index: Optional[bool] = None
+        self.lock = threading.Lock()
+
+    def has_text_index(self) -> bool:
+        """Whether the conversations collection has a text index (looked up once, see invalidate)"""
+        if self.text_index is None:
+            self.text_index = any(
+                any(direction == 'text' for _, direction in info.get('key', []))
+                for info in self.conversations_collection.index_information().values()
+            )
+        return self.text_index
+
+    def invalidate(self) -> None:
+        """Forget the cached text index lookup and local index, e.g. after indexes or data changed"""
+        self.text_index = None
+        self.local_index = None
+
+    def create_text_index(self) -> str:
+        """
+        Create the text index on titles and message content
+
+        Conversations carry a 'language' field with codes the text index does
+        not support (e.g. 'et'), so the language override is pointed at an
+        unused field and stemming is disabled.
+        """
+        index_name = self.conversations_collection.create_index(
+            [('title', 'text'), ('messages.content', 'text')],
+            name=MESSAGE_TEXT_INDEX,
+            weights={'title': 2, 'messages.content': 1},
+            default_language='none',
+            language_override='textSearchLanguage'
+        )
+        # The server index replaces the local fallback
+        self.text_index = True
+        self.local_index = None
+        return index_name
+
+    def local_index_stale(self) -> bool:
+        """Whether the local index is missing, older than LOCAL_INDEX_TTL or misses added/deleted conversations"""
+        index = self.local_index
+        return (
+            index is None
+            or time.time() - index.built_at > LOCAL_INDEX_TTL
+            or index.signature != LocalMessageIndex.collection_signature(self.conversations_collection)
+        )
+
+    def get_local_index(self) -> LocalMessageIndex:
+        """Build the local fallback index on first use and rebuild it once stale"""
+        with self.lock:
+            if self.local_index_stale():
+                index = LocalMessageIndex()
+                index.build(self.conversations_collection)
+                self.local_index = index
+            return self.local_index
+
+    def search(self, query: str, page: int = 0) -> Dict[str, Any]:
+        """
+        Search message content
+
+        Args:
+            query: Words to search for
+            page: 0-based results page
+
+        Returns:
+            Dict with 'results' (id, title, userId, createdAt, score, snippet
+            and matchCount per conversation), 'total', 'page', 'pages',
+            'engine' ('text index' or 'local index') and 'elapsed_ms'
+        """
+        started = time.perf_counter()
+        terms = tokenize(query)
+        if not terms:
+            return {'results': [], 'total': 0, 'page': 0, 'pages': 0, 'engine': None, 'elapsed_ms': 0.0}
+
+        if self.has_text_index():
+            engine = 'text index'
+            text_match = {'$text': {'$search': query}}
+            total = self.conversations_collection.count_documents(text_match)
+            docs = list(self.conversations_collection.aggregate([
+                {'$match': text_match},
+                {'$addFields': {'score': {'$meta': 'textScore'}}},
+                {'$sort': {'score': -1, '_id': -1}},
+                {'$skip': page * self.page_size},
+                {'$limit': self.page_size},
+                self._matching_messages_stage(terms)
+            ]))
+        else:
+            engine = 'local index'
+            ranked = self.get_local_index().search(query)
+            total = len(ranked)
+            page_ranked = ranked[page * self.page_size:(page + 1) * self.page_size]
+            scores = dict(page_ranked)
+            by_id = {
+                doc['_id']: doc for doc in self.conversations_collection.aggregate([
+                    {'$match': {'_id': {'$in': list(scores)}}},
+                    self._matching_messages_stage(terms)
+                ])
+            }
+            docs = []
+            for conversation_id, score in page_ranked:
+                doc = by_id.get(conversation_id)
+                if doc:
+                    doc['score'] = score
+                    docs.append(doc)
+
+        results = []
+        for doc in docs:
+            matches = doc.get('matches') or []
+            text = matches[0].get('content', '') if matches else doc.get('title', '')
+            results.append({
+                'id': doc['_id'],
+                'title': doc.get('title', 'Untitled'),
+                'userId': doc.get('userId'),
+                'createdAt': doc.get('createdAt'),
+                'score': doc.get('score', 0.0),
+                'matchCount': doc.get('matchCount', 0),
+                'snippet': make_snippet(text or '', terms)
+            })
+
+        return {
+            'results': results,
+            'total': total,
+            'page': page,
+            'pages': math.ceil(total / self.page_size),
+            'engine': engine,
+            'elapsed_ms': (time.perf_counter() - started) * 1000
+        }
+
+    @staticmethod
+    def _matching_messages_stage(terms: Sequence[str]) -> Dict[str, Any]:
+        """Projection keeping the first matching message and the number of matches"""
+        pattern = '|'.join(re.escape(term) for term in terms)
+        matching = {'$filter': {
+            'input': {'$ifNull': ['$messages', []]},
+            'as': 'message',
+            'cond': {'$regexMatch': {
+                'input': {'$ifNull': ['$$message.content', '']}, 'regex': pattern, 'options': 'i'
+            }}
+        }}
+        return {'$project': {
+            'title': 1, 'userId': 1, 'createdAt': 1, 'score': 1,
+            'matchCount': {'$size': matching},
+            'matches': {'$slice': [matching, 1]}
+        }}
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Statistics Module
+Server-side aggregation pipelines for admin panel statistics
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# Monthly conversation limits per subscription plan
+PLAN_LIMITS = {'free': 3, 'basic': 10, 'pro': 50, 'enterprise': 200}
+DEFAULT_PLAN_LIMIT = 10
+
+def month_bounds(month_start: datetime) -> tuple:
+    """Return the [start, end) datetimes of the month containing month_start"""
+    start = month_start.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+def period_starts(now: datetime) -> tuple:
+    """
+    Return the (today, week) start datetimes used by the conversation counters
+
+    The week is today plus the six previous calendar days, the finest window
+    the daily rollup buckets can answer, so the rollup and direct paths agree.
+    """
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return today_start, today_start - timedelta(days=6)
+
+class DashboardStatsEngine:
+    """Compute every dashboard stat card with a few server-side pipelines"""
+
+    # Which pipeline produces each stat card
+    METRIC_SOURCES = {
+        'total_users': 'users',
+        'active_subscriptions': 'users',
+        'total_monthly_limit': 'users',
+        'active_companies': 'companies',
+        'total_conversations': 'conversations',
+        'today_conversations': 'conversations',
+        'week_conversations': 'conversations',
+        'monthly_conversations': 'conversations',
+        'avg_duration_minutes': 'conversations',
+    }
+
+    def __init__(self, users_collection, companies_collection, conversations_collection,
+                 rollups: Optional['UsageRollups'] = None):
+        self.users_collection = users_collection
+        self.companies_collection = companies_collection
+        self.conversations_collection = conversations_collection
+        self.rollups = rollups
+
+    def compute(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Compute all dashboard statistics
+
+        Args:
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Dict with one entry per stat card plus 'timings' (ms per pipeline),
+            'metric_timings' (ms per stat card) and 'total_ms'
+        """
+        now = now or datetime.now()
+        stats = {}
+        timings = {}
+        started = time.perf_counter()
+
+        for source, pipeline_func in (
+            ('users', self._user_stats),
+            ('companies', self._company_stats),
+            ('conversations', self._conversation_stats),
+        ):
+            source_started = time.perf_counter()
+            stats.update(pipeline_func(now))
+            timings[source] = round((time.perf_counter() - source_started) * 1000, 1)
+
+        stats['timings'] = timings
+        stats['metric_timings'] = {
+            metric: timings[source] for metric, source in self.METRIC_SOURCES.items()
+        }
+        stats['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return stats
+
+    def _user_stats(self, now: datetime) -> Dict[str, Any]:
+        """Total users, active subscriptions and summed plan limits in one $facet"""
+        result = list(self.users_collection.aggregate([
+            {'$project': {'subscription.plan': 1, 'subscription.status': 1}},
+            {'$facet': {
+                'total': [{'$count': 'n'}],
+                'active_subscriptions': [
+                    {'$match': {'subscription.status': 'active'}},
+                    {'$count': 'n'}
+                ],
+                'plans': [
+                    {'$match': {'subscription': {'$exists': True}, 'subscription.plan': {'$ne': None}}},
+                    {'$group': {'_id': '$subscription.plan', 'n': {'$sum': 1}}}
+                ]
+            }}
+        ]))
+        facets = result[0] if result else {}
+
+        total_monthly_limit = sum(
+            PLAN_LIMITS.get(plan['_id'], DEFAULT_PLAN_LIMIT) * plan['n']
+            for plan in facets.get('plans', [])
+        )
+
+        return {
+            'total_users': _facet_count(facets, 'total'),
+            'active_subscriptions': _facet_count(facets, 'active_subscriptions'),
+            'total_monthly_limit': total_monthly_limit,
+        }
+
+    def _company_stats(self, now: datetime) -> Dict[str, Any]:
+        """Active companies"""
+        return {
+            'active_companies': self.companies_collection.count_documents({'isActive': True})
+        }
+
+    def _conversation_stats(self, now: datetime) -> Dict[str, Any]:
+        """Conversation counts per period and average duration in one $group"""
+        # Read O(days) bucket documents instead of O(conversations) when available
+        if self.rollups and self.rollups.is_built():
+            return self.rollups.conversation_stats(now)
+
+        today_start, week_start = period_starts(now)
+        month_start, next_month_start = month_bounds(now)
+
+        has_duration = {'$and': [{'$isNumber': '$duration'}, {'$gt': ['$duration', 0]}]}
+
+        result = list(self.conversations_collection.aggregate([
+            {'$project': {'createdAt': 1, 'duration': 1}},
+            {'$group': {
+                '_id': None,
+                'total': {'$sum': 1},
+                'today': {'$sum': {'$cond': [{'$gte': ['$createdAt', today_start]}, 1, 0]}},
+                'week': {'$sum': {'$cond': [{'$gte': ['$createdAt', week_start]}, 1, 0]}},
+                'month': {'$sum': {'$cond': [
+                    {'$and': [
+                        {'$gte': ['$createdAt', month_start]},
+                        {'$lt': ['$createdAt', next_month_start]}
+                    ]}, 1, 0
+                ]}},
+                'duration_total': {'$sum': {'$cond': [has_duration, '$duration', 0]}},
+                'duration_count': {'$sum': {'$cond': [has_duration, 1, 0]}}
+            }}
+        ]))
+        totals = result[0] if result else {}
+
+        avg_duration_minutes = 0
+        if totals.get('duration_count'):
+            avg_duration_seconds = totals['duration_total'] / totals['duration_count']
+            avg_duration_minutes = round(avg_duration_seconds / 60, 1)
+
+        return {
+            'total_conversations': totals.get('total', 0),
+            'today_conversations': totals.get('today', 0),
+            'week_conversations': totals.get('week', 0),
+            'monthly_conversations': totals.get('month', 0),
+            'avg_duration_minutes': avg_duration_minutes,
+        }
+
+def _facet_count(facets: Dict[str, List[Dict[str, Any]]], name: str) -> int:
+    """Read a {'$count': 'n'} facet result, which is empty when nothing matched"""
+    entries = facets.get(name) or []
+    return entries[0]['n'] if entries else 0
+
+class UsageRollups:
+    """
+    Pre-aggregated conversation counters kept in a dedicated collection
+
+    Two kinds of bucket documents are maintained (days are bucketed in UTC):
+      - type 'day':        one per calendar day with count and duration totals
+      - type 'user_month': one per user per month with count, duration totals
+                           and the user's last activity in that month
+    A 'meta' document records when the rollups were last refreshed.
+
+    Refreshes in this process are serialised (the dashboard refreshes from a
+    worker thread while other tabs refresh on the Tk thread), and stale
+    buckets are only removed when they are older than the refresh removing
+    them, so a slower concurrent refresh never deletes newer buckets.
+    """
+
+    META_ID = 'meta'
+    # Shared by every instance; the admin panel creates one per use
+    refresh_lock = threading.RLock()
+
+    def __init__(self, conversations_collection, rollups_collection):
+        self.conversations_collection = conversations_collection
+        self.rollups_collection = rollups_collection
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes the rollup readers rely on"""
+        self.rollups_collection.create_index([('type', 1), ('day', 1)])
+        self.rollups_collection.create_index([('type', 1), ('month', 1), ('userId', 1)])
+
+    def is_built(self) -> bool:
+        """Check whether a backfill has been run"""
+        return self.rollups_collection.count_documents({'_id': self.META_ID}, limit=1) > 0
+
+    def last_refreshed(self) -> Optional[datetime]:
+        """Return when the rollups were last refreshed, or None if never built"""
+        meta = self.rollups_collection.find_one({'_id': self.META_ID}, {'refreshedAt': 1})
+        return meta.get('refreshedAt') if meta else None
+
+    def backfill(self) -> Dict[str, Any]:
+        """Rebuild every bucket from the full conversations collection"""
+        with self.refresh_lock:
+            self.ensure_indexes()
+            return self._refresh(since=None)
+
+    def update_incremental(self, max_age_seconds: int = 60) -> Optional[Dict[str, Any]]:
+        """
+        Bring the rollups up to date
+
+        Buckets from the start of the month of the previous refresh onward are
+        recomputed, so conversations whose duration was set after they were
+        first counted are picked up. Runs a full backfill when nothing has been
+        built yet and does nothing if the last refresh is recent enough.
+
+        Returns:
+            Refresh summary, or None when the rollups were already fresh
+        """
+        # A caller that waited for a concurrent refresh finds the rollups fresh
+        with self.refresh_lock:
+            last_refreshed = self.last_refreshed()
+            if last_refreshed is None:
+                return self.backfill()
+
+            if (datetime.utcnow() - last_refreshed).total_seconds() < max_age_seconds:
+                return None
+
+            since, _ = month_bounds(last_refreshed)
+            return self._refresh(since=since)
+
+    def affected_since(self, query: Dict[str, Any]) -> Optional[datetime]:
+        """Creation time of the oldest conversation matching query, read before deleting them"""
+        oldest = self.conversations_collection.find_one(
+            {'$and': [query, {'createdAt': {'$type': 'date'}}]}, {'createdAt': 1}, sort=[('createdAt', 1)]
+        )
+        return oldest['createdAt'] if oldest else None
+
+    def refresh_since(self, since: Optional[datetime]) -> Optional[Dict[str, Any]]:
+        """
+        Recompute the buckets from the month of since onward, e.g. after deleting conversations
+
+        update_incremental only looks back to the month of the previous
+        refresh, so deletions of older conversations must be applied here.
+
+        Returns:
+            Refresh summary, or None when there is nothing to refresh
+        """
+        if since is None:
+            return None
+        with self.refresh_lock:
+            if not self.is_built():
+                return None
+            window_start, _ = month_bounds(since)
+            return self._refresh(since=window_start)
+
+    def _refresh(self, since: Optional[datetime]) -> Dict[str, Any]:
+        """Recompute buckets from since (or everything) and drop stale ones"""
+        started = time.perf_counter()
+        # BSON dates keep milliseconds, so the stamp is truncated to match the buckets
+        stamp = datetime.utcnow()
+        stamp = stamp.replace(microsecond=stamp.microsecond // 1000 * 1000)
+        match = {'createdAt': {'$gte': since}} if since else {'createdAt': {'$type': 'date'}}
+
+        self.conversations_collection.aggregate(self._day_pipeline(match, stamp))
+        self.conversations_collection.aggregate(self._user_month_pipeline(match, stamp))
+
+        # Buckets in the window that were not rewritten no longer have conversations.
+        # Only buckets older than this refresh go, so a later concurrent refresh's
+        # buckets survive; buckets without refreshedAt (older format) match too.
+        stale_filter = {'_id': {'$ne': self.META_ID}, 'refreshedAt': {'$not': {'$gte': stamp}}}
+        if since:
+            stale_filter['$or'] = [
+                {'type': 'day', 'day': {'$gte': since}},
+                {'type': 'user_month', 'month': {'$gte': since}}
+            ]
+        removed = self.rollups_collection.delete_many(stale_filter).deleted_count
+
+        self.rollups_collection.update_one(
+            {'_id': self.META_ID},
+            {'$set': {'type': 'meta', 'windowStart': since}, '$max': {'refreshedAt': stamp}},
+            upsert=True
+        )
+
+        return {
+            'window_start': since,
+            'refreshed_at': stamp,
+            'stale_removed': removed,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def _bucket_accumulators(self) -> Dict[str, Any]:
+        """Counters shared by every bucket type"""
+        has_duration = {'$and': [{'$isNumber': '$duration'}, {'$gt': ['$duration', 0]}]}
+        return {
+            'count': {'$sum': 1},
+            'durationTotal': {'$sum': {'$cond': [has_duration, '$duration', 0]}},
+            'durationCount': {'$sum': {'$cond': [has_duration, 1, 0]}}
+        }
+
+    def _merge_stage(self) -> Dict[str, Any]:
+        """Upsert bucket documents into the rollups collection"""
+        return {'$merge': {
+            'into': self.rollups_collection.name,
+            'on': '_id',
+            'whenMatched': 'replace',
+            'whenNotMatched': 'insert'
+        }}
+
+    def _day_pipeline(self, match: Dict[str, Any], stamp: datetime) -> List[Dict[str, Any]]:
+        """Group conversations into per-day buckets"""
+        return [
+            {'$match': match},
+            {'$project': {'createdAt': 1, 'duration': 1}},
+            {'$group': {
+                '_id': {'$dateToString': {'format': '%Y-%m-%d', 'date': '$createdAt'}},
+                'day': {'$min': {'$dateFromParts': {
+                    'year': {'$year': '$createdAt'},
+                    'month': {'$month': '$createdAt'},
+                    'day': {'$dayOfMonth': '$createdAt'}
+                }}},
+                **self._bucket_accumulators()
+            }},
+            {'$set': {
+                '_id': {'$concat': ['day:', '$_id']},
+                'type': 'day',
+                'refreshedAt': stamp
+            }},
+            self._merge_stage()
+        ]
+
+    def _user_month_pipeline(self, match: Dict[str, Any], stamp: datetime) -> List[Dict[str, Any]]:
+        """Group conversations into per-user-per-month buckets"""
+        return [
+            {'$match': match},
+            {'$project': {'userId': 1, 'createdAt': 1, 'duration': 1}},
+            {'$group': {
+                # userId is stored as ObjectId or string depending on the writer
+                '_id': {
+                    'user': {'$toString': '$userId'},
+                    'month': {'$dateToString': {'format': '%Y-%m', 'date': '$createdAt'}}
+                },
+                'month': {'$min': {'$dateFromParts': {
+                    'year': {'$year': '$createdAt'},
+                    'month': {'$month': '$createdAt'}
+                }}},
+                'lastActivity': {'$max': '$createdAt'},
+                **self._bucket_accumulators()
+            }},
+            {'$set': {
+                '_id': {'$concat': ['user_month:', '$_id.user', ':', '$_id.month']},
+                'userId': '$_id.user',
+                'type': 'user_month',
+                'refreshedAt': stamp
+            }},
+            self._merge_stage()
+        ]
+
+    def conversation_stats(self, now: datetime) -> Dict[str, Any]:
+        """Dashboard conversation counters summed over the day buckets"""
+        today_start, week_start = period_starts(now)
+        month_start, next_month_start = month_bounds(now)
+
+        def count_since(start, end=None):
+            condition = {'$gte': ['$day', start]}
+            if end:
+                condition = {'$and': [condition, {'$lt': ['$day', end]}]}
+            return {'$sum': {'$cond': [condition, '$count', 0]}}
+
+        result = list(self.rollups_collection.aggregate([
+            {'$match': {'type': 'day'}},
+            {'$group': {
+                '_id': None,
+                'total': {'$sum': '$count'},
+                'today': count_since(today_start),
+                'week': count_since(week_start),
+                'month': count_since(month_start, next_month_start),
+                'duration_total': {'$sum': '$durationTotal'},
+                'duration_count': {'$sum': '$durationCount'}
+            }}
+        ]))
+        totals = result[0] if result else {}
+
+        avg_duration_minutes = 0
+        if totals.get('duration_count'):
+            avg_duration_minutes = round(totals['duration_total'] / totals['duration_count'] / 60, 1)
+
+        return {
+            'total_conversations': totals.get('total', 0),
+            'today_conversations': totals.get('today', 0),
+            'week_conversations': totals.get('week', 0),
+            'monthly_conversations': totals.get('month', 0),
+            'avg_duration_minutes': avg_duration_minutes,
+        }
+
+    def user_usage(self, month_start: datetime, user_ids: Optional[List[Any]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-user conversation count for one month and last activity overall
+
+        A single $match/$group over the user-month buckets; users without any
+        conversation are absent from the result.
+
+        Args:
+            month_start: Any time within the month
+            user_ids: Only these users (ObjectIds or strings); all users if None
+
+        Returns:
+            Dict keyed by the string form of userId with 'count' (this month)
+            and 'lastActivity' (most recent conversation of any month)
+        """
+        month_start, _ = month_bounds(month_start)
+        match = {'type': 'user_month'}
+        if user_ids is not None:
+            match['userId'] = {'$in': [str(user_id) for user_id in user_ids]}
+        result = self.rollups_collection.aggregate([
+            {'$match': match},
+            {'$group': {
+                '_id': '$userId',
+                'count': {'$sum': {'$cond': [{'$eq': ['$month', month_start]}, '$count', 0]}},
+                'lastActivity': {'$max': '$lastActivity'}
+            }}
+        ])
+        return {entry['_id']: entry for entry in result}
+
+def _read_mongodb_uri() -> Optional[str]:
+    """Read MONGODB_URI from the environment or the .env file, like the admin panel"""
+    mongodb_uri = os.getenv('MONGODB_URI')
+    if not mongodb_uri:
+        try:
+            with open('.env', 'r') as f:
+                for line in f:
+                    if line.startswith('MONGODB_URI='):
+                        mongodb_uri = line.split('=', 1)[1].strip()
+                        break
+        except FileNotFoundError:
+            pass
+    return mongodb_uri
+
+def main():
+    """Command line entry point for maintaining the usage rollups"""
+    import argparse
+    from pymongo import MongoClient
+
+    parser = argparse.ArgumentParser(description="Maintain SalesBuddy usage rollups")
+    parser.add_argument('command', choices=['backfill', 'update'],
+                        help="backfill rebuilds every bucket, update refreshes recent buckets")
+    parser.add_argument('--uri', default=None, help="MongoDB URI (defaults to MONGODB_URI)")
+    parser.add_argument('--database', default='retryWrites=true&w=majority',
+                        help="Database name (defaults to the one the admin panel uses)")
+    args = parser.parse_args()
+
+    mongodb_uri = args.uri or _read_mongodb_uri()
+    if not mongodb_uri:
+        parser.error("MongoDB URI not found, pass --uri or set MONGODB_URI")
+
+    db = MongoClient(mongodb_uri)[args.database]
+    rollups = UsageRollups(db.conversations, db.conversationrollups)
+
+    if args.command == 'backfill':
+        result = rollups.backfill()
+    else:
+        result = rollups.update_incremental(max_age_seconds=0)
+
+    print(f"Rollups refreshed in {result['elapsed_ms']:.0f}ms "
+          f"(window start: {result['window_start'] or 'all time'}, "
+          f"stale buckets removed: {result['stale_removed']})")
+
+if __name__ == "__main__":
+    main()
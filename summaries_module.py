@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+SalesBuddy Summaries Module
+Server-side pipelines for the Conversation Summaries tab
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from bson import ObjectId
+
+from lookup_module import object_id_prefix_range
+
+DEFAULT_SUMMARY_PAGE_SIZE = 50
+MAX_SUMMARY_PAGE_SIZE = 500
+SUMMARY_SEARCH_LIMIT = 20
+USER_SEARCH_LIMIT = 50
+
+OBJECT_ID_PATTERN = re.compile(r'^[0-9a-fA-F]{24}$')
+ID_PREFIX_PATTERN = re.compile(r'^[0-9a-fA-F]{4,23}$')
+
+# Search plans, by input class
+SEARCH_PLANS = {
+    'user_id': "exact user id",
+    'id_prefix': "user id prefix range",
+    'email': "email prefix range",
+    'name': "name prefix range"
+}
+
+# Summary fields shown in the summaries list
+SUMMARY_LIST_FIELDS = {
+    'userId': 1, 'createdAt': 1, 'summaryNumber': 1, 'conversationCount': 1,
+    'overallRating': 1, 'aiAnalysis': 1, 'strengths': 1, 'improvements': 1
+}
+
+def user_details_stages() -> List[Dict[str, Any]]:
+    """
+    Stages joining each summary to its user's name and total conversation time
+
+    userId is stored as an ObjectId or as its string form, so both forms are
+    matched. An array localField matches any of its elements, which keeps
+    both lookups on the users _id and conversations userId indexes.
+    """
+    return [
+        {'$addFields': {'userKeys': [
+            {'$toString': '$userId'},
+            {'$convert': {'input': '$userId', 'to': 'objectId', 'onError': '$userId', 'onNull': None}}
+        ]}},
+        {'$lookup': {
+            'from': 'users',
+            'localField': 'userKeys',
+            'foreignField': '_id',
+            'pipeline': [{'$project': {'firstName': 1, 'lastName': 1, 'email': 1}}],
+            'as': 'user'
+        }},
+        {'$lookup': {
+            'from': 'conversations',
+            'localField': 'userKeys',
+            'foreignField': 'userId',
+            'pipeline': [{'$group': {'_id': None, 'totalDuration': {'$sum': {'$ifNull': ['$duration', 0]}}}}],
+            'as': 'durations'
+        }},
+        {'$project': dict(
+            SUMMARY_LIST_FIELDS,
+            user={'$first': '$user'},
+            totalDuration={'$ifNull': [{'$first': '$durations.totalDuration'}, 0]}
+        )}
+    ]
+
+def latest_summaries_pipeline(skip: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Pipeline returning one page of users' latest summaries, newest first
+
+    Every summary takes part in the grouping, so no user is left out; the
+    user and duration lookups run only for the summaries on the page.
+
+    Args:
+        skip: Users to skip (page offset)
+        limit: Users to return
+
+    Returns:
+        Summaries with their SUMMARY_LIST_FIELDS plus 'user' (name and email
+        fields, or missing) and 'totalDuration' (seconds)
+    """
+    return [
+        {'$match': {'userId': {'$ne': None}}},
+        {'$sort': {'createdAt': -1}},
+        {'$project': SUMMARY_LIST_FIELDS},
+        # Both userId forms of a user fall into the same group
+        {'$group': {'_id': {'$toString': '$userId'}, 'summary': {'$first': '$$ROOT'}}},
+        {'$replaceRoot': {'newRoot': '$summary'}},
+        {'$sort': {'createdAt': -1, '_id': -1}},
+        {'$skip': skip},
+        {'$limit': limit},
+        *user_details_stages()
+    ]
+
+def classify_search(term: str) -> str:
+    """
+    Classify summary search input once
+
+    Returns:
+        'user_id' for a full ObjectId, 'id_prefix' for 4-23 hex characters
+        that contain a digit or are at least 8 long (so names like 'Abe' or
+        'Face' stay names), 'email' when it contains '@', otherwise 'name'
+    """
+    if OBJECT_ID_PATTERN.match(term):
+        return 'user_id'
+    if ID_PREFIX_PATTERN.match(term) and (any(char.isdigit() for char in term) or len(term) >= 8):
+        return 'id_prefix'
+    if '@' in term:
+        return 'email'
+    return 'name'
+
+def prefix_range(prefix: str) -> Dict[str, str]:
+    """Index-friendly range matching the strings that start with prefix"""
+    return {'$gte': prefix, '$lt': prefix[:-1] + chr(ord(prefix[-1]) + 1)}
+
+def id_prefix_match(prefix: str) -> Dict[str, Any]:
+    """userId condition for ids starting with a hex prefix, in ObjectId and string form"""
+    prefix = prefix.lower()
+    return {'$or': [
+        {'userId': object_id_prefix_range(prefix)},
+        {'userId': {'$gte': prefix.ljust(24, '0'), '$lte': prefix.ljust(24, 'f')}}
+    ]}
+
+def name_match(term: str) -> Dict[str, Any]:
+    """
+    Users query for a (partial) name
+
+    Ranges replace case-insensitive regexes so the firstName and lastName
+    indexes can be used; the common casings of the input are tried. Two
+    words match first name and last name prefixes together.
+    """
+    def variants(text):
+        return {text, text.lower(), text.capitalize(), text.title()}
+
+    words = term.split()
+    if len(words) >= 2:
+        first, last = words[0], ' '.join(words[1:])
+        return {'$or': [
+            {'firstName': prefix_range(first_variant), 'lastName': prefix_range(last_variant)}
+            for first_variant in variants(first) for last_variant in variants(last)
+        ]}
+    return {'$or': [
+        {field: prefix_range(variant)} for field in ('firstName', 'lastName') for variant in variants(term)
+    ]}
+
+class SummarySearchPlanner:
+    """
+    Classify summary search input and run one indexed query plan for it
+
+    Id searches are a single summaries aggregation; email and name searches
+    first find matching users through a prefix range on an indexed field.
+    Results carry the user name and total duration like the summaries list.
+    """
+
+    def __init__(self, summaries_collection, users_collection, limit: int = SUMMARY_SEARCH_LIMIT):
+        self.summaries_collection = summaries_collection
+        self.users_collection = users_collection
+        self.limit = limit
+
+    def search(self, term: str) -> Dict[str, Any]:
+        """
+        Search summaries
+
+        Returns:
+            Dict with 'plan' (input class), 'description', 'results'
+            (summaries, newest first), 'queries' and 'elapsed_ms'
+        """
+        started = time.perf_counter()
+        plan = classify_search(term)
+        queries = 1
+
+        match: Optional[Dict[str, Any]] = None
+        if plan == 'user_id':
+            match = {'userId': {'$in': [ObjectId(term), term.lower()]}}
+        elif plan == 'id_prefix':
+            match = id_prefix_match(term)
+        else:
+            users_query = {'email': prefix_range(term.lower())} if plan == 'email' else name_match(term)
+            user_ids = [user['_id'] for user in self.users_collection.find(users_query, {'_id': 1}).limit(USER_SEARCH_LIMIT)]
+            if user_ids:
+                queries += 1
+                match = {'userId': {'$in': user_ids + [str(user_id) for user_id in user_ids]}}
+
+        results = []
+        if match is not None:
+            results = list(self.summaries_collection.aggregate([
+                {'$match': match},
+                {'$sort': {'createdAt': -1}},
+                {'$limit': self.limit},
+                {'$project': SUMMARY_LIST_FIELDS},
+                *user_details_stages()
+            ]))
+
+        return {
+            'plan': plan,
+            'description': SEARCH_PLANS[plan],
+            'results': results,
+            'queries': queries,
+            'elapsed_ms': (time.perf_counter() - started) * 1000
+        }
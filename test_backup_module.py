@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Backup Module Tests
+Round-trips BSON types through BackupEngine backups and restores without a database server
+"""
+
+import hashlib
+import os
+from datetime import datetime
+
+import bson
+from bson import Binary, Decimal128, Int64, ObjectId
+from bson.raw_bson import RawBSONDocument
+import pytest
+
+from backup_module import (
+    BACKUP_FORMAT_VERSION, BackupCancelled, BackupEngine, load_manifest, read_backup_documents, read_backup_file
+)
+
+
+class FakeCursor:
+    """Just enough of a pymongo cursor for BackupEngine"""
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def batch_size(self, size):
+        return self
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        return iter(self.documents)
+
+
+class FakeCollection:
+    """In-memory collection storing BSON bytes and returning RawBSONDocuments like raw_collection"""
+
+    def __init__(self, documents=(), indexes=None):
+        self.data = [bson.encode(doc) for doc in documents]
+        self.indexes = indexes or [{'v': 2, 'key': {'_id': 1}, 'name': '_id_'}]
+        self.created_indexes = []
+
+    def with_options(self, codec_options=None):
+        return self
+
+    def list_indexes(self):
+        return iter(self.indexes)
+
+    def estimated_document_count(self):
+        return len(self.data)
+
+    def find(self, query=None):
+        documents = [RawBSONDocument(data) for data in self.data]
+        ids = (query or {}).get('_id', {}).get('$in')
+        if ids is not None:
+            documents = [doc for doc in documents if doc['_id'] in ids]
+        return FakeCursor(documents)
+
+    def drop(self):
+        self.data = []
+
+    def insert_many(self, documents, ordered=True):
+        self.data += [doc.raw if isinstance(doc, RawBSONDocument) else bson.encode(doc) for doc in documents]
+
+    def create_index(self, keys, **options):
+        self.created_indexes.append((keys, options))
+
+
+class FakeDatabase(dict):
+    """Collections by name, created on first access"""
+
+    name = 'salesbuddy_test'
+
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+def sample_documents(count: int):
+    """Documents covering the types a JSON export would lose"""
+    return [
+        {
+            '_id': ObjectId(),
+            'createdAt': datetime(2024, 5, 1, 12, 30, 15, i * 1000),
+            'tokens': Int64(2 ** 40 + i),
+            'price': Decimal128(f'{i}.10'),
+            'avatar': Binary(bytes([i]) * 16, 0x80),
+            'nested': {'counts': [Int64(i), 1]}
+        }
+        for i in range(count)
+    ]
+
+
+def sample_database():
+    db = FakeDatabase()
+    db['users'] = FakeCollection(sample_documents(5), indexes=[
+        {'v': 2, 'key': {'_id': 1}, 'name': '_id_'},
+        {'v': 2, 'key': {'email': 1}, 'name': 'email_1', 'unique': True}
+    ])
+    db['companies'] = FakeCollection(sample_documents(2))
+    return db
+
+
+def assert_same_documents(restored, originals):
+    decoded = [bson.decode(data) for data in restored]
+    assert decoded == originals
+    for doc in decoded:
+        assert isinstance(doc['_id'], ObjectId)
+        assert isinstance(doc['createdAt'], datetime)
+        assert isinstance(doc['tokens'], Int64)
+        assert isinstance(doc['price'], Decimal128)
+        assert isinstance(doc['avatar'], Binary)
+        assert doc['avatar'].subtype == 0x80
+        assert isinstance(doc['nested']['counts'][0], Int64)
+
+
+def test_backup_part_preserves_types(tmp_path):
+    db = sample_database()
+    engine = BackupEngine(db, workers=1)
+    stats = engine.backup_part('users', 3, None, str(tmp_path))
+
+    assert stats['file'] == 'users.part0003.bson.gz'
+    restored = list(read_backup_file(str(tmp_path), stats['file']))
+    assert all(isinstance(doc, RawBSONDocument) for doc in restored)
+    assert_same_documents([doc.raw for doc in restored], [bson.decode(data) for data in db['users'].data])
+    assert stats['documents'] == len(restored)
+    assert stats['bytes'] == sum(len(doc.raw) for doc in restored)
+    assert stats['sha256'] == hashlib.sha256(b''.join(doc.raw for doc in restored)).hexdigest()
+
+
+def test_manifest_matches_backup_files(tmp_path):
+    directory = str(tmp_path / 'backup')
+    db = sample_database()
+    manifest = BackupEngine(db, workers=1).backup(directory, ['users', 'companies'])
+
+    assert manifest == load_manifest(directory)
+    assert manifest['version'] == BACKUP_FORMAT_VERSION
+    for name, entry in manifest['collections'].items():
+        assert entry['documents'] == len(db[name].data)
+        for part in entry['files']:
+            restored = list(read_backup_file(directory, part['file']))
+            assert part['documents'] == len(restored)
+            assert part['sha256'] == hashlib.sha256(b''.join(doc.raw for doc in restored)).hexdigest()
+        assert [doc.raw for doc in read_backup_documents(directory, entry)] == db[name].data
+
+
+def test_restore_round_trip(tmp_path):
+    directory = str(tmp_path / 'backup')
+    db = sample_database()
+    originals = {name: [bson.decode(data) for data in db[name].data] for name in ('users', 'companies')}
+    engine = BackupEngine(db, workers=1)
+    engine.backup(directory, ['users', 'companies'])
+
+    target = FakeDatabase()
+    target['users'] = FakeCollection(sample_documents(1))
+    results = engine.restore(directory, target_db=target)
+
+    assert {name: result['documents'] for name, result in results.items()} == {'users': 5, 'companies': 2}
+    for name, documents in originals.items():
+        assert_same_documents(target[name].data, documents)
+    assert target['users'].created_indexes == [([('email', 1)], {'name': 'email_1', 'unique': True})]
+
+
+def test_verify_checks_counts_and_checksums(tmp_path):
+    directory = str(tmp_path / 'backup')
+    engine = BackupEngine(sample_database(), workers=1)
+    engine.backup(directory, ['users'])
+    result = engine.verify(directory)['users']
+    assert result['ok'] and result['sampled'] == 5
+
+    manifest = load_manifest(directory)
+    manifest['collections']['users']['files'][0]['documents'] += 1
+    manifest['collections']['users']['files'][0]['sha256'] = '0' * 64
+    BackupEngine.write_manifest(directory, manifest)
+
+    result = engine.verify(directory, sample_size=0)['users']
+    assert not result['documents_ok']
+    assert not result['checksum_ok']
+    assert not result['ok']
+
+
+def test_failed_part_skips_remaining_parts(tmp_path):
+    directory = str(tmp_path / 'backup')
+    ran = []
+
+    class FailingEngine(BackupEngine):
+        def split_collection(self, name):
+            return [{'$gte': part} for part in range(6)]
+
+        def backup_part(self, name, part, id_range, directory):
+            ran.append(part)
+            if part == 0:
+                raise IOError('disk full')
+            if self.cancel_event.is_set():
+                raise BackupCancelled()
+            return {}
+
+    engine = FailingEngine(sample_database(), workers=1)
+    with pytest.raises(IOError):
+        engine.backup(directory, ['users'])
+
+    # Only the part already picked up by the worker may still run
+    assert ran[0] == 0 and len(ran) <= 2
+    assert engine.cancel_event.is_set()
+    assert not os.path.exists(directory)